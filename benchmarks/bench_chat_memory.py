@@ -0,0 +1,75 @@
+# benchmarks/bench_chat_memory.py
+# Companion prompt size against conversation length: the whole day's transcript as history (what
+# an unbounded buffer memory sends) vs. ChatMemory's recent turns plus running summary. For each
+# conversation length it reports count_tokens(history) and the time to build the prompt.
+# The summary call is a fake that keeps the last words of what it folds in.
+#   python benchmarks/bench_chat_memory.py --turns 10 50 200 1000
+import argparse
+import time
+import common
+from utils import chat_memory
+from utils.chat_memory import ChatHistoryStore, ChatMemory, count_tokens, format_turns
+from phase3_ai_companion import build_prompt
+
+USER = "I keep worrying about my exams next week and I can't focus on revising for more than ten minutes"
+ASSISTANT = ("That sounds really stressful, and it makes sense that your focus slips when you're this worried. "
+             "Try a short breathing break, then one small task for ten minutes, and be kind to yourself.")
+
+# Word-per-token stand-in for when tiktoken can't download its encoding (offline)
+class WordEncoding:
+    def encode(self, text):
+        return text.split(" ") if text else []
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+def summarize(calls):
+    def run(previous, transcript):
+        calls.append(transcript)
+        return f"{previous} {' '.join(transcript.split()[-60:])}"
+    return run
+
+def prompt_cost(prompt, history, repeat):
+    seconds, text = common.best_of(lambda: prompt.format(history=history, input=USER), repeat)
+    return seconds * 1000, count_tokens(text)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 50, 200, 1000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    try:
+        count_tokens("probe")
+        tokenizer = "tiktoken cl100k"
+    except Exception:
+        chat_memory._encoding = WordEncoding
+        tokenizer = "one token per word (tiktoken encoding unavailable)"
+
+    prompt = build_prompt("Anxious")
+    rows = []
+    for turns in args.turns:
+        store = ChatHistoryStore(common.scratch_path(f"chat-{turns}.db"))
+        calls = []
+        memory = ChatMemory(store, "bench", "2024-01-01", summarize(calls))
+        add_seconds = 0.0
+        for i in range(turns):
+            start = time.perf_counter()
+            memory.add_turn(f"{USER} ({i})", f"{ASSISTANT} ({i})")
+            add_seconds += time.perf_counter() - start
+
+        transcript = format_turns(store.turns("bench", "2024-01-01"))
+        build_ms, prompt_tokens = prompt_cost(prompt, transcript, args.repeat)
+        rows.append({"turns": turns, "history": "full transcript", "history_tokens": count_tokens(transcript),
+                     "prompt_tokens": prompt_tokens, "build_ms": build_ms, "summary_calls": 0})
+
+        # history() is rebuilt per message, so it is part of the bounded path's build time
+        history_ms, history = common.best_of(memory.history, args.repeat)
+        build_ms, prompt_tokens = prompt_cost(prompt, history, args.repeat)
+        rows.append({"turns": turns, "history": "ChatMemory", "history_tokens": count_tokens(history),
+                     "prompt_tokens": prompt_tokens, "build_ms": history_ms * 1000 + build_ms,
+                     "summary_calls": len(calls)})
+    common.print_table(f"Companion prompt vs. conversation length, tokens: {tokenizer}", rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# benchmarks/bench_companion_streaming.py
+# AI companion replies: time until the user sees anything with the old blocking call (the whole
+# reply under a spinner) vs. stream_reply, which st.write_stream renders token by token.
+#   python benchmarks/bench_companion_streaming.py --latency 0.5 --token-latency 0.03
+import argparse
+import time
+import common
+from utils.llm_scheduler import LLMScheduler
+import phase3_ai_companion as phase3
+
+REPLY = " ".join(["That sounds like a lot to carry today, and it makes sense you feel tired."] * 5)
+
+def blocking(prompt):
+    start = time.perf_counter()
+    phase3.get_llm_scheduler().invoke(phase3.get_llm(), prompt, phase3.PRIORITY_CHAT)
+    total = time.perf_counter() - start
+    return total, total
+
+def streaming(prompt):
+    start = time.perf_counter()
+    chunks = phase3.stream_reply(prompt, [])
+    next(chunks)  # the "🤖 MindMate: " prefix, shown before the model is called
+    next(chunks)
+    first = time.perf_counter() - start
+    for _ in chunks:
+        pass
+    return first, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds to the first token")
+    parser.add_argument("--token-latency", type=float, default=0.03, help="seconds between streamed words")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    llm = common.GeneratingLLM(REPLY, latency=args.latency, token_latency=args.token_latency)
+    scheduler = LLMScheduler(rpm=10 ** 6, tpm=10 ** 9)
+    phase3.get_llm = lambda **kwargs: llm
+    phase3.get_llm_scheduler = lambda: scheduler
+
+    prompt = phase3.build_prompt("Anxious").format(history="", input="I can't sleep before my exam")
+    rows = []
+    for name, fn in (("blocking (chat.predict)", blocking), ("streaming (st.write_stream)", streaming)):
+        firsts, totals = [], []
+        for run_number in range(args.runs):
+            first, total = fn(f"{prompt}\n#{run_number}")
+            firsts.append(first)
+            totals.append(total)
+        rows.append({"path": name, "runs": args.runs,
+                     "mean_ttft_s": sum(firsts) / len(firsts), "p95_ttft_s": common.percentile(firsts, 0.95),
+                     "mean_total_s": sum(totals) / len(totals)})
+    words = len(REPLY.split(" "))
+    common.print_table(f"Companion reply, {args.latency}s to first token, {words} words", rows)
+
+if __name__ == "__main__":
+    main()
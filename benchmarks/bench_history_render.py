@@ -0,0 +1,103 @@
+# benchmarks/bench_history_render.py
+# Rerun time and bytes sent for long histories: the mood log and the companion transcript
+# rendered in full (one element per entry, as before) vs. the windowed views that send one page
+# and fetch older pages by cursor. Bytes are the serialized size of every element in the page.
+#   python benchmarks/bench_history_render.py --entries 10000
+import argparse
+import datetime
+import time
+import common
+from streamlit.testing.v1 import AppTest
+from utils.chat_memory import get_chat_history_store
+from utils.mood_store import get_mood_store
+
+MOODS = ["😊 Happy", "😐 Neutral", "😰 Anxious", "😢 Sad", "😠 Angry"]
+
+# ---- Before: every entry and message rendered on every rerun ---- #
+def legacy_mood_history(log):
+    import streamlit as st
+    for entry in reversed(log):
+        st.markdown(f"""
+        <div style="background-color:teal; padding:12px; border-radius:10px; margin-bottom:10px;">
+            <strong>{entry['date']}</strong><br>
+            Mood: <span style="font-size:18px;">{entry['mood']}</span><br>
+            {"📝 " + entry['note'] if entry['note'] else ""}
+        </div>
+        """, unsafe_allow_html=True)
+
+def legacy_chat(messages):
+    import streamlit as st
+    for msg in messages:
+        with st.chat_message(msg["role"]):
+            st.markdown(msg["content"])
+
+# ---- After ---- #
+def mood_history_page():
+    import streamlit as st
+    import phase1_mood_tracker
+    phase1_mood_tracker.mood_history(phase1_mood_tracker.get_mood_store(), st.session_state["_uid"])
+
+def chat_page():
+    import phase3_ai_companion
+    phase3_ai_companion.ai_companion_chat()
+
+def page_bytes(node):
+    children = getattr(node, "children", None)
+    if children is None:
+        return node.proto.ByteSize() if getattr(node, "proto", None) is not None else 0
+    return sum(page_bytes(child) for child in children.values())
+
+# Steady-state rerun of an already loaded page: (seconds, bytes)
+def rerun(at):
+    seconds, _ = common.best_of(at.run)
+    assert not at.exception, at.exception
+    return seconds, page_bytes(at.main)
+
+def open_page(page, uid=None, args=None):
+    at = AppTest.from_function(page, args=args, default_timeout=300)
+    if uid:
+        at.session_state["_uid"] = uid
+    at.run()
+    assert not at.exception, at.exception
+    return at
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=10000)
+    args = parser.parse_args()
+
+    uid = f"bench-history-{args.entries}"
+    today = datetime.date.today()
+    store = get_mood_store()
+    log = [store.append(uid, (today - datetime.timedelta(days=(args.entries - i) // 3)).isoformat(),
+                        MOODS[i % len(MOODS)], f"Entry {i}: slept okay, long walk after lunch.")
+           for i in range(args.entries)]
+    chat_store = get_chat_history_store()
+    messages = []
+    for i in range(args.entries // 2):
+        user, assistant = f"Message {i}: I feel a bit anxious.", f"Reply {i}: Let's breathe."
+        chat_store.append_turn(uid, today.isoformat(), user, assistant)
+        messages += [{"role": "user", "content": user}, {"role": "assistant", "content": f"🤖 MindMate: {assistant}"}]
+
+    rows = []
+    for name, page, page_uid, page_args in (
+        ("mood log, all entries", legacy_mood_history, None, (log,)),
+        ("mood log, windowed", mood_history_page, uid, None),
+        ("chat, all messages", legacy_chat, None, (messages,)),
+        ("chat, windowed", chat_page, uid, None),
+    ):
+        at = open_page(page, page_uid, page_args)
+        seconds, sent = rerun(at)
+        rows.append({"view": name, "rerun_s": seconds, "bytes_sent": sent, "markdown_elements": len(at.markdown)})
+
+    # Paging back is one cursor query for the next page; the cards' HTML is memoized
+    at = open_page(mood_history_page, uid)
+    older = next(button for button in at.button if button.label == "Older ➡️")
+    start = time.perf_counter()
+    older.click().run()
+    rows.append({"view": "mood log, next page click", "rerun_s": time.perf_counter() - start,
+                 "bytes_sent": page_bytes(at.main), "markdown_elements": len(at.markdown)})
+    common.print_table(f"{args.entries} mood entries / chat messages", rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/bench_journal_concurrency.py
+# "Reflect & Recommend": sequential invoke() of both prompts vs. both streamed at once,
+# against a fake ChatGroq with fixed time-to-first-token and per-token delay.
+#   python benchmarks/bench_journal_concurrency.py --latency 0.8 --token-latency 0.02
+import argparse
+import time
+import common
+from utils.llm_scheduler import LLMScheduler
+import phase2_journal_coping as phase2
+
+REPLY = " ".join(["Breathe in slowly and notice how your body feels right now."] * 4)
+
+def run(path, prompts):
+    start = time.perf_counter()
+    first = None
+    if path == "sequential":
+        # Nothing is shown until both replies are back
+        phase2.run_sequential(prompts)
+        first = time.perf_counter() - start
+    else:
+        for _ in phase2.stream_concurrently(prompts):
+            if first is None:
+                first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.8, help="seconds to the first token")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="seconds between streamed words")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    llm = common.GeneratingLLM(REPLY, latency=args.latency, token_latency=args.token_latency)
+    # No rate limits here: only the call pattern is being compared
+    scheduler = LLMScheduler(rpm=10 ** 6, tpm=10 ** 9)
+    phase2.get_llm = lambda: llm
+    phase2.get_llm_scheduler = lambda: scheduler
+    words = len(REPLY.split(" "))
+
+    rows = []
+    for path in ("sequential", "concurrent"):
+        firsts, totals = [], []
+        for run_number in range(args.runs):
+            # Distinct prompts per run so the scheduler never merges them with an earlier call
+            prompts = {key: f"{key} prompt {run_number}" for key in ("reflection", "coping")}
+            first, total = run(path, prompts)
+            firsts.append(first)
+            totals.append(total)
+        rows.append({"path": path, "runs": args.runs,
+                     "mean_ttft_s": sum(firsts) / len(firsts), "mean_total_s": sum(totals) / len(totals)})
+    common.print_table(f"Reflection + coping, {args.latency}s to first token, {words} words each", rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# benchmarks/bench_journal_index.py
+# Journal index at scale: batched indexing throughput, top-k query latency, and reopening the
+# on-disk index. Uses the deterministic hashing embedder unless --model is given, in which case
+# the real sentence-transformers model from MINDMATE_EMBEDDING_MODEL is loaded.
+#   python benchmarks/bench_journal_index.py --entries 100000
+import argparse
+import datetime
+import random
+import time
+import common
+from fakes import HashEmbedder
+from utils.journal_index import JournalIndex
+
+MOODS = ["😊 Happy", "😐 Neutral", "😰 Anxious", "😢 Sad", "😠 Angry"]
+TOPICS = ["work deadlines", "my exams", "sleep", "my sister", "running in the park", "money worries",
+          "the new job", "feeling lonely", "a good book", "cooking dinner", "my dog", "the weekend trip"]
+FEELINGS = ["I felt anxious about", "I was really happy about", "I kept thinking about",
+            "I could not stop worrying about", "I felt calm after", "I was frustrated by"]
+
+def entry(rng, day):
+    text = f"{rng.choice(FEELINGS)} {rng.choice(TOPICS)} and {rng.choice(TOPICS)} today."
+    return {"date": day.isoformat(), "mood": rng.choice(MOODS), "text": text}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--batch", type=int, default=1000, help="entries per add_entries() call")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--model", action="store_true", help="embed with the real sentence-transformers model")
+    args = parser.parse_args()
+
+    if args.model:
+        from utils.journal_index import get_embedder
+        embedder = get_embedder()
+    else:
+        embedder = HashEmbedder()
+    db_path, index_path = common.scratch_path("journal.db"), common.scratch_path("journal-bench.faiss")
+    index = JournalIndex(db_path, index_path, embedder)
+
+    rng = random.Random(0)
+    today = datetime.date.today()
+    # One heavy user with a tenth of the entries; the rest spread over everyone else
+    uids = [f"user-{n}" for n in range(args.users)]
+    start = time.perf_counter()
+    for first in range(0, args.entries, args.batch):
+        count = min(args.batch, args.entries - first)
+        uid = uids[0] if rng.random() < 0.1 else rng.choice(uids[1:])
+        index.add_entries(uid, [entry(rng, today - datetime.timedelta(days=(first + i) // 50)) for i in range(count)])
+    index.flush()
+    indexing = time.perf_counter() - start
+
+    rows = []
+    for label, uid in (("heavy user", uids[0]), ("typical user", uids[1])):
+        latencies = []
+        for _ in range(args.queries):
+            query = f"{rng.choice(FEELINGS)} {rng.choice(TOPICS)}"
+            start = time.perf_counter()
+            index.search(uid, query, k=3)
+            latencies.append(time.perf_counter() - start)
+        rows.append({"searcher": label, "queries": args.queries,
+                     "p50_ms": common.percentile(latencies, 0.5) * 1000,
+                     "p95_ms": common.percentile(latencies, 0.95) * 1000})
+
+    # Reopening reads the saved index; only entries newer than the file would be re-embedded
+    reopen, reopened = common.best_of(lambda: JournalIndex(db_path, index_path, embedder), repeat=1)
+    # Incremental add: one new entry into the full index
+    single, _ = common.best_of(lambda: reopened.add_entry(uids[1], today.isoformat(), "😊 Happy", "A quiet day."))
+
+    common.print_table(f"Journal index, {args.entries} entries, {type(embedder).__name__}", [{
+        "indexing_s": indexing, "entries_per_s": args.entries / indexing, "reopen_s": reopen,
+        "add_one_ms": single * 1000, "index_mib": len(index) * (index.index.d * 4 + 8) / 2 ** 20,
+    }])
+    common.print_table("Top-3 search", rows)
+
+if __name__ == "__main__":
+    main()
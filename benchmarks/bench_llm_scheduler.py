@@ -0,0 +1,111 @@
+# benchmarks/bench_llm_scheduler.py
+# Load test for the LLM scheduler against a local fake Groq endpoint that enforces request- and
+# token-per-minute limits with 429s. Many sessions send chat messages (unique prompts) and music
+# insight requests (a handful of identical prompts) at once, either straight to the model as the
+# phases used to, or through the scheduler. Reports throughput, failures and latency per priority.
+#   python benchmarks/bench_llm_scheduler.py --sessions 60 --requests 25 --rpm 1200
+import argparse
+import collections
+import random
+import threading
+import time
+import common
+from fakes import FakeLLM, RateLimited
+from utils.llm_scheduler import LLMScheduler, PRIORITY_CHAT, PRIORITY_MUSIC
+
+MOODS = ["😊 Happy", "😢 Sad", "😠 Angry", "😰 Anxious", "😐 Neutral"]
+
+# Fake endpoint with sliding one-minute windows; calls over either limit fail with a 429
+class RateLimitedServer(FakeLLM):
+    def __init__(self, rpm, tpm, latency):
+        super().__init__("Here is something gentle to try today.", latency=latency)
+        self.rpm = rpm
+        self.tpm = tpm
+        self._window = collections.deque()   # (time, tokens) of accepted calls
+        self._window_lock = threading.Lock()
+        self.rejected = 0
+
+    def _call(self, prompt):
+        tokens = len(prompt) // 4 + len(self.reply) // 4
+        now = time.monotonic()
+        with self._window_lock:
+            while self._window and now - self._window[0][0] >= 60:
+                self._window.popleft()
+            if len(self._window) >= self.rpm or sum(t for _, t in self._window) + tokens > self.tpm:
+                self.rejected += 1
+                raise RateLimited("rate limit exceeded")
+            self._window.append((now, tokens))
+        return super()._call(prompt)
+
+def request_mix(rng, session, count):
+    for n in range(count):
+        if rng.random() < 0.7:
+            yield "chat", PRIORITY_CHAT, f"Session {session} says: I feel a bit off today ({n})."
+        else:
+            yield "music", PRIORITY_MUSIC, f"Suggest music for someone feeling {rng.choice(MOODS)}."
+
+def run(path, args):
+    server = RateLimitedServer(args.rpm, args.tpm, args.latency)
+    scheduler = LLMScheduler(rpm=args.rpm, tpm=args.tpm, workers=args.workers) if path == "scheduler" else None
+    latencies = collections.defaultdict(list)
+    failures = collections.Counter()
+    lock = threading.Lock()
+
+    def session(number):
+        for kind, priority, prompt in request_mix(random.Random(number), number, args.requests):
+            start = time.perf_counter()
+            try:
+                if scheduler:
+                    scheduler.invoke(server, prompt, priority)
+                else:
+                    server.invoke(prompt)
+            except RateLimited:
+                with lock:
+                    failures[kind] += 1
+                continue
+            with lock:
+                latencies[kind].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(args.sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    rows = []
+    for kind in ("chat", "music"):
+        samples = latencies[kind]
+        rows.append({"path": path, "requests": kind, "ok": len(samples), "failed_429": failures[kind],
+                     "ok_per_s": len(samples) / elapsed,
+                     "p50_s": common.percentile(samples, 0.5), "p95_s": common.percentile(samples, 0.95)})
+    extra = {"path": path, "wall_s": elapsed, "server_calls": server.calls, "server_429s": server.rejected}
+    if scheduler:
+        stats = scheduler.stats()
+        extra.update(coalesced=stats["coalesced"], retries=stats["retries"])
+    else:
+        extra.update(coalesced=0, retries=0)
+    return rows, extra
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=60)
+    parser.add_argument("--requests", type=int, default=25, help="requests per session")
+    parser.add_argument("--rpm", type=int, default=1200, help="fake server requests per minute")
+    parser.add_argument("--tpm", type=int, default=10 ** 6, help="fake server tokens per minute")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per accepted call")
+    parser.add_argument("--workers", type=int, default=8, help="scheduler worker threads")
+    args = parser.parse_args()
+
+    rows, totals = [], []
+    for path in ("direct", "scheduler"):
+        path_rows, extra = run(path, args)
+        rows += path_rows
+        totals.append(extra)
+    title = f"{args.sessions} sessions x {args.requests} requests, {args.rpm} RPM / {args.tpm} TPM"
+    common.print_table(title, rows)
+    common.print_table("Totals", totals)
+
+if __name__ == "__main__":
+    main()
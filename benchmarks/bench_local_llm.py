@@ -0,0 +1,93 @@
+# benchmarks/bench_local_llm.py
+# Local CPU fallback model: tokens/sec and throughput with 1..N concurrent sessions, one request
+# per generate() call vs. dynamic batching. Needs torch and transformers (and the model, which is
+# downloaded on first use); without them only the failover part runs. That part puts FallbackLLM
+# in front of a fake Groq that goes down and then turns slow, to time the switch to the local path.
+#   python benchmarks/bench_local_llm.py --sessions 1 2 4 8 --max-new-tokens 64
+import argparse
+import importlib.util
+import threading
+import time
+import common
+import groq
+import httpx
+from fakes import FakeLLM
+from utils.llm import FallbackLLM
+
+PROMPT = "I had a stressful day at work and can't switch off. What is one thing I could try tonight?"
+
+# Fake Groq client that raises connection errors while `down` is set
+class FlakyGroq(FakeLLM):
+    down = False
+
+    def _call(self, prompt):
+        if self.down:
+            raise groq.APIConnectionError(request=httpx.Request("POST", "https://api.groq.com/openai/v1/chat"))
+        return super()._call(prompt)
+
+def failover(args):
+    primary = FlakyGroq("From Groq.", latency=0.05)
+    local = FakeLLM("From the local model.", latency=0.2)
+    llm = FallbackLLM(primary, lambda: local, latency_threshold=1.0, cooldown=60)
+    rows = []
+    for phase in ("healthy", "network down", "still in cooldown"):
+        primary.down = phase != "healthy"
+        start = time.perf_counter()
+        reply = llm.invoke(PROMPT).content
+        rows.append({"groq": phase, "served_by": "local" if reply == local.reply else "groq",
+                     "seconds": time.perf_counter() - start})
+
+    # Groq answering but slowly: the latency average crosses the threshold and later calls go local
+    slow = FakeLLM("From slow Groq.", latency=args.slow_latency)
+    llm = FallbackLLM(slow, lambda: local, latency_threshold=args.slow_latency / 2, cooldown=60)
+    for call in range(3):
+        start = time.perf_counter()
+        reply = llm.invoke(PROMPT).content
+        rows.append({"groq": f"slow, call {call + 1}", "served_by": "local" if reply == local.reply else "groq",
+                     "seconds": time.perf_counter() - start})
+    common.print_table("Failover from a fake Groq endpoint", rows)
+
+def throughput(args):
+    from utils.local_llm import LocalLLM
+
+    rows = []
+    for max_batch in (1, args.max_batch):
+        llm = LocalLLM(args.model, max_batch=max_batch, max_new_tokens=args.max_new_tokens)
+        llm.invoke("Hello")  # warm-up: first generate() pays one-off setup costs
+        for sessions in args.sessions:
+            before = llm.stats()
+            threads = [threading.Thread(target=llm.invoke, args=(f"{PROMPT} ({n})",)) for n in range(sessions)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            after = llm.stats()
+            tokens = after["generated_tokens"] - before["generated_tokens"]
+            batches = after["batches"] - before["batches"]
+            rows.append({"max_batch": max_batch, "sessions": sessions, "wall_s": elapsed,
+                         "tokens_per_s": tokens / elapsed, "requests_per_s": sessions / elapsed,
+                         "mean_batch": sessions / batches if batches else 0.0})
+    common.print_table(f"{args.model} on CPU, {args.max_new_tokens} new tokens per request", rows)
+
+def main():
+    from utils.local_llm import LOCAL_MODEL
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=LOCAL_MODEL)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--slow-latency", type=float, default=0.5, help="fake Groq latency in the slow case")
+    args = parser.parse_args()
+
+    failover(args)
+    missing = [name for name in ("torch", "transformers") if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"\nSkipping the local model throughput run: {', '.join(missing)} not installed")
+        return
+    throughput(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/bench_media.py
+# Bytes per mood-music play: the old player, which passed the MP3's path to st.video on every
+# click, vs. play_track from the media library. Each play is one run of the player. Reported:
+#   file_opens     times the track's file (or its low-bitrate copy) was opened during the play
+#   disk_bytes     bytes of it read from disk: each open reads the whole file
+#   message_bytes  serialized size of the page elements sent over the websocket
+#   media_url      the media endpoint URL the player fetches, keyed by a hash of the content
+#   media_bytes    size of the file behind that URL; a client that already has the URL can reuse it
+# The remote (YouTube) tracks are served by YouTube, so they send no media bytes from the app.
+#   python benchmarks/bench_media.py --plays 5
+import argparse
+import os
+import shutil
+import sys
+import common
+from streamlit.testing.v1 import AppTest
+from bench_history_render import page_bytes
+from utils.media import get_media_library
+import phase6_mood_music  # imported up front so its import cost isn't counted in the first play
+
+LOCAL_MOOD = "😐 Neutral"
+REMOTE_MOOD = "😊 Happy"
+
+# ---- Before: the repo-root MP3 handed to st.video on every click ---- #
+def legacy_player(path):
+    import streamlit as st
+    st.video(path)
+
+def player(mood, data_saver):
+    import phase6_mood_music
+    phase6_mood_music.play_track(mood, data_saver)
+
+# Audio files opened by this process: path -> count (an audit hook sees every open() call)
+opened = {}
+
+def count_opens(event, args):
+    if event == "open" and isinstance(args[0], str) and args[0].endswith(".mp3"):
+        path = os.path.abspath(args[0])
+        opened[path] = opened.get(path, 0) + 1
+
+def play(page, args, media_bytes):
+    at = AppTest.from_function(page, args=args, default_timeout=60)
+    opened.clear()
+    at.run()
+    assert not at.exception, at.exception
+    proto = next(iter(at.main.children.values())).proto
+    url = getattr(proto, "url", "")
+    return {"file_opens": sum(opened.values()),
+            "disk_bytes": sum(count * os.path.getsize(path) for path, count in opened.items()),
+            "message_bytes": page_bytes(at.main),
+            "media_url": url.rsplit("/", 1)[-1] if "/media/" in url else url, "media_bytes": media_bytes}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--plays", type=int, default=5)
+    args = parser.parse_args()
+
+    sys.addaudithook(count_opens)
+    library = get_media_library()
+    path = os.path.join(common.ROOT, library.manifest[LOCAL_MOOD]["file"])
+    file_size = os.path.getsize(path)
+    low_size = library.handle(LOCAL_MOOD, low_bitrate=True).size
+    get_media_library.clear()  # start the library cold again
+
+    rows = []
+    for name, page, page_args, size in (
+        ("before: st.video(path)", legacy_player, (path,), file_size),
+        ("library, local file", player, (LOCAL_MOOD, False), file_size),
+        ("library, data saver", player, (LOCAL_MOOD, True), low_size),
+        ("library, remote track", player, (REMOTE_MOOD, False), 0),
+    ):
+        for number in range(args.plays):
+            rows.append(dict({"player": name, "play": number + 1}, **play(page, page_args, size)))
+    note = "ffmpeg found" if shutil.which("ffmpeg") else "no ffmpeg here, so data saver serves the original file"
+    common.print_table(f"Per-play bytes for {os.path.basename(path)} ({file_size} bytes; {note})", rows)
+    common.print_table("Media library after all plays", [get_media_library().stats()])
+
+if __name__ == "__main__":
+    main()
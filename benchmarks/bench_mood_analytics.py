@@ -0,0 +1,111 @@
+# benchmarks/bench_mood_analytics.py
+# Dashboard analytics over a large mood log: the vectorized utils.mood_analytics functions vs.
+# plain Python loops that parse every date with strptime, as the dashboard used to.
+# Each pair is checked to give the same answer before it is timed.
+#   python benchmarks/bench_mood_analytics.py --entries 1000000
+import argparse
+import datetime
+import math
+import random
+import common
+import numpy as np
+from utils import mood_analytics
+from utils.mood_aggregates import mood_numeric
+
+MOODS = list(mood_numeric)
+
+# ---- Pure-Python reference implementations ---- #
+def py_parse(dates, moods):
+    return [(datetime.datetime.strptime(d, "%Y-%m-%d").date(), m) for d, m in zip(dates, moods)]
+
+def py_daily_scores(entries):
+    sums = {}
+    for day, mood in entries:
+        total, count = sums.get(day, (0, 0))
+        sums[day] = (total + mood_numeric.get(mood, 3), count + 1)
+    return {day: total / count for day, (total, count) in sorted(sums.items())}
+
+def py_rolling_average(entries, window):
+    daily = py_daily_scores(entries)
+    days = list(daily)
+    result, day = {}, days[0]
+    while day <= days[-1]:
+        values = [daily[d] for d in (day - datetime.timedelta(days=k) for k in range(window)) if d in daily]
+        result[day] = sum(values) / len(values) if values else math.nan
+        day += datetime.timedelta(days=1)
+    return result
+
+def py_weekday_heatmap(entries):
+    counts = [[0] * len(MOODS) for _ in range(7)]
+    for day, mood in entries:
+        if mood in mood_numeric:
+            counts[day.weekday()][MOODS.index(mood)] += 1
+    return counts
+
+def py_streaks(entries):
+    days = sorted({day for day, _ in entries})
+    longest = run = 1
+    for previous, day in zip(days, days[1:]):
+        run = run + 1 if (day - previous).days == 1 else 1
+        longest = max(longest, run)
+    return longest
+
+def py_volatility(entries):
+    scores = list(py_daily_scores(entries).values())
+    changes = [b - a for a, b in zip(scores, scores[1:])]
+    mean = sum(changes) / len(changes)
+    return math.sqrt(sum((c - mean) ** 2 for c in changes) / len(changes))
+
+def py_transitions(entries):
+    moods = [mood for _, mood in entries if mood in mood_numeric]
+    counts = [[0] * len(MOODS) for _ in MOODS]
+    for a, b in zip(moods, moods[1:]):
+        counts[MOODS.index(a)][MOODS.index(b)] += 1
+    return [[c / sum(row) if sum(row) else 0.0 for c in row] for row in counts]
+
+def log(entries):
+    rng = random.Random(0)
+    first = datetime.date(2000, 1, 1)
+    # About ten years of history however many entries, with the odd skipped day so streaks break
+    per_day = max(1, entries // 3650)
+    dates, day = [], first
+    while len(dates) < entries:
+        day += datetime.timedelta(days=2 if rng.random() < 0.05 else 1)
+        dates += [day.isoformat()] * rng.randint(1, 2 * per_day)
+    return dates[:entries], [rng.choice(MOODS) for _ in range(entries)]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=1000000)
+    args = parser.parse_args()
+
+    dates, moods = log(args.entries)
+    entries = py_parse(dates, moods)
+    frame = mood_analytics.to_frame(dates, moods)
+
+    rolling = mood_analytics.rolling_averages(frame, (7,))["7d"]
+    py_rolling = py_rolling_average(entries, 7)
+    assert np.allclose(rolling.to_numpy(), list(py_rolling.values()), equal_nan=True)
+    assert mood_analytics.weekday_heatmap(frame).to_numpy().tolist() == py_weekday_heatmap(entries)
+    assert mood_analytics.streaks(frame, today=entries[-1][0])["longest"] == py_streaks(entries)
+    assert math.isclose(mood_analytics.volatility(frame), py_volatility(entries))
+    assert np.allclose(mood_analytics.transition_matrix(frame).to_numpy(), py_transitions(entries))
+
+    cases = [
+        ("columns from the log", lambda: mood_analytics.to_frame(dates, moods), lambda: py_parse(dates, moods)),
+        ("7/30-day rolling averages", lambda: mood_analytics.rolling_averages(frame),
+         lambda: (py_rolling_average(entries, 7), py_rolling_average(entries, 30))),
+        ("weekday x mood heatmap", lambda: mood_analytics.weekday_heatmap(frame), lambda: py_weekday_heatmap(entries)),
+        ("streaks", lambda: mood_analytics.streaks(frame), lambda: py_streaks(entries)),
+        ("volatility", lambda: mood_analytics.volatility(frame), lambda: py_volatility(entries)),
+        ("transition matrix", lambda: mood_analytics.transition_matrix(frame), lambda: py_transitions(entries)),
+    ]
+    rows = []
+    for name, vectorized, loop in cases:
+        fast, _ = common.best_of(vectorized)
+        slow, _ = common.best_of(loop, repeat=1)
+        rows.append({"computation": name, "vectorized_s": fast, "python_loop_s": slow, "speedup": slow / fast})
+    common.print_table(f"Mood analytics over {args.entries} entries", rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/bench_mood_store.py
+# Dashboard render and mood summary time as one user's log grows, served from the SQLite
+# mood store, next to the old full scan of a session-state list of dicts.
+#   python benchmarks/bench_mood_store.py --sizes 1000 10000 100000
+import argparse
+import datetime
+import random
+import sqlite3
+import time
+import common
+from streamlit.testing.v1 import AppTest
+from utils.mood_store import DB_PATH, MoodStore, get_mood_store
+
+MOODS = ["😊 Happy", "😐 Neutral", "😰 Anxious", "😢 Sad", "😠 Angry"]
+
+def seed(uid, size):
+    rng = random.Random(size)
+    first = datetime.date.today() - datetime.timedelta(days=size // 3)
+    rows = [(uid, (first + datetime.timedelta(days=i // 3)).isoformat(), rng.choice(MOODS), f"note {i}")
+            for i in range(size)]
+    # A separate connection, like another replica writing: the store picks the rows up on its next read
+    with sqlite3.connect(DB_PATH) as conn:
+        conn.executemany("INSERT INTO mood_log (uid, date, mood, note) VALUES (?, ?, ?, ?)", rows)
+    return [{"date": date, "mood": mood, "note": note} for _, date, mood, note in rows]
+
+# What the tracker and PDF export did before: count moods by scanning the whole session list
+def legacy_summary(logs):
+    summary = {}
+    for entry in logs:
+        summary[entry["mood"]] = summary.get(entry["mood"], 0) + 1
+    return summary
+
+def dashboard_page():
+    import phase4_dashboard
+    phase4_dashboard.show_dashboard()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    MoodStore(DB_PATH)  # creates the schema
+    store = get_mood_store()
+    rows = []
+    for size in args.sizes:
+        uid = f"bench-{size}"
+        logs = seed(uid, size)
+        # First read builds the user's running aggregates from the log
+        cold, _ = common.best_of(lambda: store.mood_counts(uid), repeat=1)
+        summary, _ = common.best_of(lambda: store.mood_counts(uid), args.repeat)
+        latest, _ = common.best_of(lambda: store.latest_per_day(uid, 7), args.repeat)
+        legacy, _ = common.best_of(lambda: legacy_summary(logs), args.repeat)
+
+        at = AppTest.from_function(dashboard_page, default_timeout=120)
+        at.session_state["_uid"] = uid
+        at.run()
+        assert not at.exception, at.exception
+        render, _ = common.best_of(at.run, args.repeat)
+        # One new entry moves the version, so the next render rebuilds the frame and figure
+        store.append(uid, datetime.date.today().isoformat(), "😊 Happy")
+        start = time.perf_counter()
+        at.run()
+        after_append = time.perf_counter() - start
+
+        rows.append({"entries": size, "first_read_s": cold, "summary_s": summary, "latest_7_days_s": latest,
+                     "legacy_summary_s": legacy, "dashboard_rerun_s": render, "rerun_after_log_s": after_append})
+    common.print_table("Mood store, one user's log", rows)
+
+if __name__ == "__main__":
+    main()
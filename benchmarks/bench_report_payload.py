@@ -0,0 +1,89 @@
+# benchmarks/bench_report_payload.py
+# Daily, weekly and full-history reports from the shared layout engine: render time, PDF size and
+# the bytes each way of offering the file puts in the page. The old dashboard inlined the PDF as a
+# base64 data: link; st.download_button sends only a media URL and serves the bytes on click.
+#   python benchmarks/bench_report_payload.py --entries 2000
+import argparse
+import datetime
+import random
+import time
+import common
+from streamlit.testing.v1 import AppTest
+from utils.mood_store import get_mood_store
+from utils.reports import REPORT_TITLES, generate_report, render_report, report_period
+
+MOODS = ["😊 Happy", "😐 Neutral", "😰 Anxious", "😢 Sad", "😠 Angry"]
+
+# ---- Before: fpdf daily report and a base64 anchor (fpdf is no longer a dependency) ---- #
+def legacy_daily_pdf(date, mood, note):
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=14)
+    pdf.cell(200, 10, txt="Daily Mood Report", ln=True, align="C")
+    pdf.ln(10)
+    pdf.set_font("Arial", size=12)
+    pdf.cell(200, 10, txt=f"Date: {date}", ln=True)
+    pdf.cell(200, 10, txt=f"Mood: {mood}", ln=True)
+    pdf.multi_cell(0, 10, txt=f"Note: {note}")
+    return pdf.output(dest="S").encode("latin1")
+
+def inline_link_page(data):
+    import streamlit as st
+    import base64
+    b64 = base64.b64encode(data).decode()
+    st.markdown(f'<a href="data:application/octet-stream;base64,{b64}" download="mood_report.pdf">'
+                "📥 Download Mood Report as PDF</a>", unsafe_allow_html=True)
+
+def download_button_page(data):
+    import streamlit as st
+    st.download_button("📥 Download Report", data=data, file_name="mood_report.pdf", mime="application/pdf")
+
+# Serialized size of the page element that offers the file
+def element_bytes(page, data, kind):
+    at = AppTest.from_function(page, args=(data,), default_timeout=60).run()
+    assert not at.exception, at.exception
+    return at.get(kind)[0].proto.ByteSize()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=2000)
+    args = parser.parse_args()
+
+    store = get_mood_store()
+    uid = f"bench-payload-{args.entries}"
+    rng = random.Random(0)
+    today = datetime.date.today()
+    for i in range(args.entries):
+        date = (today - datetime.timedelta(days=(args.entries - 1 - i) // 3)).isoformat()
+        store.append(uid, date, rng.choice(MOODS), f"Slept {rng.randint(4, 9)} hours, walked for a while.")
+
+    # Same (type, period, log version) again: served from the finished job, nothing is re-rendered.
+    # Run before any AppTest, which swaps out __main__ that spawned worker processes re-import.
+    generate_report(store, uid, "full")
+    cached, _ = common.best_of(lambda: generate_report(store, uid, "full"))
+
+    rows = []
+    try:
+        start = time.perf_counter()
+        data = legacy_daily_pdf(today.isoformat(), "😊 Happy", "Slept 7 hours")
+        rows.append({"report": "legacy daily (fpdf)", "render_s": time.perf_counter() - start,
+                     "pdf_bytes": len(data), "base64_link_bytes": element_bytes(inline_link_page, data, "markdown"),
+                     "download_button_bytes": "n/a"})
+    except ImportError:
+        print("fpdf is not installed; skipping the legacy daily report")
+
+    for report_type in ("daily", "weekly", "full"):
+        start_date, end_date = report_period(report_type, today)
+        seconds, data = common.best_of(
+            lambda: render_report(store, uid, REPORT_TITLES[report_type], start_date, end_date), repeat=1
+        )
+        rows.append({"report": report_type, "render_s": seconds, "pdf_bytes": len(data),
+                     "base64_link_bytes": element_bytes(inline_link_page, data, "markdown"),
+                     "download_button_bytes": element_bytes(download_button_page, data, "download_button")})
+
+    common.print_table(f"Reports for a {args.entries}-entry log", rows)
+    print(f"\nRepeat request for the full report (cached job): {cached * 1000:.3f} ms")
+
+if __name__ == "__main__":
+    main()
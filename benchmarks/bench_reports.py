@@ -0,0 +1,130 @@
+# benchmarks/bench_reports.py
+# PDF report generation for a large log: render time and peak traced memory for the full
+# history and for date ranges, the cached re-request, and the old BytesIO generator.
+#   python benchmarks/bench_reports.py --entries 10000
+import argparse
+import datetime
+import random
+import time
+from io import BytesIO
+import common
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from utils.mood_store import get_mood_store
+from utils.reports import REPORT_TITLES, generate_report, render_report, report_period, split_text
+
+MOODS = ["😊 Happy", "😐 Neutral", "😰 Anxious", "😢 Sad", "😠 Angry"]
+WORDS = "today I felt tired but the walk in the park and a call with my sister helped a lot".split()
+
+# ---- Before: whole report in a BytesIO, notes wrapped by rebuilding the line string ---- #
+def legacy_split_text(text, max_chars):
+    lines, line = [], ""
+    for word in text.split():
+        if len(line + " " + word) <= max_chars:
+            line += " " + word if line else word
+        else:
+            lines.append(line)
+            line = word
+    if line:
+        lines.append(line)
+    return lines
+
+def legacy_generate_pdf(log_data):
+    buffer = BytesIO()
+    p = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    y = height - 50
+    p.setFont("Helvetica-Bold", 18)
+    p.drawString(50, y, "🧠 MindMates Mood Log Report")
+    y -= 50
+    mood_summary = {}
+    for entry in log_data:
+        mood_summary[entry["mood"]] = mood_summary.get(entry["mood"], 0) + 1
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(50, y, f"Total Entries: {len(log_data)}")
+    y -= 20
+    p.setFont("Helvetica", 11)
+    for mood, count in mood_summary.items():
+        p.drawString(70, y, f"{mood}: {count}")
+        y -= 15
+    y -= 40
+    for entry_number, entry in enumerate(reversed(log_data), 1):
+        if y < 100:
+            p.showPage()
+            y = height - 50
+        p.setFillColor(colors.darkblue)
+        p.setFont("Helvetica-Bold", 12)
+        p.drawString(50, y, f"{entry_number}. {entry['date']} — {entry['mood']}")
+        y -= 20
+        if entry["note"]:
+            p.setFont("Helvetica", 11)
+            p.setFillColor(colors.black)
+            for line in legacy_split_text(entry["note"], 85):
+                p.drawString(70, y, "📝 " + line)
+                y -= 15
+            y -= 5
+        p.setFillColor(colors.grey)
+        p.line(50, y, width - 50, y)
+        y -= 25
+    p.save()
+    buffer.seek(0)
+    return buffer
+
+def seed(store, uid, entries):
+    rng = random.Random(entries)
+    today = datetime.date.today()
+    logs = []
+    for i in range(entries):
+        date = (today - datetime.timedelta(days=(entries - i) // 3)).isoformat()
+        note = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 60)))
+        logs.append(store.append(uid, date, rng.choice(MOODS), note))
+    return logs
+
+def run(fn):
+    start = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - start
+    # Traced separately: tracemalloc slows the render itself down
+    with common.measured() as memory:
+        fn()
+    return seconds, memory["peak_bytes"], result
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=10000)
+    args = parser.parse_args()
+
+    store = get_mood_store()
+    uid = f"bench-report-{args.entries}"
+    logs = seed(store, uid, args.entries)
+    today = datetime.date.today()
+
+    rows = []
+    month_start = (today - datetime.timedelta(days=29)).isoformat()
+    cases = [
+        ("legacy full (BytesIO)", lambda: legacy_generate_pdf(logs).getvalue()),
+        ("full", lambda: render_report(store, uid, REPORT_TITLES["full"])),
+        ("last 30 days", lambda: render_report(store, uid, REPORT_TITLES["full"], month_start, today.isoformat())),
+        ("weekly", lambda: render_report(store, uid, REPORT_TITLES["weekly"], *report_period("weekly", today))),
+    ]
+    for name, fn in cases:
+        seconds, peak, data = run(fn)
+        rows.append({"report": name, "seconds": seconds, "peak_mib": peak / 2 ** 20, "pdf_kib": len(data) / 1024})
+
+    # Through the job executor: the first request renders in a worker process, the repeat is served
+    # from the finished job because the log version hasn't moved
+    for name in ("full via job (first)", "full via job (repeat)"):
+        start = time.perf_counter()
+        data = generate_report(store, uid, "full")
+        rows.append({"report": name, "seconds": time.perf_counter() - start, "peak_mib": "n/a",
+                     "pdf_kib": len(data) / 1024})
+    common.print_table(f"Reports for a {args.entries}-entry log", rows)
+
+    note = " ".join(random.Random(0).choice(WORDS) for _ in range(200000))
+    wrap = [{"wrapper": name, "seconds": common.best_of(lambda: fn(note, 85))[0]}
+            for name, fn in (("legacy split_text", legacy_split_text), ("split_text", split_text))]
+    common.print_table("Wrapping one 200k-word note", wrap)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# benchmarks/bench_routine_store.py
+# Routine save/load latency with a large routine history, SQLite routine store vs. the old
+# pandas read-filter-rewrite of routines.csv, plus concurrent saves from many sessions.
+#   python benchmarks/bench_routine_store.py --rows 1000000
+import argparse
+import datetime
+import os
+import sqlite3
+import threading
+import time
+import common
+import pandas as pd
+from utils.routine_store import RoutineStore
+
+ACTIVITIES = ["🌞 Morning Meditation", "📓 Journaling", "🚶‍♂️ Light Walk or Yoga", "📴 Digital Detox Time",
+              "🫶 Affirmations", "🎧 Music Therapy", "🌿 Mindful Eating", "🧘‍♂️ Meditate"]
+
+# ---- Before: one CSV for everyone, rewritten on every save ---- #
+def legacy_save_routine(path, date, selected_activities):
+    df = pd.DataFrame({"date": [date] * len(selected_activities), "activity": selected_activities})
+    if os.path.exists(path):
+        existing = pd.read_csv(path)
+        existing = existing[existing["date"] != date]
+        df = pd.concat([existing, df], ignore_index=True)
+    df.to_csv(path, index=False)
+
+def legacy_load_today_routine(path, date):
+    if os.path.exists(path):
+        df = pd.read_csv(path)
+        return df[df["date"] == date]["activity"].tolist()
+    return []
+
+def days(count):
+    first = datetime.date(2000, 1, 1)
+    return [(first + datetime.timedelta(days=i)).isoformat() for i in range(count)]
+
+def seed_csv(path, rows):
+    dates = days(rows // len(ACTIVITIES))
+    pd.DataFrame({"date": [d for d in dates for _ in ACTIVITIES], "activity": ACTIVITIES * len(dates)}).to_csv(
+        path, index=False
+    )
+    return dates
+
+# Same number of rows spread over many users, written straight to the table
+def seed_store(path, rows, users):
+    store = RoutineStore(path)
+    dates = days(rows // len(ACTIVITIES) // users)
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO routines (uid, date, position, activity, completed) VALUES (?, ?, ?, ?, ?)",
+            ((f"user-{u}", d, p, a, p % 2) for u in range(users) for d in dates for p, a in enumerate(ACTIVITIES))
+        )
+    return store, dates
+
+# Each thread saves its own new day; returns (seconds, saves that raised, days that were lost)
+def concurrent_saves(save, load, sessions):
+    new_days = [f"2100-01-{i + 1:02d}" for i in range(sessions)]
+    errors = []
+
+    def session(day):
+        try:
+            save(day)
+        except Exception as e:  # e.g. pandas reading a file another session is halfway through writing
+            errors.append(e)
+
+    threads = [threading.Thread(target=session, args=(day,)) for day in new_days]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    return seconds, len(errors), sum(not load(day) for day in new_days)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--sessions", type=int, default=16, help="concurrent saves")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    csv_path, db_path = common.scratch_path("routines.csv"), common.scratch_path("routines.db")
+    dates = seed_csv(csv_path, args.rows)
+    store, store_dates = seed_store(db_path, args.rows, args.users)
+    day, store_day = dates[len(dates) // 2], store_dates[len(store_dates) // 2]
+    routine = dict.fromkeys(ACTIVITIES, False)
+
+    rows = [
+        {"path": "legacy pandas CSV",
+         "load_ms": common.best_of(lambda: legacy_load_today_routine(csv_path, day), args.repeat)[0] * 1000,
+         "save_ms": common.best_of(lambda: legacy_save_routine(csv_path, day, ACTIVITIES), args.repeat)[0] * 1000},
+        {"path": "routine store",
+         "load_ms": common.best_of(lambda: store.load_day("user-7", store_day), args.repeat * 100)[0] * 1000,
+         "save_ms": common.best_of(lambda: store.save_day("user-7", store_day, routine), args.repeat * 100)[0] * 1000},
+    ]
+    common.print_table(f"One day's routine with {args.rows} rows of history", rows)
+
+    # Sessions racing on the same file: the CSV path reads, filters and rewrites the whole file,
+    # so concurrent saves overwrite each other; the store upserts each day in its own transaction
+    small_csv = common.scratch_path("routines-small.csv")
+    seed_csv(small_csv, 10000)
+    legacy = concurrent_saves(lambda d: legacy_save_routine(small_csv, d, ACTIVITIES),
+                              lambda d: legacy_load_today_routine(small_csv, d), args.sessions)
+    stored = concurrent_saves(lambda d: RoutineStore(db_path).save_day("racer", d, routine),
+                              lambda d: store.load_day("racer", d), args.sessions)
+    common.print_table(f"{args.sessions} sessions saving at once", [
+        {"path": "legacy pandas CSV (10k rows)", "seconds": legacy[0], "failed_saves": legacy[1], "days_lost": legacy[2]},
+        {"path": "routine store", "seconds": stored[0], "failed_saves": stored[1], "days_lost": stored[2]},
+    ])
+
+if __name__ == "__main__":
+    main()
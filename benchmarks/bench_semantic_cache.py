@@ -0,0 +1,72 @@
+# benchmarks/bench_semantic_cache.py
+# Companion semantic reply cache over a synthetic message corpus: mostly rephrasings of a few
+# common worries plus unrelated one-offs, spread over the companion's tones. For each similarity
+# threshold it reports hit rate, model calls, model time saved (each stored reply is recorded as
+# taking --reply-seconds, a typical Groq reply), lookup overhead and index memory.
+# Uses the hashing embedder unless --model is given.
+#   python benchmarks/bench_semantic_cache.py --messages 5000 --thresholds 0.8 0.85 0.9 0.95
+import argparse
+import random
+import time
+import common
+from fakes import FakeLLM, HashEmbedder
+from utils.semantic_cache import SemanticCache
+from phase3_ai_companion import tone_for
+
+WORRIES = ["i feel anxious about work", "i can't sleep at night", "i feel lonely today",
+           "my exams stress me out", "i had a fight with my friend", "i feel unmotivated",
+           "i'm so happy today", "i am worried about money"]
+FILLERS = ["really", "so", "a bit", "today", "lately", "honestly", "again"]
+TONE_MOODS = ["Anxious", "Sad", "Happy", "Calm"]
+
+def corpus(messages, repeat_share, seed=0):
+    rng = random.Random(seed)
+    for _ in range(messages):
+        mood = rng.choice(TONE_MOODS)
+        if rng.random() < repeat_share:
+            words = rng.choice(WORRIES).split()
+            words.insert(rng.randrange(len(words) + 1), rng.choice(FILLERS))
+            yield mood, " ".join(words)
+        else:
+            # Made-up words, so one-offs share nothing with each other or with the common worries
+            yield mood, " ".join("".join(rng.choice("bcdfghklmnprstvz") for _ in range(6)) for _ in range(6))
+
+def run(args, threshold, embedder):
+    llm = FakeLLM("That sounds hard. Let's take it one breath at a time.")
+    cache = SemanticCache(embedder=embedder, threshold=threshold, max_entries=args.max_entries)
+    lookups = []
+    start = time.perf_counter()
+    for mood, message in corpus(args.messages, args.repeat_share):
+        # Same scope the companion uses for a reply that saw no conversation history
+        scope = (tone_for(mood), None)
+        lookup_start = time.perf_counter()
+        reply, vector = cache.lookup(scope, message)
+        lookups.append(time.perf_counter() - lookup_start)
+        if reply is None:
+            cache.store(scope, message, llm.invoke(message).content, args.reply_seconds, vector)
+    stats = cache.stats()
+    return {"threshold": threshold, "hit_rate": stats["hit_rate"], "model_calls": llm.calls,
+            "seconds_saved": stats["seconds_saved"], "wall_s": time.perf_counter() - start,
+            "lookup_p95_ms": common.percentile(lookups, 0.95) * 1000,
+            "entries": stats["entries"], "index_kib": stats["index_bytes"] / 1024}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--repeat-share", type=float, default=0.7, help="share of messages that rephrase a common worry")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.8, 0.85, 0.9, 0.95])
+    parser.add_argument("--max-entries", type=int, default=2048)
+    parser.add_argument("--reply-seconds", type=float, default=1.2, help="model time recorded per stored reply")
+    parser.add_argument("--model", action="store_true", help="embed with the real sentence-transformers model")
+    args = parser.parse_args()
+
+    if args.model:
+        from utils.journal_index import get_embedder
+        embedder = get_embedder()
+    else:
+        embedder = HashEmbedder()
+    rows = [run(args, threshold, embedder) for threshold in args.thresholds]
+    common.print_table(f"Semantic cache, {args.messages} messages, {type(embedder).__name__}", rows)
+
+if __name__ == "__main__":
+    main()
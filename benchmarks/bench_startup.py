@@ -0,0 +1,73 @@
+# benchmarks/bench_startup.py
+# Startup cost: cold import time of each phase module and its heavy dependencies (from
+# `python -X importtime`), and time to the first render of main.py with lazily loaded tabs vs.
+# importing every phase module up front as main.py used to. Each measurement is a fresh interpreter.
+#   python benchmarks/bench_startup.py
+import argparse
+import os
+import subprocess
+import sys
+import common
+
+PHASE_MODULES = ["phase1_mood_tracker", "phase2_journal_coping", "phase3_ai_companion",
+                 "phase4_dashboard", "phase5_personalized_tips", "phase6_mood_music"]
+HEAVY_MODULES = ["streamlit", "pandas", "plotly.graph_objects", "reportlab.pdfgen.canvas",
+                 "langchain_core.prompts", "langchain_groq", "faiss"]
+
+# Runs code in a new interpreter from the repository root; returns (ok, stdout, stderr)
+def python(code, *flags):
+    result = subprocess.run([sys.executable, *flags, "-c", code], cwd=common.ROOT, env=os.environ,
+                            capture_output=True, text=True)
+    return result.returncode == 0, result.stdout, result.stderr
+
+# Cumulative import time of `module` in microseconds, as reported by -X importtime
+def import_time(module):
+    ok, _, stderr = python(f"import {module}", "-X", "importtime")
+    if not ok:
+        return None
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and line.split("|")[-1].strip() == module:
+            return int(line.split("|")[1])
+    return None
+
+# "Before" imports every phase module up front, as main.py used to; a failed import fails the run
+FIRST_RENDER = """
+import importlib, time
+start = time.perf_counter()
+for module in {eager}:
+    importlib.import_module(module)
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("main.py", default_timeout=120)
+at.session_state["_uid"] = "bench-startup"
+at.session_state["active_tab"] = {tab!r}
+at.run()
+assert not at.exception, at.exception
+print(time.perf_counter() - start)
+"""
+
+def first_render(tab, eager):
+    ok, stdout, stderr = python(FIRST_RENDER.format(eager=eager, tab=tab))
+    if not ok:
+        raise RuntimeError(f"first render of {tab} failed:\n{stderr}")
+    return float(stdout.split()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = []
+    for module in HEAVY_MODULES + PHASE_MODULES:
+        samples = [sample for sample in (import_time(module) for _ in range(args.repeat)) if sample is not None]
+        rows.append({"module": module, "cumulative_ms": min(samples) / 1000 if samples else "import failed"})
+    common.print_table(f"Cold import time (best of {args.repeat}, -X importtime cumulative)", rows)
+
+    rows = []
+    for tab in ("📍 Mood Tracker", "🏠 Dashboard", "🌟 Wellness Tips"):
+        for name, eager in (("before: every phase imported", PHASE_MODULES), ("after: lazy tabs", [])):
+            samples = [first_render(tab, eager) for _ in range(args.repeat)]
+            rows.append({"tab": tab, "startup": name, "first_render_s": min(samples)})
+    common.print_table("Interpreter start to first render of main.py", rows)
+
+if __name__ == "__main__":
+    main()
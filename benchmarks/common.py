@@ -0,0 +1,72 @@
+# benchmarks/common.py
+# Shared setup for the benchmark scripts. Run them from anywhere, e.g.
+#   python benchmarks/bench_journal_concurrency.py
+# They use the offline fakes from tests/fakes.py instead of Groq and sentence-transformers.
+import contextlib
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tests"))
+
+# Stores opened with their default paths write to a throwaway directory, never the real database
+SCRATCH = tempfile.mkdtemp(prefix="mindmate-bench-")
+os.environ.setdefault("MINDMATE_DB", os.path.join(SCRATCH, "mindmate.db"))
+os.environ.setdefault("MINDMATE_JOURNAL_INDEX", os.path.join(SCRATCH, "journal.faiss"))
+
+from fakes import FakeLLM
+
+# A fake whose invoke() returns the whole reply only after the time streaming it would take,
+# like a real model generating the full completion before answering
+class GeneratingLLM(FakeLLM):
+    def invoke(self, prompt):
+        reply = self.reply(prompt) if callable(self.reply) else self.reply
+        time.sleep(self.token_latency * (len(reply.split(" ")) - 1))
+        return super().invoke(prompt)
+
+def scratch_path(name):
+    return os.path.join(SCRATCH, name)
+
+def percentile(samples, q):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+# Best wall time of `repeat` calls, and the last result
+def best_of(fn, repeat=3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+# Yields a dict that holds "seconds" and "peak_bytes" (traced Python allocations) once the block exits
+@contextlib.contextmanager
+def measured():
+    stats = {}
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        yield stats
+    finally:
+        stats["seconds"] = time.perf_counter() - start
+        stats["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+# Prints rows of dicts as an aligned table; floats get four significant digits
+def print_table(title, rows):
+    print(f"\n{title}")
+    if not rows:
+        return
+    columns = list(rows[0])
+    cells = [[f"{row[c]:.4g}" if isinstance(row[c], float) else str(row[c]) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(line[i]) for line in cells)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for line in cells:
+        print("  ".join(cell.ljust(w) for cell, w in zip(line, widths)))
@@ -1,54 +1,74 @@
 #All the necesaary imports are here 
+import os
+import time
 import streamlit as st
-from phase1_mood_tracker import show_mood_tracker
-from phase2_journal_coping import mood_journal_and_coping_tools
-from phase3_ai_companion import ai_companion_chat
-from phase4_dashboard import show_dashboard
-from phase5_personalized_tips import show_wellness_tips
-from phase6_mood_music import mood_to_music
+from utils.lazy_loader import load, import_times
+from utils.user_state import get_user_state
+from utils import profiling
+
+render_start = time.perf_counter()
 
 # Page configuration
 st.set_page_config(page_title="MindMate", layout="centered")
 st.title("🧘 MindMate: Your AI Companion for Mental Wellness")
 
-# Determine which tab to activate
-default_tab_index = 1 if st.session_state.get("redirect_to_music") else 0
-
-tabs = st.tabs([
-    "📍 Mood Tracker",
-    "🎵 Mood Music",
-    "📔 Journal & Coping",
-    "🧠 AI Companion",
-    "🏠 Dashboard",
-    "🌟 Wellness Tips"
-])
-
-tab1, tab2, tab3, tab4, tab5, tab6 = tabs
+# Each tab's phase module (and its langchain/plotly/reportlab imports) loads on first visit
+pages = {
+    "📍 Mood Tracker": ("phase1_mood_tracker", "show_mood_tracker"),
+    "🎵 Mood Music": ("phase6_mood_music", "mood_to_music"),
+    "📔 Journal & Coping": ("phase2_journal_coping", "mood_journal_and_coping_tools"),
+    "🧠 AI Companion": ("phase3_ai_companion", "ai_companion_chat"),
+    "🏠 Dashboard": ("phase4_dashboard", "show_dashboard"),
+    "🌟 Wellness Tips": ("phase5_personalized_tips", "show_wellness_tips"),
+}
 
-# Phase 1
-with tab1:
-    show_mood_tracker()
+# With MINDMATE_LOGIN=1 (and an [auth] section in .streamlit/secrets.toml) users sign in
+# and their data is keyed by their login instead of a browser cookie
+if os.getenv("MINDMATE_LOGIN") and not st.user.get("is_logged_in"):
+    st.button("🔐 Log in", on_click=st.login)
+    st.stop()
 
-# Phase 6 - Auto-play based on redirected mood
-with tab2:
-    mood_to_music()
+# Per-user state shared by every app replica (see utils/user_state.py)
+user_state = get_user_state()
 
-# Phase 2
-with tab3:
-    mood_journal_and_coping_tools()
+# Determine which tab to activate; Phase 6 auto-plays based on redirected mood
+if user_state.get("redirect_to_music"):
+    st.session_state["active_tab"] = "🎵 Mood Music"
 
-# Phase 3
-with tab4:
-    ai_companion_chat()
+# Unlike st.tabs, only the selected page runs, so hidden tabs build no PDFs, plots or LLM clients
+active_tab = st.radio("Navigate", list(pages), horizontal=True, key="active_tab", label_visibility="collapsed")
+module_name, function_name = pages[active_tab]
+load(module_name, function_name)()
 
-# Phase 4
-with tab5:
-    show_dashboard()
+# Reset redirect after switching
+if user_state.get("redirect_to_music"):
+    user_state["redirect_to_music"] = False
 
-# Phase 5
-with tab6:
-    show_wellness_tips()
+# Developer view of startup cost and the shared LLM client pool
+if os.getenv("MINDMATE_DEBUG"):
+    with st.sidebar.expander("🔧 Startup"):
+        st.json({
+            "import_seconds": {name: round(seconds, 4) for name, seconds in import_times.items()},
+            "render_seconds": round(time.perf_counter() - render_start, 4)
+        })
+    with st.sidebar.expander("🔧 LLM client pool"):
+        st.json(load("utils.llm", "llm_pool_stats")())
+    with st.sidebar.expander("🔧 User state"):
+        st.json(dict(load("utils.user_state", "get_state_writer")().stats(), uid=user_state.uid,
+                     version=user_state.version))
+    with st.sidebar.expander("🔧 Background jobs"):
+        st.json(load("utils.jobs", "get_job_executor")().stats())
+    with st.sidebar.expander("🔧 LLM scheduler"):
+        st.json(load("utils.llm_scheduler", "get_llm_scheduler")().stats())
+    if "utils.semantic_cache" in import_times:
+        with st.sidebar.expander("🔧 Companion reply cache"):
+            st.json(load("utils.semantic_cache", "get_semantic_cache")().stats())
+    if "phase6_mood_music" in import_times:
+        with st.sidebar.expander("🔧 Music insight cache"):
+            st.json(load("phase6_mood_music", "get_insight_cache")().stats())
+        with st.sidebar.expander("🔧 Media library"):
+            st.json(load("utils.media", "get_media_library")().stats())
 
-# Reset redirect after switching
-if st.session_state.get("redirect_to_music"):
-    st.session_state.redirect_to_music = False
+# Hidden per-function timings, LLM latency and token counts (MINDMATE_PROFILE=1)
+if profiling.ENABLED:
+    profiling.show_profiling_sidebar()
@@ -1,100 +1,50 @@
 import streamlit as st
 import datetime
-from io import BytesIO
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib import colors
-
-def split_text(text, max_chars):
-    words = text.split()
-    lines, line = [], ""
-    for word in words:
-        if len(line + " " + word) <= max_chars:
-            line += " " + word if line else word
-        else:
-            lines.append(line)
-            line = word
-    if line:
-        lines.append(line)
-    return lines
-
-def generate_summary(logs):
-    mood_count = {}
-    for entry in logs:
-        mood = entry["mood"]
-        mood_count[mood] = mood_count.get(mood, 0) + 1
-    return mood_count
-
-#Function to generate the pdf
-def generate_pdf(log_data):
-    buffer = BytesIO()
-    p = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-    y = height - 50
-
-    # Title
-    p.setFont("Helvetica-Bold", 18)
-    p.drawString(50, y, "🧠 MindMates Mood Log Report")
-    y -= 20
-    p.setFont("Helvetica-Oblique", 10)
-    p.drawString(50, y, f"Generated on: {datetime.datetime.now().strftime('%B %d, %Y - %I:%M %p')}")
-    y -= 30
-
-    # Summary
-    mood_summary = generate_summary(log_data)
-    total_logs = len(log_data)
-
-    p.setFont("Helvetica-Bold", 12)
-    p.drawString(50, y, f"Total Entries: {total_logs}")
-    y -= 20
-
-    p.setFont("Helvetica", 11)
-    for mood, count in mood_summary.items():
-        p.drawString(70, y, f"{mood}: {count}")
-        y -= 15
-
-    y -= 10
-    p.line(50, y, width - 50, y)
-    y -= 30
-
-    # Log Entries
-    p.setFont("Helvetica", 12)
-    entry_number = 1
-    for entry in reversed(log_data):
-        if y < 100:
-            p.showPage()
-            y = height - 50
-            p.setFont("Helvetica", 12)
-
-        p.setFillColor(colors.darkblue)
-        p.setFont("Helvetica-Bold", 12)
-        p.drawString(50, y, f"{entry_number}. {entry['date']} — {entry['mood']}")
-        y -= 20
-
-        if entry['note']:
-            p.setFont("Helvetica", 11)
-            p.setFillColor(colors.black)
-            wrapped_lines = split_text(entry['note'], 85)
-            for line in wrapped_lines:
-                p.drawString(70, y, "📝 " + line)
-                y -= 15
-            y -= 5
-
-        p.setFillColor(colors.grey)
-        p.line(50, y, width - 50, y)
-        y -= 25
-        entry_number += 1
-
-    p.save()
-    buffer.seek(0)
-    return buffer
+import functools
+import html
+from utils.mood_store import get_mood_store
+from utils.reports import report_download_button
+from utils.user_state import current_uid
+from utils.profiling import profiled
+
+HISTORY_PAGE_SIZE = 20
+
+# Entries never change once logged, so each card's HTML is built once per process.
+# Everything the user typed is escaped: the cards are rendered with unsafe_allow_html.
+@functools.lru_cache(maxsize=4096)
+def entry_html(date, mood, note):
+    return (
+        '<div style="background-color:teal; padding:12px; border-radius:10px; margin-bottom:10px;">'
+        f'<strong>{html.escape(date)}</strong><br>'
+        f'Mood: <span style="font-size:18px;">{html.escape(mood)}</span><br>'
+        f'{"📝 " + html.escape(note) if note else ""}'
+        '</div>'
+    )
+
+# Only the current page is queried and sent; older pages are fetched by keyset cursor on request.
+# A fragment, so paging through the history doesn't rerun the form or the report controls.
+@st.fragment
+def mood_history(store, uid):
+    cursors = st.session_state.setdefault("history_cursors", [None])
+    entries, next_cursor = store.page(uid, cursors[-1], HISTORY_PAGE_SIZE)
+    st.markdown("".join(entry_html(e["date"], e["mood"], e["note"]) for e in entries), unsafe_allow_html=True)
+
+    newer_col, page_col, older_col = st.columns([1, 2, 1])
+    # Callbacks move the cursor before the fragment reruns, so the click needs no extra rerun
+    if len(cursors) > 1:
+        newer_col.button("⬅️ Newer", on_click=cursors.pop)
+    pages = -(-store.count(uid) // HISTORY_PAGE_SIZE)
+    page_col.caption(f"Page {len(cursors)} of {pages}")
+    if next_cursor:
+        older_col.button("Older ➡️", on_click=cursors.append, args=(next_cursor,))
 
 #Main mood tracker function
+@profiled()
 def show_mood_tracker():
     st.title("🧠 Mood Tracker")
 
-    if "mood_log" not in st.session_state:
-        st.session_state["mood_log"] = []
+    store = get_mood_store()
+    uid = current_uid()
 
     with st.form("mood_form", clear_on_submit=True):
         moods = ["😊 Happy", "😐 Neutral", "😰 Anxious", "😢 Sad", "😠 Angry"]
@@ -103,35 +53,44 @@ def show_mood_tracker():
         submitted = st.form_submit_button("Log Mood")
 
         if submitted:
-            entry = {
-                "date": datetime.date.today().isoformat(),
-                "mood": mood,
-                "note": note.strip()
-            }
-            st.session_state["mood_log"].append(entry)
+            entry = store.append(uid, datetime.date.today().isoformat(), mood, note.strip())
             st.success(f"Mood logged for {entry['date']} — {entry['mood']}")
+            st.session_state["history_cursors"] = [None]
+            # A report prepared before this entry is out of date
+            st.session_state["pdf_requested"] = None
 
-    if st.session_state["mood_log"]:
+    if store.count(uid):
         st.markdown("---")
         st.subheader("📅 Mood Log History")
 
-        for entry in reversed(st.session_state["mood_log"]):
-            st.markdown(f"""
-            <div style="background-color:teal; padding:12px; border-radius:10px; margin-bottom:10px;">
-                <strong>{entry['date']}</strong><br>
-                Mood: <span style="font-size:18px;">{entry['mood']}</span><br>
-                {"📝 " + entry['note'] if entry['note'] else ""}
-            </div>
-            """, unsafe_allow_html=True)
-
-        # Download PDF button
-        pdf = generate_pdf(st.session_state["mood_log"])
-        st.download_button(
-            label="📥 Download Mood Report as PDF",
-            data=pdf,
-            file_name="MindMates_Mood_Log.pdf",
-            mime="application/pdf"
-        )
+        mood_history(store, uid)
+
+        # PDF report, built on demand
+        st.markdown("---")
+        report_types = {"Full history": "full", "This week": "weekly", "Today": "daily"}
+        report_type = report_types[st.radio("Report", list(report_types), horizontal=True)]
+
+        start = end = None
+        if report_type == "full":
+            first_day = datetime.date.fromisoformat(store.aggregates(uid).days[0])
+            period = st.date_input("Report period", value=(first_day, datetime.date.today()))
+            if not isinstance(period, tuple):
+                period = (period,)
+            start = period[0].isoformat() if period else None
+            end = period[1].isoformat() if len(period) > 1 else None
+
+        # Half-picked range (only a start date so far): nothing to build yet
+        incomplete = report_type == "full" and (start is None or end is None)
+        if incomplete:
+            st.caption("Pick an end date to prepare the report.")
+
+        # The request is remembered with its type and period, so changing either hides the old report
+        request = (report_type, start, end)
+        if st.button("📄 Prepare PDF Report", disabled=incomplete):
+            st.session_state["pdf_requested"] = request
+
+        if not incomplete and st.session_state.get("pdf_requested") == request:
+            report_download_button(store, uid, report_type, start, end, cancel_key="pdf_requested")
 
 # Run the app
 if __name__ == "__main__":
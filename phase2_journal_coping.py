@@ -1,67 +1,102 @@
 # phase2_journal_coping.py
 import streamlit as st
-from langchain_groq import ChatGroq
-from langchain.prompts import PromptTemplate
-from dotenv import load_dotenv
+from langchain_core.prompts import PromptTemplate
+from concurrent.futures import ThreadPoolExecutor
+from utils.llm import get_llm
+from utils.llm_scheduler import get_llm_scheduler, PRIORITY_JOURNAL, PRIORITY_BATCH
+from utils.journal_index import get_journal_index, format_past_entries
+from utils.journal_import import parse_entries, get_import_store, job_id_for, run_import
+from utils.jobs import get_job_executor, wait_for_job
+from utils.user_state import current_uid
+from utils.profiling import profiled
+import datetime
+import functools
+import queue
 import os
 
-# Load environment variables
-load_dotenv()
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+# Send both prompts at once and stream tokens as they arrive (set MINDMATE_STREAM=0 for the sequential path)
+STREAM_RESPONSES = os.getenv("MINDMATE_STREAM", "1") != "0"
 
-# Initialize LLM
-llm = ChatGroq(
-    model_name="llama3-8b-8192",
-    api_key=GROQ_API_KEY
-)
-
-def mood_journal_and_coping_tools():
-    st.set_page_config(page_title="🧠 Mood Journal & Coping Tools", layout="centered")
-    st.title("🧘 Mood Journal & Coping Assistant")
-
-    mood = st.selectbox(
-        "How are you feeling today?",
-        ["😊 Happy", "😢 Sad", "😠 Angry", "😰 Anxious", "😐 Neutral"]
-    )
-
-    journal_entry = st.text_area("Write about your day:", height=200, placeholder="Let your thoughts flow...")
-
-    if st.button("Reflect & Recommend"):
-        if not journal_entry.strip():
-            st.warning("Please write something in your journal entry.")
-        else:
-            with st.spinner("Processing your emotions gently... 🌿"):
-                # Reflection
-                reflection_prompt = PromptTemplate.from_template("""
+# Prompt templates
+reflection_prompt = PromptTemplate.from_template("""
 You are a compassionate mental wellness assistant. Read the user's mood and journal.
 Reply with a warm, 1-2 line reflection that validates the mood.
+If related past entries are listed, you may gently connect to them.
 
 Mood: {mood}
 Journal Entry: {journal}
+
+Related past entries:
+{past_entries}
 """)
-                reflection = llm.invoke(reflection_prompt.format(mood=mood, journal=journal_entry))
-                reflection_text = reflection.content if hasattr(reflection, 'content') else str(reflection)
 
-                # Coping Suggestions - PROMPT IMPROVED HERE
-                coping_prompt = PromptTemplate.from_template("""
+# Coping Suggestions - PROMPT IMPROVED HERE
+coping_prompt = PromptTemplate.from_template("""
 You are a mental wellness coach. Based on the user's mood and journal entry, suggest exactly 3 practical coping strategies.
 Format your response EXACTLY like this example (include the numbers and dashes):
 
 1. [Strategy 1 - specific action]
-2. [Strategy 2 - specific action] 
+2. [Strategy 2 - specific action]
 3. [Strategy 3 - specific action]
 
 Mood: {mood}
 Journal Entry: {journal}
+
+Related past entries (for context, do not repeat them):
+{past_entries}
 """)
-                coping = llm.invoke(coping_prompt.format(mood=mood, journal=journal_entry))
-                coping_text = coping.content if hasattr(coping, 'content') else str(coping)
 
-            # Display results
-            emoticon, emotion = mood.split(" ", 1)
-            
-            st.markdown("### 🌸 Reflection")
-            st.markdown(f"""
+# Sequential path: one round-trip after the other
+def run_sequential(prompts):
+    llm = get_llm()
+    scheduler = get_llm_scheduler()
+    return {key: scheduler.invoke(llm, text, PRIORITY_JOURNAL) for key, text in prompts.items()}
+
+# Concurrent path: every prompt is streamed from its own worker thread.
+# Yields (key, chunk) pairs in arrival order; Streamlit calls stay on the script thread.
+def stream_concurrently(prompts):
+    llm = get_llm()
+    scheduler = get_llm_scheduler()
+    chunks = queue.Queue()
+    done = object()
+
+    def worker(key, text):
+        try:
+            for chunk in scheduler.stream(llm, text, PRIORITY_JOURNAL):
+                chunks.put((key, chunk))
+        except Exception as e:
+            chunks.put((key, e))
+        finally:
+            chunks.put((key, done))
+
+    with ThreadPoolExecutor(max_workers=len(prompts)) as pool:
+        for key, text in prompts.items():
+            pool.submit(worker, key, text)
+
+        remaining = len(prompts)
+        while remaining:
+            key, chunk = chunks.get()
+            if chunk is done:
+                remaining -= 1
+            elif isinstance(chunk, Exception):
+                raise chunk
+            else:
+                yield key, chunk
+
+# Reflection and coping strategies for one imported entry, queued behind interactive requests
+def reflect_imported_entry(entry):
+    llm = get_llm()
+    scheduler = get_llm_scheduler()
+    futures = [
+        scheduler.submit_prompt(llm, template.format(mood=entry["mood"], journal=entry["text"], past_entries="(none)"),
+                                PRIORITY_BATCH)
+        for template in (reflection_prompt, coping_prompt)
+    ]
+    return tuple(future.result() for future in futures)
+
+def render_reflection(placeholder, reflection_text, mood):
+    emoticon, emotion = mood.split(" ", 1)
+    placeholder.markdown(f"""
             <div style="
                 background: linear-gradient(to right, #fceabb, #f8b500);
                 padding: 20px;
@@ -75,22 +110,135 @@ Journal Entry: {journal}
             </div>
             """, unsafe_allow_html=True)
 
+def render_coping(placeholder, coping_text):
+    # Display strategies - IMPROVED OUTPUT HANDLING
+    with placeholder.container():
+        if coping_text:
+            # Clean up the response and ensure we get exactly 3 strategies
+            strategies = [line.strip() for line in coping_text.split('\n')
+                        if line.strip() and line[0].isdigit()]
+            if len(strategies) >= 3:
+                for strategy in strategies[:3]:
+                    st.markdown(f"✨ {strategy}")
+            else:
+                # Fallback if format wasn't followed
+                st.markdown(coping_text)
+        else:
+            st.warning("Couldn't generate coping strategies. Please try again.")
+
+@profiled()
+def mood_journal_and_coping_tools():
+    st.set_page_config(page_title="🧠 Mood Journal & Coping Tools", layout="centered")
+    st.title("🧘 Mood Journal & Coping Assistant")
+
+    mood = st.selectbox(
+        "How are you feeling today?",
+        ["😊 Happy", "😢 Sad", "😠 Angry", "😰 Anxious", "😐 Neutral"]
+    )
+
+    journal_entry = st.text_area("Write about your day:", height=200, placeholder="Let your thoughts flow...")
+
+    if st.button("Reflect & Recommend"):
+        if not journal_entry.strip():
+            st.warning("Please write something in your journal entry.")
+        else:
+            # Only the few most similar past entries go into the prompts, not the whole history.
+            # Retrieval is optional: without the embedding model the reflection runs without it.
+            uid = current_uid()
+            try:
+                journal_index = get_journal_index()
+                past_entries = format_past_entries(journal_index.search(uid, journal_entry, k=3))
+            except Exception:
+                journal_index, past_entries = None, "(none)"
+            prompts = {
+                "reflection": reflection_prompt.format(mood=mood, journal=journal_entry, past_entries=past_entries),
+                "coping": coping_prompt.format(mood=mood, journal=journal_entry, past_entries=past_entries),
+            }
+
+            if not STREAM_RESPONSES:
+                with st.spinner("Processing your emotions gently... 🌿"):
+                    results = run_sequential(prompts)
+
+            # Display results
+            st.markdown("### 🌸 Reflection")
+            reflection_box = st.empty()
+
             st.markdown("### 🧰 Coping Tools")
             st.markdown("Here are a few calming strategies just for you:")
-            
-            # Display strategies - IMPROVED OUTPUT HANDLING
-            if coping_text:
-                # Clean up the response and ensure we get exactly 3 strategies
-                strategies = [line.strip() for line in coping_text.split('\n') 
-                            if line.strip() and line[0].isdigit()]
-                if len(strategies) >= 3:
-                    for strategy in strategies[:3]:
-                        st.markdown(f"✨ {strategy}")
-                else:
-                    # Fallback if format wasn't followed
-                    st.markdown(coping_text)
+            coping_box = st.empty()
+
+            if STREAM_RESPONSES:
+                results = {key: "" for key in prompts}
+                for key, chunk in stream_concurrently(prompts):
+                    results[key] += chunk
+                    if key == "reflection":
+                        render_reflection(reflection_box, results[key], mood)
+                    else:
+                        coping_box.markdown(results[key])
+
+            render_reflection(reflection_box, results["reflection"], mood)
+            render_coping(coping_box, results["coping"])
+
+            if journal_index is not None:
+                journal_index.add_entry(uid, datetime.date.today().isoformat(), mood, journal_entry.strip())
             else:
-                st.warning("Couldn't generate coping strategies. Please try again.")
+                st.caption("Past entries are unavailable right now, so this one won't be used in future reflections.")
+
+    journal_import_tools()
+
+# Runs in the job executor, so a long import keeps going while the user moves between tabs;
+# progress is reported to the job, and cancelling stops it at the next finished entry
+def import_journal(store, journal_index, uid, filename, data, entries, concurrency, job):
+    def on_progress(done, total, rate):
+        job.report(done / total if total else 1.0, f"{done} / {total} entries processed · {rate:.2f} entries/sec")
+
+    # Imported entries also become searchable context for future reflections
+    return run_import(store, job_id_for(uid, data), filename, entries, reflect_imported_entry,
+                      concurrency=concurrency, on_progress=on_progress,
+                      on_batch=functools.partial(journal_index.add_entries, uid))
+
+# Bulk import of past journals: every entry gets a reflection and coping tools, checkpointed per entry
+def journal_import_tools():
+    with st.expander("📥 Import past journals"):
+        st.caption("CSV or JSONL with date, mood and text columns, or Markdown with one `## YYYY-MM-DD — mood` heading per entry.")
+        upload = st.file_uploader("Journal export", type=["csv", "jsonl", "md"])
+        concurrency = st.slider("Entries processed at once", 1, 8, 4)
+        executor = get_job_executor()
+        store = get_import_store()
+
+        if upload is not None and st.button("Start / Resume Import"):
+            data = upload.getvalue()
+            try:
+                entries = list(parse_entries(upload.name, data))
+            except (ValueError, UnicodeDecodeError) as e:
+                st.error(f"Couldn't read that file: {e}")
+                return
+            uid = current_uid()
+            import_id = job_id_for(uid, data)
+            # Pressing the button again while the import runs returns the running job
+            st.session_state["import_job"] = (import_id, executor.submit(
+                import_journal, store, get_journal_index(), uid, upload.name, data, entries, concurrency,
+                key=("import", import_id), label="Importing journals", pass_job=True
+            ))
+
+        if not st.session_state.get("import_job"):
+            return
+        import_id, job_id = st.session_state["import_job"]
+        job = executor.job(job_id)
+        if job is None:
+            st.session_state["import_job"] = None
+            return
+        if job.state in ("queued", "running"):
+            wait_for_job(job_id, cancel_key="import_job")
+            return
+        if job.state != "done":
+            st.error(f"The import stopped early: {job.error}. Start it again to resume where it left off.")
+            return
+
+        done, total = job.result()
+        st.success(f"Imported {done} of {total} entries. 🌿")
+        for result in store.results(import_id, limit=5):
+            st.markdown(f"**{result['date']} — {result['mood']}**  \n💬 {result['reflection'].strip()}")
 
 if __name__ == "__main__":
-    mood_journal_and_coping_tools()
\ No newline at end of file
+    mood_journal_and_coping_tools()
@@ -1,23 +1,59 @@
 import streamlit as st
 import random
 import datetime
-from langchain_groq import ChatGroq
-from langchain.chains import ConversationChain
-from langchain.memory import ConversationBufferMemory
+import os
+import time
 from langchain_core.prompts import PromptTemplate
+from utils.llm import get_llm
+from utils.llm_scheduler import get_llm_scheduler, PRIORITY_CHAT, PRIORITY_SUMMARY
+from utils.chat_memory import ChatMemory, get_chat_history_store
+from utils.user_state import current_uid, get_user_state
+from utils.lazy_loader import load
+from utils.profiling import profiled
+
+# Exchanges (user message and reply) rendered per page of the transcript
+CHAT_PAGE_TURNS = 15
+# Semantic reply cache; off by default, and its FAISS/embedding imports only load when it is on
+SEMANTIC_CACHE = os.getenv("MINDMATE_SEMANTIC_CACHE") == "1"
+
+# Rolls turns that no longer fit the memory budget into the running summary
+summary_prompt = PromptTemplate.from_template("""
+Summarize this conversation between a user and MindMate, a supportive AI companion.
+Keep the user's feelings, concerns and anything they asked MindMate to remember. Use at most 5 sentences.
+
+Summary so far: {summary}
+
+New messages:
+{transcript}
+
+Updated summary:
+""")
+
+def summarize_conversation(previous_summary, transcript):
+    return get_llm_scheduler().invoke(
+        get_llm(temperature=0),
+        summary_prompt.format(summary=previous_summary or "(none)", transcript=transcript),
+        PRIORITY_SUMMARY
+    )
 
-# Initialize model
-llm = ChatGroq(temperature=0.7, model_name="llama3-8b-8192")
-memory = ConversationBufferMemory(return_messages=True)
-
-# Daily reset: initialize chat history only if date changed
-today_str = datetime.date.today().isoformat()
-if st.session_state.get("last_chat_date") != today_str:
-    st.session_state["messages"] = []
-    st.session_state["last_chat_date"] = today_str
-
-# Mood-aware prompt template
-def build_prompt(mood):
+# Today's token-budgeted memory. The transcript is read from the chat store a page at a time;
+# ChatMemory stays per session and is rebuilt whenever another tab or app replica adds a turn.
+def load_today_chat():
+    today_str = datetime.date.today().isoformat()
+    uid = current_uid()
+    store = get_chat_history_store()
+    # The transcript used to be copied into the shared user state; drop the copy
+    state = get_user_state()
+    if state.get("messages") is not None:
+        state["messages"] = None
+    memory_key = (uid, today_str, store.latest_id(uid, today_str))
+    if st.session_state.get("chat_memory_key") != memory_key:
+        st.session_state["chat_memory"] = ChatMemory(store, uid, today_str, summarize_conversation)
+        st.session_state["chat_memory_key"] = memory_key
+    return st.session_state["chat_memory"]
+
+# Tone the companion answers in for a mood; also part of the semantic reply cache scope
+def tone_for(mood):
     tone_map = {
         "Happy": "cheerful and enthusiastic",
         "Sad": "gentle and compassionate",
@@ -26,7 +62,11 @@ def build_prompt(mood):
         "Calm": "mindful and reflective",
         "Motivated": "encouraging and focused"
     }
-    tone = tone_map.get(mood, "friendly and emotionally supportive")
+    return tone_map.get(mood, "friendly and emotionally supportive")
+
+# Mood-aware prompt template
+def build_prompt(mood):
+    tone = tone_for(mood)
 
     return PromptTemplate(
         input_variables=["history", "input"],
@@ -48,37 +88,65 @@ MindMate:
 def add_emojis_to_response(text):
     return "🤖 MindMate: " + text.strip()
 
+# Yield the reply token by token as it arrives; the raw text is collected into `parts`
+def stream_reply(prompt_text, parts):
+    yield "🤖 MindMate: "
+    for token in get_llm_scheduler().stream(get_llm(temperature=0.7), prompt_text, PRIORITY_CHAT):
+        parts.append(token)
+        yield token
+
+@profiled()
 def ai_companion_chat():
     st.header("🧠 AI Companion Chat - MindMate")
     st.markdown("Feel free to talk to your AI friend. Let it motivate, support, or just listen to you. 💬")
 
     # ✅ Mood-based tone
     mood = st.session_state.get("mood", "Calm")
-    prompt = build_prompt(mood)
-
-    # Use fresh memory every day
-    chat = ConversationChain(prompt=prompt, llm=llm, verbose=False, memory=ConversationBufferMemory())
-
-    # Initialize messages list
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
-
-    # Show past messages
-    for msg in st.session_state.messages:
-        with st.chat_message(msg["role"]):
-            st.markdown(msg["content"])
+    chat_panel(build_prompt(mood), tone_for(mood))
+
+# A fragment, so sending a message or paging back through the transcript reruns only the chat
+@st.fragment
+def chat_panel(prompt, tone):
+    # Token-budgeted memory for today: recent turns verbatim plus a running summary
+    memory = load_today_chat()
+
+    # One page of the transcript; earlier pages are fetched by keyset cursor on request.
+    # Callbacks move the cursor before the fragment reruns, so the click needs no extra rerun.
+    store = memory.store
+    cursors = st.session_state.setdefault(f"chat_cursors_{memory.date}", [None])
+    turns, next_cursor = store.page(memory.uid, memory.date, cursors[-1], CHAT_PAGE_TURNS)
+    if next_cursor:
+        hidden = 2 * store.count(memory.uid, memory.date, next_cursor)
+        st.button(f"⬆️ Show earlier messages ({hidden} hidden)",
+                  on_click=cursors.append, args=(next_cursor,))
+    for turn in turns:
+        st.chat_message("user").markdown(turn["user"])
+        st.chat_message("assistant").markdown(add_emojis_to_response(turn["assistant"]))
+    if len(cursors) > 1:
+        st.button("⬇️ Back to later messages", on_click=cursors.pop)
 
     # Handle user input
     if user_prompt := st.chat_input("Type your message here..."):
         st.chat_message("user").markdown(user_prompt)
 
-        with st.spinner("MindMate is thinking... 💭"):
-            response = chat.predict(input=user_prompt)
-            emoji_response = add_emojis_to_response(response)
-
-        # Show response
-        st.chat_message("assistant").markdown(emoji_response)
-
-        # Store messages
-        st.session_state.messages.append({"role": "user", "content": user_prompt})
-        st.session_state.messages.append({"role": "assistant", "content": emoji_response})
+        # Near-duplicate messages in the same tone reuse an earlier reply (MINDMATE_SEMANTIC_CACHE=1).
+        # A reply that saw no conversation history can go to anyone; one that did stays with its user.
+        history = memory.history()
+        cache = load("utils.semantic_cache", "get_semantic_cache")() if SEMANTIC_CACHE else None
+        scope = (tone, None) if not history else (tone, memory.uid)
+        response, vector = cache.lookup(scope, user_prompt) if cache else (None, None)
+        if response is not None:
+            st.chat_message("assistant").markdown(add_emojis_to_response(response))
+        else:
+            # Stream the response into the chat bubble as it is generated
+            parts = []
+            started = time.perf_counter()
+            with st.chat_message("assistant"):
+                st.write_stream(stream_reply(prompt.format(history=history, input=user_prompt), parts))
+            response = "".join(parts)
+            if cache:
+                cache.store(scope, user_prompt, response, time.perf_counter() - started, vector)
+        turn = memory.add_turn(user_prompt, response.strip())
+        # The next rerun opens on the latest page, which now ends with this exchange
+        st.session_state[f"chat_cursors_{memory.date}"] = [None]
+        st.session_state["chat_memory_key"] = (memory.uid, memory.date, turn["id"])
@@ -1,9 +1,13 @@
 import streamlit as st
-from datetime import datetime
+from datetime import datetime, timedelta
 import random
 import plotly.graph_objects as go
-from fpdf import FPDF
-import base64
+from utils.mood_store import get_mood_store
+from utils.mood_aggregates import mood_numeric
+from utils import mood_analytics
+from utils.reports import report_download_button
+from utils.user_state import current_uid
+from utils.profiling import profiled, timed
 
 # ---- Constants ---- #
 motivational_quotes = [
@@ -21,52 +25,115 @@ goals = [
     "Avoid social media for 1 hour 📵"
 ]
 
-mood_numeric = {
-    "😊 Happy": 5,
-    "😐 Neutral": 3,
-    "😰 Anxious": 2,
-    "😢 Sad": 1,
-    "😠 Angry": 0
+# Days covered by each dashboard view (None = full history)
+views = {
+    "Week": 7,
+    "Month": 30,
+    "All time": None
 }
 
-# ---- PDF Utility ---- #
-def generate_pdf(date, mood, note):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=14)
-    pdf.cell(200, 10, txt="Daily Mood Report", ln=True, align="C")
-    pdf.ln(10)
-    pdf.set_font("Arial", size=12)
-    pdf.cell(200, 10, txt=f"Date: {date}", ln=True)
-    pdf.cell(200, 10, txt=f"Mood: {mood}", ln=True)
-    pdf.multi_cell(0, 10, txt=f"Note: {note}")
-    return pdf.output(dest="S").encode("latin1")
-
-def download_button(pdf_data, filename="mood_report.pdf"):
-    b64 = base64.b64encode(pdf_data).decode()
-    href = f'<a href="data:application/octet-stream;base64,{b64}" download="{filename}">📥 Download Mood Report as PDF</a>'
-    st.markdown(href, unsafe_allow_html=True)
+# Upper bound on points per chart trace; longer histories are downsampled with LTTB
+MAX_CHART_POINTS = 500
+
+# Columnar copy of one user's whole log, rebuilt only when that log changes. A cache_resource,
+# so reruns share the frame instead of unpickling a copy; callers must treat it as read-only.
+@st.cache_resource(max_entries=64, show_spinner=False)
+def load_mood_frame(_store, uid, version):
+    return mood_analytics.to_frame(*_store.columns(uid))
+
+# ---- Mood Trend Chart ---- #
+def build_trend_figure(dates, mood_scores, full_labels):
+    fig = go.Figure(data=go.Scatter(
+        x=dates,
+        y=mood_scores,
+        mode='lines+markers',
+        line=dict(color='#00b4d8', width=4),
+        text=full_labels,
+        hoverinfo='text+y'
+    ))
+    fig.update_layout(
+        yaxis=dict(title='Mood Score (0-5)', range=[0, 5]),
+        xaxis=dict(title='Day of Week'),
+        height=400,
+        plot_bgcolor='#f0f9ff',
+        margin=dict(l=40, r=40, t=40, b=40)
+    )
+    return fig
+
+# Daily mean scores with their 7-day rolling average, for the month and all-time views
+def build_history_figure(daily, rolling):
+    daily_x, daily_y = mood_analytics.downsample_lttb(daily.index.to_numpy(), daily.to_numpy(), MAX_CHART_POINTS)
+    average = rolling["7d"].dropna()
+    average_x, average_y = mood_analytics.downsample_lttb(average.index.to_numpy(), average.to_numpy(), MAX_CHART_POINTS)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=daily_x, y=daily_y, mode='markers', name='Daily mood',
+        marker=dict(color='#00b4d8', size=6)
+    ))
+    fig.add_trace(go.Scatter(
+        x=average_x, y=average_y, mode='lines', name='7-day average',
+        line=dict(color='#0077b6', width=3)
+    ))
+    fig.update_layout(
+        yaxis=dict(title='Mood Score (0-5)', range=[0, 5]),
+        xaxis=dict(title='Date'),
+        height=400,
+        plot_bgcolor='#f0f9ff',
+        margin=dict(l=40, r=40, t=40, b=40)
+    )
+    return fig
+
+# Figure spec per (user, log version, view, day); reruns with an unchanged log reuse it
+@st.cache_data(max_entries=256, show_spinner=False)
+def trend_figure(_store, uid, version, view, today, dates, mood_scores, full_labels):
+    with timed("phase4_dashboard.figure"):
+        if view == "Week":
+            return build_trend_figure(dates, mood_scores, full_labels)
+        days = views[view]
+        frame = mood_analytics.filter_since(
+            load_mood_frame(_store, uid, version),
+            (datetime.fromisoformat(today) - timedelta(days=days - 1)).date() if days else None
+        )
+        return build_history_figure(mood_analytics.daily_scores(frame), mood_analytics.rolling_averages(frame))
+
+def build_matrix_figure(matrix, colorscale, zmax=None):
+    fig = go.Figure(data=go.Heatmap(
+        z=matrix.to_numpy(), x=list(matrix.columns), y=list(matrix.index),
+        colorscale=colorscale, zmin=0, zmax=zmax
+    ))
+    fig.update_layout(height=320, margin=dict(l=40, r=20, t=20, b=40))
+    return fig
+
+def show_mood_patterns(frame):
+    st.markdown("### 🔍 Mood Patterns")
+    streak = mood_analytics.streaks(frame)
+    cols = st.columns(3)
+    cols[0].metric("Current streak", f"{streak['current']} days")
+    cols[1].metric("Longest streak", f"{streak['longest']} days")
+    cols[2].metric("Mood volatility", f"{mood_analytics.volatility(frame):.2f}")
+
+    with st.expander("Weekday × mood and mood transitions"):
+        st.caption("How often each mood was logged on each weekday")
+        st.plotly_chart(build_matrix_figure(mood_analytics.weekday_heatmap(frame), "Blues"), use_container_width=True)
+        st.caption("Chance of the next logged mood (columns) given the current one (rows)")
+        st.plotly_chart(build_matrix_figure(mood_analytics.transition_matrix(frame), "Purples", 1), use_container_width=True)
 
 # ---- Dashboard Tab ---- #
+@profiled()
 def show_dashboard():
     st.title("📊 Daily Wellness Dashboard")
-    mood_log = st.session_state.get("mood_log", [])
+    store = get_mood_store()
+    uid = current_uid()
+    recent_moods = dict(store.latest_per_day(uid, 7))
 
-    if not mood_log:
+    if not recent_moods:
         st.info("📭 No mood data logged yet. Start tracking in the 'Mood Tracker' tab!")
         return
 
-    recent_moods = {}
-    for entry in reversed(mood_log):
-        day = entry["date"]
-        if day not in recent_moods:
-            recent_moods[day] = entry["mood"]
-        if len(recent_moods) >= 7:
-            break
-
     date_keys = list(recent_moods.keys())[::-1]
-    dates = [datetime.strptime(d, "%Y-%m-%d").strftime("%a") for d in date_keys]
-    full_labels = [f"{datetime.strptime(d, '%Y-%m-%d').strftime('%b %d')} - {recent_moods[d]}" for d in date_keys]
+    parsed_dates = [datetime.strptime(d, "%Y-%m-%d") for d in date_keys]
+    dates = [d.strftime("%a") for d in parsed_dates]
+    full_labels = [f"{d.strftime('%b %d')} - {recent_moods[k]}" for d, k in zip(parsed_dates, date_keys)]
     mood_labels = list(recent_moods.values())[::-1]
     mood_scores = [mood_numeric.get(mood, 3) for mood in mood_labels]
 
@@ -87,23 +154,24 @@ def show_dashboard():
 
     # Mood Trend Chart
     st.markdown("### 📈 Mood Trend")
-    fig = go.Figure(data=go.Scatter(
-        x=dates,
-        y=mood_scores,
-        mode='lines+markers',
-        line=dict(color='#00b4d8', width=4),
-        text=full_labels,
-        hoverinfo='text+y'
-    ))
-    fig.update_layout(
-        yaxis=dict(title='Mood Score (0-5)', range=[0, 5]),
-        xaxis=dict(title='Day of Week'),
-        height=400,
-        plot_bgcolor='#f0f9ff',
-        margin=dict(l=40, r=40, t=40, b=40)
+    view = st.radio("View", list(views), horizontal=True, key="dashboard_view")
+    days = views[view]
+    frame = mood_analytics.filter_since(
+        load_mood_frame(store, uid, store.version(uid)),
+        (datetime.today() - timedelta(days=days - 1)).date() if days else None
     )
+    fig = trend_figure(store, uid, store.version(uid), view, datetime.today().date().isoformat(),
+                       dates, mood_scores, full_labels)
     st.plotly_chart(fig, use_container_width=True)
 
+    # Rolling averages come straight from the store's running aggregates
+    avg_cols = st.columns(2)
+    for col, window in zip(avg_cols, (7, 30)):
+        average = store.rolling_average(uid, window)
+        col.metric(f"{window}-day average", f"{average:.1f} / 5" if average is not None else "—")
+
+    show_mood_patterns(frame)
+
     # Goals Checklist
     st.markdown("### 🎯 Wellness Goals for Today")
     for goal in goals:
@@ -134,36 +202,26 @@ def show_mood_tracker():
         note_input = st.text_area("Write a short note about your day (optional):", key="note_input_form")
         submitted = st.form_submit_button("Submit")
 
-    if submitted:
-        today = datetime.today().strftime("%Y-%m-%d")
-        new_entry = {"date": today, "mood": mood, "note": note_input}
-
-        if "mood_log" not in st.session_state:
-            st.session_state.mood_log = []
+    store = get_mood_store()
+    uid = current_uid()
+    today = datetime.today().strftime("%Y-%m-%d")
 
-        st.session_state.mood_log.append(new_entry)
+    if submitted:
+        store.append(uid, today, mood, note_input)
         st.success("✅ Mood logged successfully!")
 
-        # Store latest note for PDF
-        st.session_state.last_note = note_input
-        st.session_state.last_mood = mood
-        st.session_state.last_date = today
-
-    if "last_mood" in st.session_state:
+    if today in store.aggregates(uid).latest_by_day:
         st.markdown("### 📄 Download Today's Mood Report")
-        pdf_bytes = generate_pdf(
-            st.session_state.last_date,
-            st.session_state.last_mood,
-            st.session_state.last_note
-        )
-        download_button(pdf_bytes)
+        report_download_button(store, uid, "daily")
 
 # ---- Main App ---- #
-st.set_page_config(page_title="MindMates Mood Tracker", layout="centered", page_icon="🧠")
-st.sidebar.title("MindMates 🧠")
-tab = st.sidebar.radio("Navigate", ["Mood Tracker", "Dashboard"])
-
-if tab == "Mood Tracker":
-    show_mood_tracker()
-elif tab == "Dashboard":
-    show_dashboard()
+# Only when run on its own; importing this module from main.py must not render anything
+if __name__ == "__main__":
+    st.set_page_config(page_title="MindMates Mood Tracker", layout="centered", page_icon="🧠")
+    st.sidebar.title("MindMates 🧠")
+    tab = st.sidebar.radio("Navigate", ["Mood Tracker", "Dashboard"])
+
+    if tab == "Mood Tracker":
+        show_mood_tracker()
+    elif tab == "Dashboard":
+        show_dashboard()
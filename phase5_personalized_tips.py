@@ -1,77 +1,36 @@
 import streamlit as st
-import random
-import pandas as pd
-import os
 import datetime
+from utils.mood_store import get_mood_store
+from utils.routine_store import get_routine_store
+from utils.tips import get_tips_catalog, user_mood
+from utils.user_state import current_uid, get_user_state
+from utils.profiling import profiled
 
+# Legacy CSV store; imported into the routine database the first time it is opened
 ROUTINE_FILE = "routines.csv"
 
-# Simulated mood context
-def get_user_context():
-    moods = ['Happy', 'Sad', 'Anxious', 'Calm', 'Angry', 'Motivated']
-    return random.choice(moods)
-
-# Generate AI-based tips
-def generate_wellness_tips(mood):
-    tips_database = {
-        "Happy": [
-            "Keep a gratitude journal to savor the good moments 🌼",
-            "Spread positivity — compliment someone today 😊",
-            "Go outdoors and soak in some sunshine ☀️"
-        ],
-        "Sad": [
-            "Try journaling how you feel — let it all out 💙",
-            "Watch your comfort movie or talk to someone you trust 🎬",
-            "Take a short walk to boost your mood 🚶‍♀️"
-        ],
-        "Anxious": [
-            "Practice box breathing (4-4-4-4) for 2 minutes 🧘‍♂️",
-            "Limit social media for a few hours 📵",
-            "Try progressive muscle relaxation 💪"
-        ],
-        "Calm": [
-            "Use this calm to do something creative 🎨",
-            "Practice mindfulness or silent sitting 🙏",
-            "Listen to ambient music and relax 🎵"
-        ],
-        "Angry": [
-            "Try writing a ‘no-send’ letter to vent 🔥",
-            "Engage in physical activity like jumping jacks 🏃",
-            "Splash cold water on your face or hands ❄️"
-        ],
-        "Motivated": [
-            "Channel your energy into a passion project 🚀",
-            "Start your day with a prioritized to-do list ✅",
-            "Set a mini-goal and crush it today 💯"
-        ]
-    }
-    return random.sample(tips_database[mood], 2)
-
-# Save selected routine to CSV
-def save_routine(date, selected_activities):
-    df = pd.DataFrame({
-        "date": [date] * len(selected_activities),
-        "activity": selected_activities
-    })
-
-    if os.path.exists(ROUTINE_FILE):
-        existing = pd.read_csv(ROUTINE_FILE)
-        # Remove existing entry for today before saving
-        existing = existing[existing["date"] != date]
-        df = pd.concat([existing, df], ignore_index=True)
-
-    df.to_csv(ROUTINE_FILE, index=False)
-
-# Load routine for today
+# Mood from the latest mood log entry and recent routine completion
+def get_user_context(date):
+    return user_mood(get_mood_store(), get_routine_store(ROUTINE_FILE), current_uid(), date)
+
+# Ranked tips for the mood; tips seen earlier this session drop behind unseen ones
+def generate_wellness_tips(mood, recency=1.0, seen=(), seed=None):
+    return get_tips_catalog().select(mood, count=2, seen=seen, recency=recency, seed=seed)
+
+# Save today's routine ({activity: completed}), replacing any earlier save for that date
+@profiled()
+def save_routine(date, routine):
+    get_routine_store(ROUTINE_FILE).save_day(current_uid(), date, routine)
+
+# Load routine for today as {activity: completed}
+@profiled()
 def load_today_routine(date):
-    if os.path.exists(ROUTINE_FILE):
-        df = pd.read_csv(ROUTINE_FILE)
-        today_activities = df[df["date"] == date]["activity"].tolist()
-        return today_activities
-    return []
-
-# Daily routine builder UI
-def build_routine(date):
+    return get_routine_store(ROUTINE_FILE).load_day(current_uid(), date)
+
+# Daily routine builder UI. A fragment, so ticking a box or adding an activity reruns only this
+# panel; when that changes the mood the tips were picked for, the whole page is rerun.
+@st.fragment
+def build_routine(date, tips_mood):
     st.subheader("🗓️ Build Your Daily Wellness Routine")
 
     default_options = [
@@ -85,17 +44,27 @@ def build_routine(date):
         "🧘‍♂️ Meditate"
     ]
 
-    if "routine_data" not in st.session_state:
-        st.session_state.routine_data = {activity: False for activity in load_today_routine(date)}
+    # Unsaved edits live in the shared user state, so they survive reconnects and replica hops
+    state = get_user_state()
+    if state.get("routine_date") != date:
+        state["routine_data"] = load_today_routine(date)
+        state["routine_date"] = date
+    routine = state["routine_data"]
 
     # Show existing activities with checkbox to mark complete
-    if st.session_state.routine_data:
+    if routine:
         st.success("✅ Your saved routine for today:")
         to_delete = []
-        for activity, completed in st.session_state.routine_data.items():
+        changed = False
+        for activity, completed in routine.items():
             cols = st.columns([0.08, 0.82, 0.1])
             with cols[0]:
-                st.session_state.routine_data[activity] = st.checkbox("", value=completed, key=f"check_{activity}")
+                checked = st.checkbox("", value=completed, key=f"check_{activity}")
+                if checked != completed:
+                    # Saved activities keep their completion state without another Save click
+                    get_routine_store(ROUTINE_FILE).set_completed(current_uid(), date, activity, checked)
+                    routine[activity] = checked
+                    changed = True
             with cols[1]:
                 st.markdown(f"{'✅' if completed else '🔲'} {activity}")
             with cols[2]:
@@ -103,41 +72,63 @@ def build_routine(date):
                     to_delete.append(activity)
         # Handle deletions
         for act in to_delete:
-            st.session_state.routine_data.pop(act)
+            routine.pop(act)
+        if changed or to_delete:
+            state["routine_data"] = routine
+        if changed:
+            refresh_tips_if_mood_changed(tips_mood)
 
     # Add custom activity
     st.markdown("---")
     st.markdown("**➕ Add a New Activity:**")
-    if "new_activity" not in st.session_state:
-        st.session_state.new_activity = ""
-    new_activity = st.text_input("Type your custom activity:", value=st.session_state.new_activity, key="new_activity_input")
-    if st.button("➕ Add Activity"):
-        if new_activity.strip():
-            st.session_state.routine_data[new_activity.strip()] = False
-            st.session_state.new_activity = ""  # clear input
-            st.success(f"Added: {new_activity.strip()}")
-            st.rerun()
+    st.text_input("Type your custom activity:", key="new_activity_input")
+    st.button("➕ Add Activity", on_click=add_activity, args=(state,))
 
     # Save
     st.markdown("---")
     if st.button("💾 Save Today's Routine"):
-        save_routine(date, list(st.session_state.routine_data.keys()))
+        save_routine(date, routine)
         st.success("Routine saved successfully! ✅")
+        refresh_tips_if_mood_changed(tips_mood)
+
+# Runs before the fragment reruns, so the new activity is already listed when it renders
+def add_activity(state):
+    activity = st.session_state.new_activity_input.strip()
+    if activity:
+        routine = state["routine_data"]
+        routine[activity] = False
+        state["routine_data"] = routine
+        st.session_state.new_activity_input = ""  # clear input
+        st.toast(f"Added: {activity}")
+
+# Routine completion feeds the derived mood; rerun the whole page if it now differs from the tips shown
+def refresh_tips_if_mood_changed(tips_mood):
+    if get_user_context(datetime.date.today())[0] != tips_mood:
+        st.rerun(scope="app")
 
 # Main Phase 5 function
+@profiled()
 def show_wellness_tips():
     st.title("🌟 Personalized Wellness Tips")
 
-    date_today = datetime.date.today().isoformat()
-    mood = get_user_context()
+    today = datetime.date.today()
+    date_today = today.isoformat()
+    mood, recency = get_user_context(today)
     st.markdown(f"**Based on your current mood:** _{mood}_ 💬")
 
-    tips = generate_wellness_tips(mood)
+    # Same tips across reruns until "Get Fresh Tips" moves on to the next round
+    if "seen_tips" not in st.session_state:
+        st.session_state.seen_tips = set()
+        st.session_state.tips_round = 0
+    tips = generate_wellness_tips(mood, recency, st.session_state.seen_tips,
+                                  seed=f"{date_today}:{st.session_state.tips_round}")
     st.subheader("💡 Wellness Tips for You")
-    for tip in tips:
+    for _, tip in tips:
         st.markdown(f"- {tip}")
 
     if st.button("🔄 Get Fresh Tips"):
+        st.session_state.seen_tips.update(i for i, _ in tips)
+        st.session_state.tips_round += 1
         st.rerun()
 
-    build_routine(date_today)
+    build_routine(date_today, mood)
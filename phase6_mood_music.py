@@ -1,10 +1,17 @@
+import os
 import streamlit as st
-from langchain_groq import ChatGroq
 from langchain_core.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from utils.llm import get_llm, DEFAULT_MODEL
+from utils.llm_scheduler import get_llm_scheduler, PRIORITY_MUSIC
+from utils.response_cache import ResponseCache
+from utils.media import get_media_library
+from utils.user_state import get_user_state
+from utils.jobs import get_job_executor, wait_for_job
+from utils.profiling import profiled
 
-# Init model
-llm = ChatGroq(temperature=0.6, model_name="llama3-8b-8192")
+# Bump when the prompt changes so cached insights from the old prompt are not reused
+PROMPT_VERSION = 1
+MUSIC_TEMPERATURE = 0.6
 
 # Prompt template
 prompt = PromptTemplate(
@@ -21,37 +28,82 @@ Respond with:
 """
 )
 
-# Create chain
-chain = LLMChain(llm=llm, prompt=prompt)
+# Mood-to-music mapping lives in media/manifest.json
+mood_music = get_media_library().manifest
 
-# Mood-to-music mapping
-mood_music = {
-    "😊 Happy": "https://www.youtube.com/watch?v=ZbZSe6N_BXs",  # Pharrell - Happy
-    "😢 Sad": "https://www.youtube.com/watch?v=ho9rZjlsyYY",    # Ludovico Einaudi – Nuvole Bianche
-    "😠 Angry": "https://www.youtube.com/watch?v=LatorN4P9aA",  # Linkin Park – Numb
-    "😰 Anxious": "https://www.youtube.com/watch?v=1ZYbU82GVz4",  # Calming music
-    "😐 Neutral": "magical-dramedy-orchestral-sneaky-spell-30-sec-375796.mp3",  # Lo-fi beats
-}
+@profiled()
+def generate_insight(mood):
+    llm = get_llm(temperature=MUSIC_TEMPERATURE)
+    return get_llm_scheduler().invoke(llm, prompt.format(mood=mood), PRIORITY_MUSIC)
 
+def _cache_key(mood):
+    return (mood, PROMPT_VERSION, DEFAULT_MODEL)
+
+# Shared by all sessions; MINDMATE_WARM_MUSIC_CACHE=1 pre-fills one insight per mood at startup
+@st.cache_resource
+def get_insight_cache():
+    cache = ResponseCache(max_keys=32, ttl=6 * 3600, variants=3)
+    if os.getenv("MINDMATE_WARM_MUSIC_CACHE") == "1":
+        cache.warm([_cache_key(mood) for mood in mood_music], lambda key: generate_insight(key[0]))
+    return cache
+
+def music_insight(mood):
+    return get_insight_cache().get(_cache_key(mood), lambda: generate_insight(mood))
+
+@profiled()
 def mood_to_music():
     st.header("🎵 Mood-to-Music Companion")
     st.markdown("Let your emotions flow with music chosen just for how you're feeling. 🎧")
+    music_panel()
 
+# A fragment, so picking a mood or toggling data saver reruns only the player, not the page
+@st.fragment
+def music_panel():
     # Check if coming from mood tracker
     auto_mode = False
     selected_mood = None
 
-    if "redirect_to_music" in st.session_state and st.session_state["redirect_to_music"]:
+    state = get_user_state()
+    if state.get("redirect_to_music"):
         selected_mood = st.session_state.get("mood", "😐 Neutral")
         auto_mode = True
         # Reset the redirect flag so it doesn't trigger again
-        st.session_state["redirect_to_music"] = False
+        state["redirect_to_music"] = False
     else:
         selected_mood = st.selectbox("Select your current mood", list(mood_music.keys()))
 
-    # Trigger auto or manual
+    # Data saver plays the low-bitrate copy of local tracks when one can be made
+    data_saver = st.toggle("Data saver", key="music_data_saver")
+
+    # Trigger auto or manual; the insight is fetched by a background job so the page stays usable
+    executor = get_job_executor()
     if auto_mode or st.button("Get Music & Therapy Insight"):
-        with st.spinner("Finding your musical therapy... 🎶"):
-            response = chain.run(mood=selected_mood)
-            st.video(mood_music[selected_mood])
-            st.markdown(f"🧠 **MindMate says:** {response}")
+        job_id = executor.submit(music_insight, selected_mood, label="Finding your musical therapy... 🎶")
+        st.session_state["music_job"] = (selected_mood, job_id)
+
+    if not st.session_state.get("music_job"):
+        return
+    mood, job_id = st.session_state["music_job"]
+    job = executor.job(job_id)
+    if job is None:
+        st.session_state["music_job"] = None
+        return
+    if job.state in ("queued", "running"):
+        wait_for_job(job_id, cancel_key="music_job")
+        return
+    if job.state != "done":
+        st.error("Couldn't reach MindMate just now. Please try again.")
+        return
+
+    play_track(mood, data_saver)
+    st.markdown(f"🧠 **MindMate says:** {job.result()}")
+
+# Remote tracks are embedded; local ones come from the library's cached handle, so the same
+# bytes (and media URL) are reused on every play
+def play_track(mood, data_saver=False):
+    track = get_media_library().handle(mood, low_bitrate=data_saver)
+    if track.url:
+        st.video(track.url)
+    else:
+        st.audio(track.data, format=track.mime)
+    st.caption(f"🎶 {track.title}")
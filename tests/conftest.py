@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# The app modules live at the repository root and are imported by name (phase1_mood_tracker, utils.*)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Stores opened with their default paths (the app under AppTest) write to a throwaway database
+_scratch = tempfile.mkdtemp(prefix="mindmate-tests-")
+os.environ.setdefault("MINDMATE_DB", os.path.join(_scratch, "mindmate.db"))
+os.environ.setdefault("MINDMATE_JOURNAL_INDEX", os.path.join(_scratch, "journal.faiss"))
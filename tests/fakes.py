@@ -0,0 +1,78 @@
+# Offline stand-ins for the models the app loads at runtime
+import hashlib
+import re
+import threading
+import time
+import numpy as np
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+# Mimics SentenceTransformer: a normalized hashed bag of words, so texts sharing words are similar
+class HashEmbedder:
+    def __init__(self, dim=384):
+        self.dim = dim
+        self.calls = 0
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def encode(self, texts, batch_size=64, normalize_embeddings=True):
+        self.calls += 1
+        vectors = np.zeros((len(texts), self.dim), dtype="float32")
+        for row, text in enumerate(texts):
+            for word in re.findall(r"[a-z']+", text.lower()):
+                vectors[row, int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dim] += 1
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+# One token per space-separated word, so tests don't need tiktoken's downloaded encoding
+class WordEncoding:
+    def encode(self, text):
+        return text.split(" ") if text else []
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+# Raised by FakeLLM to look like Groq's HTTP 429
+class RateLimited(Exception):
+    status_code = 429
+
+# Same invoke/stream surface as ChatGroq. Counts calls and the most calls in flight at once,
+# sleeps `latency` seconds per call and fails the first `rate_limited` calls with a 429.
+# stream() yields one word every `token_latency` seconds after that.
+class FakeLLM:
+    def __init__(self, reply="Take a slow breath with me.", latency=0.0, rate_limited=0,
+                 model_name="fake-llm", temperature=0.7, token_latency=0.0):
+        self.reply = reply
+        self.latency = latency
+        self.token_latency = token_latency
+        self.rate_limited = rate_limited
+        self.model_name = model_name
+        self.temperature = temperature
+        self.calls = 0
+        self.in_flight = self.max_in_flight = 0
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def _call(self, prompt):
+        with self._lock:
+            self.calls += 1
+            self.prompts.append(prompt)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            fail = self.calls <= self.rate_limited
+        try:
+            time.sleep(self.latency)
+            if fail:
+                raise RateLimited("rate limited")
+            return self.reply(prompt) if callable(self.reply) else self.reply
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def invoke(self, prompt):
+        return AIMessage(content=self._call(prompt))
+
+    def stream(self, prompt):
+        for i, word in enumerate(self._call(prompt).split(" ")):
+            if i:
+                time.sleep(self.token_latency)
+            yield AIMessageChunk(content=word + " ")
@@ -0,0 +1,88 @@
+import sqlite3
+import pytest
+from utils import chat_memory
+from utils.chat_memory import ChatHistoryStore, ChatMemory, count_tokens
+from fakes import WordEncoding
+
+@pytest.fixture(autouse=True)
+def word_tokens(monkeypatch):
+    monkeypatch.setattr(chat_memory, "_encoding", WordEncoding)
+
+# Stands in for the summary LLM call; keeps the last few words of each transcript folded in
+def fake_summarize(calls):
+    def summarize(previous, transcript):
+        calls.append(transcript)
+        return f"{previous} {' '.join(transcript.split()[-40:])}"
+    return summarize
+
+def test_history_stays_under_token_budget(tmp_path):
+    store = ChatHistoryStore(str(tmp_path / "chat.db"))
+    calls = []
+    memory = ChatMemory(store, "u1", "2024-01-01", fake_summarize(calls), keep_turns=4,
+                        token_budget=400, summary_budget=80)
+    for i in range(60):
+        memory.add_turn(f"message {i} " + "worry " * 40, f"reply {i} " + "breathe " * 40)
+        assert count_tokens(memory.history()) <= 400
+        assert len(memory.turns) <= 4
+    assert calls
+    assert count_tokens(memory.summary) <= 80
+    # The newest exchange is always kept verbatim
+    assert "message 59" in memory.history()
+
+def test_memory_resumes_from_store(tmp_path):
+    store = ChatHistoryStore(str(tmp_path / "chat.db"))
+    memory = ChatMemory(store, "u1", "2024-01-01", fake_summarize([]), keep_turns=2)
+    for i in range(5):
+        memory.add_turn(f"hello {i}", f"hi {i}")
+    resumed = ChatMemory(store, "u1", "2024-01-01", fake_summarize([]), keep_turns=2)
+    assert resumed.summary == memory.summary
+    assert [turn["user"] for turn in resumed.turns] == ["hello 3", "hello 4"]
+    assert len(store.turns("u1", "2024-01-01")) == 5
+
+def test_users_never_see_each_others_chat(tmp_path):
+    store = ChatHistoryStore(str(tmp_path / "chat.db"))
+    first = ChatMemory(store, "u1", "2024-01-01", fake_summarize([]), keep_turns=1)
+    for i in range(3):
+        first.add_turn(f"private {i}", "noted")
+    second = ChatMemory(store, "u2", "2024-01-01", fake_summarize([]), keep_turns=1)
+    assert second.history() == ""
+    assert store.turns("u2", "2024-01-01") == []
+    assert store.summary("u2", "2024-01-01") == ""
+    assert "private" in store.summary("u1", "2024-01-01")
+
+def test_date_keyed_tables_are_migrated(tmp_path):
+    path = str(tmp_path / "chat.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE chat_turns (id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL, user TEXT NOT NULL,
+                                 assistant TEXT NOT NULL, summarized INTEGER NOT NULL DEFAULT 0);
+        CREATE INDEX idx_chat_turns_date ON chat_turns(date, id);
+        CREATE TABLE chat_summaries (date TEXT PRIMARY KEY, summary TEXT NOT NULL);
+        INSERT INTO chat_turns (date, user, assistant) VALUES ('2024-01-01', 'old', 'turn');
+        INSERT INTO chat_summaries VALUES ('2024-01-01', 'old summary');
+    """)
+    conn.close()
+    store = ChatHistoryStore(path)
+    assert store.summary("", "2024-01-01") == "old summary"
+    assert [turn["user"] for turn in store.turns("", "2024-01-01")] == ["old"]
+    assert store.turns("u1", "2024-01-01") == []
+    store.save_summary("u1", "2024-01-01", "new", [])
+    assert store.summary("u1", "2024-01-01") == "new"
+    assert store.summary("", "2024-01-01") == "old summary"
+
+def test_transcript_pages_by_cursor(tmp_path):
+    store = ChatHistoryStore(str(tmp_path / "chat.db"))
+    for i in range(7):
+        store.append_turn("u1", "2024-01-01", f"hello {i}", f"hi {i}")
+    store.append_turn("u2", "2024-01-01", "someone else", "hi")
+    store.append_turn("u1", "2024-01-02", "next day", "hi")
+    pages, cursor = [], None
+    while True:
+        turns, cursor = store.page("u1", "2024-01-01", cursor, limit=3)
+        pages.append([turn["user"] for turn in turns])
+        if cursor is None:
+            break
+        assert store.count("u1", "2024-01-01", cursor) == 7 - sum(map(len, pages))
+    assert pages == [["hello 4", "hello 5", "hello 6"], ["hello 1", "hello 2", "hello 3"], ["hello 0"]]
+    assert store.latest_id("u1", "2024-01-01") == store.turns("u1", "2024-01-01")[-1]["id"]
+    assert store.latest_id("u3", "2024-01-01") == 0
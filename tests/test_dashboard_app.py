@@ -0,0 +1,34 @@
+import os
+import time
+import uuid
+from streamlit.testing.v1 import AppTest
+from utils.mood_store import get_mood_store
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+def test_dashboard_frame_is_shared_and_follows_the_log():
+    import phase4_dashboard
+
+    uid = uuid.uuid4().hex
+    store = get_mood_store()
+    for day in range(1, 29):
+        store.append(uid, f"2024-02-{day:02d}", "😊 Happy" if day % 2 else "😢 Sad")
+    frame = phase4_dashboard.load_mood_frame(store, uid, store.version(uid))
+    # Same object on the next rerun: no copy is made per read
+    assert phase4_dashboard.load_mood_frame(store, uid, store.version(uid)) is frame
+    assert len(frame) == 28
+    store.append(uid, "2024-02-29", "😐 Neutral")
+    assert len(phase4_dashboard.load_mood_frame(store, uid, store.version(uid))) == 29
+
+def test_dashboard_renders_only_the_users_own_moods():
+    uid = uuid.uuid4().hex
+    get_mood_store().append(uid, time.strftime("%Y-%m-%d"), "😠 Angry")
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.session_state["_uid"] = uid
+    at.session_state["active_tab"] = "🏠 Dashboard"
+    at.run()
+    assert not at.exception
+    assert any("😠 Angry" in markdown.value for markdown in at.markdown)
+    for view in ("Month", "All time"):
+        at.radio(key="dashboard_view").set_value(view).run()
+        assert not at.exception
@@ -0,0 +1,154 @@
+import datetime
+import os
+import time
+import uuid
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+from utils.jobs import get_job_executor
+from utils.mood_store import get_mood_store
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+# Generous bound for one interaction's rerun under AppTest, which always reruns the whole script
+INTERACTION_SECONDS = 5.0
+
+# AppTest has no fragment reruns: every interaction below reruns main.py top to bottom, so the
+# *_smoke tests only check that each fragment's interactions work and stay within
+# INTERACTION_SECONDS. They can't show that the rest of the page was skipped.
+
+def open_tab(tab, uid=None):
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.session_state["_uid"] = uid or uuid.uuid4().hex
+    at.session_state["active_tab"] = tab
+    return at.run()
+
+# Runs one interaction and returns how long its rerun took
+def timed(interaction):
+    start = time.perf_counter()
+    at = interaction()
+    seconds = time.perf_counter() - start
+    assert not at.exception
+    assert seconds < INTERACTION_SECONDS, seconds
+    return seconds
+
+def tips(at):
+    return [markdown.value for markdown in at.markdown if markdown.value.startswith("- ")]
+
+def mood_line(at):
+    return next(markdown.value for markdown in at.markdown if markdown.value.startswith("**Based on"))
+
+def test_routine_panel_smoke():
+    from utils.routine_store import get_routine_store
+    import phase5_personalized_tips
+
+    at = open_tab("🌟 Wellness Tips")
+    shown = tips(at)
+    at.text_input(key="new_activity_input").input("Stretch")
+    timed(lambda: next(b for b in at.button if b.label == "➕ Add Activity").click().run())
+    next(b for b in at.button if b.label == "💾 Save Today's Routine").click().run()
+    timed(lambda: at.checkbox(key="check_Stretch").check().run())
+
+    store = get_routine_store(phase5_personalized_tips.ROUTINE_FILE)
+    today = datetime.date.today().isoformat()
+    assert store.load_day(at.session_state["_uid"], today) == {"Stretch": True}
+    # With no mood logged the tips stay on the default mood
+    assert tips(at) == shown
+
+@pytest.fixture
+def reruns(monkeypatch):
+    import phase5_personalized_tips
+    calls = []
+    monkeypatch.setattr(st, "rerun", lambda **kwargs: calls.append(kwargs))
+    mood = {"now": "Happy"}
+    monkeypatch.setattr(phase5_personalized_tips, "get_user_context", lambda date: (mood["now"], 1.0))
+    return calls, mood
+
+def test_routine_change_reruns_the_app_when_the_tips_mood_changes(reruns):
+    from phase5_personalized_tips import refresh_tips_if_mood_changed
+    calls, mood = reruns
+    mood["now"] = "Motivated"
+    refresh_tips_if_mood_changed("Happy")
+    assert calls == [{"scope": "app"}]
+
+def test_routine_change_stays_in_the_fragment_when_the_mood_holds(reruns):
+    from phase5_personalized_tips import refresh_tips_if_mood_changed
+    calls, _ = reruns
+    refresh_tips_if_mood_changed("Happy")
+    assert calls == []
+
+# The tick is saved while the fragment renders, after the tips were drawn for the old mood, so the
+# header only shows the new mood if the fragment reran the app
+def test_completing_the_routine_updates_the_tips_mood():
+    from utils.routine_store import get_routine_store
+    import phase5_personalized_tips
+
+    uid = uuid.uuid4().hex
+    today = datetime.date.today().isoformat()
+    get_mood_store().append(uid, today, "😊 Happy")
+    get_routine_store(phase5_personalized_tips.ROUTINE_FILE).save_day(uid, today, {"Stretch": False})
+    at = open_tab("🌟 Wellness Tips", uid)
+    assert "_Happy_" in mood_line(at)
+    timed(lambda: at.checkbox(key="check_Stretch").check().run())
+    assert "_Motivated_" in mood_line(at)
+
+def test_history_paging_smoke():
+    uid = uuid.uuid4().hex
+    store = get_mood_store()
+    for day in range(1, 46):
+        store.append(uid, f"2024-01-{(day - 1) % 31 + 1:02d}", "😊 Happy", f"entry {day}")
+    at = open_tab("📍 Mood Tracker", uid)
+    submitted = get_job_executor().counters["submitted"]
+    for page in (2, 3):
+        timed(lambda: next(b for b in at.button if b.label == "Older ➡️").click().run())
+        assert any(caption.value == f"Page {page} of 3" for caption in at.caption)
+    timed(lambda: next(b for b in at.button if b.label == "⬅️ Newer").click().run())
+    assert any(caption.value == "Page 2 of 3" for caption in at.caption)
+    # No report was requested, so paging queues no render
+    assert get_job_executor().counters["submitted"] == submitted
+
+def test_music_mood_choice_smoke():
+    at = open_tab("🎵 Mood Music")
+    submitted = get_job_executor().counters["submitted"]
+    selectbox = at.selectbox[0]
+    for option in selectbox.options[1:3]:
+        timed(lambda: selectbox.select(option).run())
+        assert at.selectbox[0].value == option
+    # The insight is only fetched on "Get Music & Therapy Insight"
+    assert get_job_executor().counters["submitted"] == submitted
+
+def chat_users(at):
+    return [message.markdown[0].value for message in at.chat_message if message.name == "user"]
+
+def test_chat_pages_through_the_transcript_by_cursor(monkeypatch):
+    from fakes import FakeLLM, WordEncoding
+    from utils import chat_memory
+    from utils.chat_memory import get_chat_history_store
+    from utils.llm_scheduler import LLMScheduler
+    from utils.user_state import get_state_writer
+    import phase3_ai_companion
+
+    monkeypatch.setattr(chat_memory, "_encoding", WordEncoding)
+    monkeypatch.setattr(phase3_ai_companion, "get_llm", lambda temperature=0.7: FakeLLM())
+    scheduler = LLMScheduler(rpm=6000, tpm=10 ** 7, workers=2, max_retries=0)
+    monkeypatch.setattr(phase3_ai_companion, "get_llm_scheduler", lambda: scheduler)
+    uid = uuid.uuid4().hex
+    today = datetime.date.today().isoformat()
+    store = get_chat_history_store()
+    for i in range(40):
+        store.append_turn(uid, today, f"hello {i}", f"hi {i}")
+    # A transcript copied into the user state by an older version
+    get_state_writer().stage(uid, "messages", [{"role": "user", "content": "hello 0"}])
+
+    at = open_tab("🧠 AI Companion", uid)
+    page = phase3_ai_companion.CHAT_PAGE_TURNS
+    assert chat_users(at) == [f"hello {i}" for i in range(40 - page, 40)]
+    timed(lambda: next(b for b in at.button if b.label.startswith("⬆️ Show earlier")).click().run())
+    assert chat_users(at) == [f"hello {i}" for i in range(40 - 2 * page, 40 - page)]
+    assert any(b.label == f"⬆️ Show earlier messages ({2 * (40 - 2 * page)} hidden)" for b in at.button)
+
+    # Sending a message opens the latest page again
+    at.chat_input[0].set_value("one more").run()
+    at.run()
+    assert not at.exception
+    assert chat_users(at) == [f"hello {i}" for i in range(41 - page, 40)] + ["one more"]
+    assert at.session_state["_user_state"].get("messages") is None
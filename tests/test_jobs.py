@@ -0,0 +1,114 @@
+import threading
+import time
+from concurrent.futures import Future
+from utils import jobs
+from utils.jobs import Job, JobExecutor
+
+def wait_idle(executor, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        stats = executor.stats()
+        if not stats["queued"] and not stats["running"]:
+            return stats
+        time.sleep(0.02)
+    raise AssertionError("jobs still running")
+
+def render_in_process(text):
+    return text.upper()
+
+def test_many_sessions_share_the_thread_pool():
+    executor = JobExecutor(threads=16, processes=1)
+
+    def slow_call(i):
+        time.sleep(0.1)
+        return i
+
+    job_ids = []
+    sessions = [threading.Thread(target=lambda n=n: job_ids.extend(executor.submit(slow_call, n * 10 + k) for k in range(5)))
+                for n in range(20)]
+    started = time.perf_counter()
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join()
+    stats = wait_idle(executor)
+    elapsed = time.perf_counter() - started
+    # 100 calls of 0.1s on 16 threads take about 7 rounds, not 10s in a row
+    assert elapsed < 3
+    assert stats["done"] == 100 and stats["failed"] == 0
+    assert sorted(executor.result(job_id) for job_id in job_ids) == sorted(n * 10 + k for n in range(20) for k in range(5))
+    assert stats["max_queue_wait"] > 0
+
+def test_keyed_results_are_shared_but_failures_are_retried():
+    executor = JobExecutor(threads=2, processes=1)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("network down")
+        return "ok"
+
+    first = executor.submit(flaky, key=("report", 1))
+    wait_idle(executor)
+    assert executor.job(first).state == "failed"
+    retry = executor.submit(flaky, key=("report", 1))
+    assert retry != first
+    wait_idle(executor)
+    assert executor.result(retry) == "ok"
+    assert executor.submit(flaky, key=("report", 1)) == retry
+    assert len(calls) == 2
+    assert executor.stats()["cache_hits"] == 1
+
+def test_cancel_stops_a_reporting_job():
+    executor = JobExecutor(threads=2, processes=1)
+
+    def long_job(job):
+        for i in range(200):
+            time.sleep(0.01)
+            job.report(i / 200, f"{i} of 200")
+        return "finished"
+
+    job_id = executor.submit(long_job, key="long", pass_job=True)
+    time.sleep(0.1)
+    assert executor.cancel(job_id)
+    wait_idle(executor)
+    assert executor.job(job_id).state == "cancelled"
+    assert executor.job(job_id).progress < 1
+    assert executor.submit(long_job, key="long", pass_job=True) != job_id
+
+def test_process_jobs_return_results():
+    executor = JobExecutor(threads=1, processes=1)
+    job_id = executor.submit(render_in_process, "pdf", pool="process")
+    assert executor.job(job_id).future.result(timeout=60)[2] == "PDF"
+    wait_idle(executor)
+    assert executor.status(job_id)["state"] == "done"
+
+def test_failure_shows_before_the_done_callback_runs():
+    job = Job("j1", None, "", "thread")
+    job.future = Future()
+    job.future.set_running_or_notify_cancel()
+    job.future.set_exception(RuntimeError("disk full"))
+    assert job.state == "failed"
+    assert str(job.error) == "disk full"
+
+def test_large_results_are_evicted_past_the_byte_budget(monkeypatch):
+    monkeypatch.setattr(jobs, "MAX_FINISHED_BYTES", 1000)
+    executor = JobExecutor(threads=1, processes=1)
+    job_ids = []
+    for n in range(5):
+        job_ids.append(executor.submit(lambda n=n: bytes([n]) * 400, key=("report", n)))
+        executor.job(job_ids[-1]).future.result()
+        # Sizes are recorded by the done-callback, which may run just after the result is set
+        while executor.stats()["done"] < n + 1:
+            time.sleep(0.01)
+    assert [executor.job(job_id) is not None for job_id in job_ids] == [False, False, False, True, True]
+    assert executor.submit(lambda: b"", key=("report", 4)) == job_ids[4]
+    assert executor.submit(lambda: b"", key=("report", 0)) != job_ids[0]
+
+def test_the_newest_result_is_kept_even_over_budget(monkeypatch):
+    monkeypatch.setattr(jobs, "MAX_FINISHED_BYTES", 100)
+    executor = JobExecutor(threads=1, processes=1)
+    job_id = executor.submit(lambda: b"x" * 400, key="big")
+    wait_idle(executor)
+    assert executor.result(job_id) == b"x" * 400
@@ -0,0 +1,89 @@
+import os
+import time
+import uuid
+import pytest
+from streamlit.testing.v1 import AppTest
+from fakes import FakeLLM, HashEmbedder
+from utils.journal_import import ImportStore, job_id_for, parse_entries
+from utils.journal_index import JournalIndex
+from utils.llm_scheduler import LLMScheduler
+import phase2_journal_coping
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+COPING = "1. Breathe in for four counts\n2. Write one kind sentence\n3. Take a short walk"
+
+def reply(prompt):
+    return COPING if "coping strategies" in prompt else "It makes sense to feel this way today."
+
+@pytest.fixture
+def llm(monkeypatch):
+    llm = FakeLLM(reply=reply, latency=0.2)
+    scheduler = LLMScheduler(rpm=6000, tpm=10 ** 7, workers=4, max_retries=0)
+    monkeypatch.setattr(phase2_journal_coping, "get_llm", lambda: llm)
+    monkeypatch.setattr(phase2_journal_coping, "get_llm_scheduler", lambda: scheduler)
+    return llm
+
+def test_reflection_and_coping_stream_at_the_same_time(llm):
+    prompts = {"reflection": "reflect on this", "coping": "suggest coping strategies"}
+    results = {key: "" for key in prompts}
+    start = time.perf_counter()
+    for key, chunk in phase2_journal_coping.stream_concurrently(prompts):
+        results[key] += chunk
+    assert time.perf_counter() - start < 0.35
+    assert llm.max_in_flight == 2
+    assert results["reflection"].strip() == "It makes sense to feel this way today."
+    assert results["coping"].split() == COPING.split()
+
+def test_stream_errors_reach_the_page(llm):
+    llm.rate_limited = 5
+    with pytest.raises(Exception, match="rate limited"):
+        list(phase2_journal_coping.stream_concurrently({"reflection": "a", "coping": "b"}))
+
+def test_imported_entries_get_reflection_and_coping(llm):
+    reflection, coping = phase2_journal_coping.reflect_imported_entry(
+        {"date": "2024-01-01", "mood": "😢 Sad", "text": "rough day at work"}
+    )
+    assert reflection == "It makes sense to feel this way today."
+    assert coping == COPING
+    assert all("rough day at work" in prompt and "😢 Sad" in prompt and "(none)" in prompt for prompt in llm.prompts)
+
+class RecordingJob:
+    def __init__(self):
+        self.reports = []
+
+    def report(self, fraction, message=""):
+        self.reports.append((fraction, message))
+
+def test_import_journal_checkpoints_and_indexes_entries(tmp_path, llm):
+    data = b"date,mood,text\n2024-01-01,\xf0\x9f\x98\xa2 Sad,exam stress again\n2024-01-02,,long walk by the river\n"
+    store = ImportStore(str(tmp_path / "mindmate.db"))
+    index = JournalIndex(str(tmp_path / "mindmate.db"), str(tmp_path / "journal.faiss"), embedder=HashEmbedder())
+    job = RecordingJob()
+    entries = list(parse_entries("journal.csv", data))
+    assert phase2_journal_coping.import_journal(store, index, "u1", "journal.csv", data, entries, 2, job) == (2, 2)
+    assert job.reports[0][0] == 0.0 and job.reports[-1][0] == 1.0
+    assert [r["reflection"] for r in store.results(job_id_for("u1", data))] == ["It makes sense to feel this way today."] * 2
+    assert index.search("u1", "walk by the river", k=1)[0]["date"] == "2024-01-02"
+    assert index.search("u2", "walk by the river", k=1) == []
+
+def test_journal_tab_renders():
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.session_state["_uid"] = uuid.uuid4().hex
+    at.session_state["active_tab"] = "📔 Journal & Coping"
+    at.run()
+    assert not at.exception
+    assert any(button.label == "Reflect & Recommend" for button in at.button)
+
+def test_reflection_still_runs_without_the_embedding_model(llm, monkeypatch):
+    def offline():
+        raise OSError("couldn't reach the model hub")
+    monkeypatch.setattr(phase2_journal_coping, "get_journal_index", offline)
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.session_state["_uid"] = uuid.uuid4().hex
+    at.session_state["active_tab"] = "📔 Journal & Coping"
+    at.run()
+    at.text_area[0].input("Long day, but I finished the report.")
+    next(button for button in at.button if button.label == "Reflect & Recommend").click().run()
+    assert not at.exception
+    assert any("It makes sense to feel this way today." in markdown.value for markdown in at.markdown)
+    assert all("(none)" in prompt for prompt in llm.prompts)
@@ -0,0 +1,98 @@
+import threading
+import time
+import pytest
+from utils.journal_import import ImportStore, job_id_for, parse_entries, run_import
+
+CSV = b"Date,Mood,Text\n2024-01-01,\xf0\x9f\x98\xa2 Sad,rough day\n2024-01-02,,fine\n"
+JSONL = b'{"date": "2024-01-01", "mood": "Calm", "entry": "quiet"}\n\n{"Date": "2024-01-02", "Text": "busy"}\n'
+MARKDOWN = "# Journal\n## 2024-01-01 — 😰 Anxious\nexam tomorrow\n\n## 2024-01-02\nit went well\n".encode()
+
+def test_parses_every_format():
+    assert list(parse_entries("a.csv", CSV)) == [
+        {"date": "2024-01-01", "mood": "😢 Sad", "text": "rough day"},
+        {"date": "2024-01-02", "mood": "😐 Neutral", "text": "fine"},
+    ]
+    assert [(e["mood"], e["text"]) for e in parse_entries("a.jsonl", JSONL)] == [("Calm", "quiet"), ("😐 Neutral", "busy")]
+    assert list(parse_entries("a.md", MARKDOWN)) == [
+        {"date": "2024-01-01", "mood": "😰 Anxious", "text": "exam tomorrow"},
+        {"date": "2024-01-02", "mood": "😐 Neutral", "text": "it went well"},
+    ]
+
+@pytest.mark.parametrize("line", [b"[1, 2]", b'"text"', b'{"date": "2024-01-01", "text": 5}',
+                                  b'{"date": "2024-01-01", "mood": ["sad"], "text": "x"}', b"{not json"])
+def test_malformed_jsonl_is_a_value_error(line):
+    with pytest.raises(ValueError):
+        list(parse_entries("a.jsonl", line))
+
+@pytest.mark.parametrize("filename, data", [
+    ("a.jsonl", b'{"date": null, "text": "x"}'),
+    ("a.jsonl", b'{"text": "no date"}'),
+    ("a.jsonl", b'{"date": 20240101, "text": "x"}'),
+    ("a.csv", b"date,text\n,x\n"),
+    ("a.csv", b"date,text\nyesterday,x\n"),
+    ("a.md", b"## 2024-13-40\nx\n"),
+])
+def test_entries_without_a_usable_date_are_rejected(filename, data):
+    with pytest.raises(ValueError, match="date"):
+        list(parse_entries(filename, data))
+
+def test_timestamps_keep_their_date():
+    data = b'{"date": "2024-01-01T22:15:00", "text": "late"}\n{"date": " 2024-01-02 ", "text": "early"}'
+    assert [e["date"] for e in parse_entries("a.jsonl", data)] == ["2024-01-01", "2024-01-02"]
+
+def test_unknown_extension_is_a_value_error():
+    with pytest.raises(ValueError):
+        list(parse_entries("a.txt", b"hello"))
+
+def test_job_ids_are_per_user():
+    assert job_id_for("u1", CSV) == job_id_for("u1", CSV) != job_id_for("u2", CSV)
+
+# Counts calls and concurrency like the LLM would see them; fails the entries it is told to
+class FakeReflector:
+    def __init__(self, fail_on=(), delay=0.01):
+        self.fail_on = set(fail_on)
+        self.delay = delay
+        self.calls = []
+        self.in_flight = self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, entry):
+        with self._lock:
+            self.calls.append(entry["text"])
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        if entry["text"] in self.fail_on:
+            raise RuntimeError("rate limited")
+        return f"reflection on {entry['text']}", "breathe"
+
+def entries(count):
+    return [{"date": "2024-01-01", "mood": "Calm", "text": f"entry {i}"} for i in range(count)]
+
+def test_import_runs_bounded_and_indexes_everything(tmp_path):
+    store, reflector, indexed = ImportStore(str(tmp_path / "import.db")), FakeReflector(), []
+    progress = []
+    done, total = run_import(store, "job", "a.csv", entries(70), reflector, concurrency=3,
+                             on_progress=lambda done, total, rate: progress.append(done), on_batch=indexed.extend)
+    assert (done, total) == (70, 70)
+    assert len(reflector.calls) == 70
+    assert reflector.max_in_flight <= 3
+    assert sorted(e["text"] for e in indexed) == sorted(e["text"] for e in entries(70))
+    assert progress[0] == 0 and progress[-1] == 70
+    assert len(store.results("job")) == 70
+
+def test_failed_import_resumes_and_never_loses_checkpointed_entries(tmp_path):
+    store, indexed = ImportStore(str(tmp_path / "import.db")), []
+    failing = FakeReflector(fail_on={"entry 40"})
+    with pytest.raises(RuntimeError):
+        run_import(store, "job", "a.csv", entries(50), failing, concurrency=1, on_batch=indexed.extend)
+    # Everything checkpointed before the failure was handed to on_batch, including the partial batch
+    assert len(indexed) == len(store.done_seqs("job")) == 40
+
+    resumed = FakeReflector()
+    done, total = run_import(store, "job", "a.csv", entries(50), resumed, concurrency=4, on_batch=indexed.extend)
+    assert (done, total) == (50, 50)
+    assert len(resumed.calls) == 10
+    assert sorted(e["text"] for e in indexed) == sorted(e["text"] for e in entries(50))
@@ -0,0 +1,51 @@
+import sqlite3
+from fakes import HashEmbedder
+from utils.journal_index import JournalIndex
+
+def entry(text, date="2024-01-01", mood="😰 Anxious"):
+    return {"date": date, "mood": mood, "text": text}
+
+def make_index(tmp_path):
+    return JournalIndex(str(tmp_path / "journal.db"), str(tmp_path / "journal.faiss"), embedder=HashEmbedder())
+
+def test_search_only_returns_own_entries(tmp_path):
+    index = make_index(tmp_path)
+    index.add_entries("u1", [entry(f"exams at work make me anxious {i}") for i in range(50)])
+    index.add_entry("u2", "2024-01-03", "😢 Sad", "work exams make me anxious and tired")
+    hits = index.search("u2", "anxious about exams at work", k=3)
+    # u1's 50 closer matches must not crowd u2's only entry out of the top k
+    assert [hit["text"] for hit in hits] == ["work exams make me anxious and tired"]
+    assert all("make me anxious" in hit["text"] for hit in index.search("u1", "anxious about exams", k=3))
+    assert len(index.search("u1", "anxious about exams", k=3)) == 3
+    assert index.search("u3", "anxious about exams", k=3) == []
+
+def test_index_survives_restart(tmp_path):
+    index = make_index(tmp_path)
+    index.add_entry("u1", "2024-01-01", "😊 Happy", "walked by the sea with my dog")
+    index.flush()
+    index.add_entry("u1", "2024-01-02", "😊 Happy", "baked bread with my sister")
+    reopened = make_index(tmp_path)
+    assert len(reopened) == 2
+    assert reopened.search("u1", "bread with my sister", k=1)[0]["date"] == "2024-01-02"
+
+def test_entries_without_owner_are_migrated(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "journal.db"))
+    conn.execute("CREATE TABLE journal_entries (id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL, "
+                 "mood TEXT NOT NULL, text TEXT NOT NULL)")
+    conn.execute("INSERT INTO journal_entries (date, mood, text) VALUES ('2023-05-01', '😐 Neutral', 'old quiet day')")
+    conn.commit()
+    conn.close()
+    index = make_index(tmp_path)
+    assert index.search("", "quiet day", k=1)[0]["text"] == "old quiet day"
+    assert index.search("u1", "quiet day", k=1) == []
+
+def test_entries_from_another_replica_are_searchable(tmp_path):
+    replica_a, replica_b = make_index(tmp_path), make_index(tmp_path)
+    replica_a.add_entry("u1", "2024-01-01", "😊 Happy", "walked by the sea with my dog")
+    assert replica_a.search("u1", "walked by the sea", k=1)
+    replica_b.add_entry("u1", "2024-01-02", "😰 Anxious", "exam results came in today")
+    assert replica_a.search("u1", "exam results", k=1)[0]["date"] == "2024-01-02"
+    # b's save of the shared file lacks a's unsaved entry; a restart still indexes both
+    replica_a.flush()
+    replica_b.flush()
+    assert len(make_index(tmp_path)) == 2
@@ -0,0 +1,41 @@
+import json
+import os
+from utils.media import MediaLibrary
+
+def make_library(tmp_path, tracks):
+    media = tmp_path / "media"
+    media.mkdir()
+    (tmp_path / "calm.mp3").write_bytes(b"ID3" + bytes(range(256)) * 64)
+    (media / "manifest.json").write_text(json.dumps(tracks), encoding="utf-8")
+    return MediaLibrary(str(media / "manifest.json"), cache_dir=str(media / "cache"))
+
+def test_repeated_plays_read_the_file_once(tmp_path):
+    library = make_library(tmp_path, {
+        "😐 Neutral": {"file": "calm.mp3", "title": "Calm"},
+        "😊 Happy": {"url": "https://example.com/happy", "title": "Happy"},
+    })
+    handles = [library.handle("😐 Neutral") for _ in range(25)]
+    assert all(handle is handles[0] for handle in handles)
+    assert handles[0].data == (tmp_path / "calm.mp3").read_bytes()
+    assert library.stats()["file_reads"] == 1
+    assert library.handle("😊 Happy").url == "https://example.com/happy"
+    assert library.stats()["file_reads"] == 1
+    assert library.stats()["cached_bytes"] == handles[0].size
+
+def test_data_saver_copy_is_cached_separately(tmp_path, monkeypatch):
+    monkeypatch.setattr("utils.media.shutil.which", lambda name: None)
+    library = make_library(tmp_path, {"😐 Neutral": {"file": "calm.mp3", "title": "Calm"}})
+    for _ in range(5):
+        low = library.handle("😐 Neutral", low_bitrate=True)
+        full = library.handle("😐 Neutral")
+    # Without ffmpeg the low-bitrate handle falls back to the original file, read once per variant
+    assert low.data == full.data
+    assert library.stats()["file_reads"] == 2
+    assert not os.path.exists(tmp_path / "media" / "cache")
+
+def test_shipped_manifest_resolves_every_mood():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    library = MediaLibrary(os.path.join(root, "media", "manifest.json"))
+    for mood in library.moods:
+        handle = library.handle(mood)
+        assert handle.url or handle.size
@@ -0,0 +1,66 @@
+import datetime
+import random
+from utils.mood_aggregates import MoodAggregates, mood_numeric, mood_score
+from utils.mood_store import MoodStore
+
+MOODS = list(mood_numeric) + ["🤔 Unlisted"]
+
+def random_log(count, seed=0):
+    rng = random.Random(seed)
+    start = datetime.date(2024, 1, 1)
+    # Mostly in order, with some back-dated entries like imports produce
+    return [((start + datetime.timedelta(days=rng.randrange(120))).isoformat(), rng.choice(MOODS)) for _ in range(count)]
+
+# Straight recomputation over the whole log, the way the dashboard used to do it
+def recompute(entries, window, today):
+    counts, latest = {}, {}
+    for date, mood in entries:
+        counts[mood] = counts.get(mood, 0) + 1
+        latest[date] = mood
+    first = (today - datetime.timedelta(days=window - 1)).isoformat()
+    scores = [mood_score(mood) for date, mood in entries if first <= date <= today.isoformat()]
+    average = sum(scores) / len(scores) if scores else None
+    return counts, sorted(latest.items(), reverse=True), average
+
+def test_incremental_aggregates_match_a_full_recompute():
+    entries = random_log(2000)
+    aggregates = MoodAggregates()
+    for i, (date, mood) in enumerate(entries, 1):
+        aggregates.add(date, mood)
+        if i % 250 == 0:
+            today = datetime.date(2024, 3, 15)
+            counts, latest, average = recompute(entries[:i], 30, today)
+            assert aggregates.total == i
+            assert aggregates.counts == counts
+            assert aggregates.latest_per_day() == latest
+            assert aggregates.latest_per_day(7) == latest[:7]
+            assert aggregates.rolling_average(30, today) == average
+            assert aggregates.days == sorted(aggregates.days)
+
+def test_store_aggregates_match_sql_and_survive_reopen(tmp_path):
+    path = str(tmp_path / "mood.db")
+    store = MoodStore(path)
+    for date, mood in random_log(500, seed=1):
+        store.append("u1", date, mood, "")
+    store.append("u2", "2024-01-01", "😊 Happy")
+    assert store.count("u1") == len(store.range("u1")) == 500
+    counts = {}
+    for entry in store.range("u1"):
+        counts[entry["mood"]] = counts.get(entry["mood"], 0) + 1
+    assert store.mood_counts("u1") == counts
+    # Unfiltered counts come from the aggregates, ranged ones from SQL; both must agree
+    assert store.mood_counts("u1", start="2000-01-01") == counts
+    reopened = MoodStore(path)
+    assert reopened.latest_per_day("u1") == store.latest_per_day("u1")
+    assert reopened.rolling_average("u1", 30, datetime.date(2024, 4, 1)) == store.rolling_average("u1", 30, datetime.date(2024, 4, 1))
+    assert reopened.version("u1") == store.version("u1") < store.version("u2")
+    assert reopened.count("u2") == 1
+
+def test_evicted_users_are_rebuilt_from_the_log(tmp_path):
+    store = MoodStore(str(tmp_path / "mood.db"), max_users=2)
+    for uid in ("a", "b", "c"):
+        store.append(uid, "2024-01-01", "😢 Sad")
+        store.append(uid, "2024-01-02", "😊 Happy")
+    assert len(store._users) == 2
+    assert store.latest_per_day("a") == [("2024-01-02", "😊 Happy"), ("2024-01-01", "😢 Sad")]
+    assert store.count("a") == 2
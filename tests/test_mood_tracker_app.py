@@ -0,0 +1,49 @@
+import os
+import uuid
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+def open_app():
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.session_state["_uid"] = uuid.uuid4().hex
+    return at.run()
+
+def log_mood(at, note):
+    at.text_area[0].input(note)
+    return at.button[0].click().run()
+
+def prepare_button(at):
+    return next(button for button in at.button if "Prepare" in button.label)
+
+def test_history_is_per_user():
+    first = log_mood(open_app(), "first user's note")
+    assert not first.exception
+    assert first.subheader[0].value == "📅 Mood Log History"
+    second = open_app()
+    assert not second.subheader
+
+def test_report_request_resets_on_new_entry_and_new_period():
+    at = log_mood(open_app(), "")
+    prepare_button(at).click().run()
+    assert at.session_state["pdf_requested"] == ("full", at.date_input[0].value[0].isoformat(),
+                                                 at.date_input[0].value[1].isoformat())
+    next(radio for radio in at.radio if radio.label == "Report").set_value("This week").run()
+    # The full-history request no longer matches, so nothing is built for the weekly view
+    assert not at.get("download_button") and not at.get("progress")
+    prepare_button(at).click().run()
+    assert at.session_state["pdf_requested"][0] == "weekly"
+    log_mood(at, "another one")
+    assert at.session_state["pdf_requested"] is None
+
+def test_incomplete_period_disables_the_report():
+    at = log_mood(open_app(), "")
+    at.date_input[0].set_value((at.date_input[0].value[0],)).run()
+    assert prepare_button(at).disabled
+    assert any("end date" in caption.value for caption in at.caption)
+
+def test_notes_are_escaped_in_the_history():
+    at = log_mood(open_app(), '<img src=x onerror="alert(1)"> & <b>bold</b>')
+    card = next(markdown.value for markdown in at.markdown if "background-color:teal" in markdown.value)
+    assert "<img" not in card and "<b>" not in card
+    assert "&lt;img src=x onerror=&quot;alert(1)&quot;&gt; &amp; &lt;b&gt;bold&lt;/b&gt;" in card
@@ -0,0 +1,62 @@
+# Several app replicas (separate processes) sharing one database file
+import datetime
+import multiprocessing
+from utils.mood_store import MoodStore
+from utils.user_state import SQLiteBackend, WriteBehind, UserState
+
+WRITES = 200
+
+def write_user_state(db_path, replica):
+    writer = WriteBehind(SQLiteBackend(db_path), interval=0.01)
+    state = UserState("u1", writer)
+    for i in range(WRITES):
+        state.refresh()
+        state[f"replica{replica}"] = i
+        state[f"hits{replica}_{i % 5}"] = i
+    writer.flush()
+    return writer.stats()
+
+def log_moods(db_path, uid, count):
+    store = MoodStore(db_path)
+    for i in range(count):
+        store.append(uid, f"2024-01-{i % 28 + 1:02d}", "😊 Happy", f"replica entry {i}")
+
+def run_in_processes(fn, args_list):
+    with multiprocessing.get_context("spawn").Pool(len(args_list)) as pool:
+        return pool.starmap(fn, args_list)
+
+def test_user_state_writes_from_every_replica_land(tmp_path):
+    db_path = str(tmp_path / "state.db")
+    stats = run_in_processes(write_user_state, [(db_path, replica) for replica in range(4)])
+    version, data = SQLiteBackend(db_path).load("u1")
+    assert all(data[f"replica{replica}"] == WRITES - 1 for replica in range(4))
+    assert len(data) == 4 * 6
+    # Write-behind folds each replica's 400 changes into far fewer versioned writes
+    assert 0 < version < 4 * 2 * WRITES
+    assert all(s["pending_users"] == 0 for s in stats)
+
+def test_mood_store_sees_appends_from_another_connection(tmp_path):
+    db_path = str(tmp_path / "mood.db")
+    replica_a, replica_b = MoodStore(db_path), MoodStore(db_path)
+    assert replica_b.count("u1") == 0
+    entry = replica_a.append("u1", "2024-01-02", "😢 Sad", "from a")
+    assert replica_b.count("u1") == 1
+    assert replica_b.latest_per_day("u1") == [("2024-01-02", "😢 Sad")]
+    assert replica_b.version("u1") == entry["id"]
+    assert replica_b.count("u2") == 0
+
+def test_mood_store_catches_up_with_other_processes(tmp_path):
+    db_path = str(tmp_path / "mood.db")
+    store = MoodStore(db_path)
+    store.append("u1", "2024-01-01", "😐 Neutral")
+    assert store.count("u1") == 1
+    run_in_processes(log_moods, [(db_path, "u1", 50), (db_path, "u1", 50), (db_path, "u2", 30)])
+    store.append("u1", "2024-02-01", "😠 Angry")
+    fresh = MoodStore(db_path)
+    for uid, total in (("u1", 102), ("u2", 30)):
+        assert store.count(uid) == fresh.count(uid) == total
+        assert store.mood_counts(uid) == fresh.mood_counts(uid)
+        assert store.latest_per_day(uid) == fresh.latest_per_day(uid)
+        assert store.version(uid) == fresh.version(uid)
+        today = datetime.date.fromisoformat(fresh.aggregates(uid).days[-1])
+        assert store.rolling_average(uid, 30, today) == fresh.rolling_average(uid, 30, today)
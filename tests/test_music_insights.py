@@ -0,0 +1,74 @@
+import threading
+import pytest
+from fakes import FakeLLM
+from utils.llm_scheduler import LLMScheduler
+from utils.response_cache import ResponseCache
+
+def test_cache_fills_its_variants_then_stops_calling():
+    llm = FakeLLM(reply=lambda prompt: f"variant {llm.calls}")
+    cache = ResponseCache(max_keys=4, ttl=60, variants=3)
+    replies = [cache.get("😢 Sad", lambda: llm.invoke("sad").content) for _ in range(50)]
+    assert llm.calls == 3
+    assert set(replies) == {"variant 1", "variant 2", "variant 3"}
+    assert cache.stats()["hits"] == 47
+
+def test_expired_and_evicted_keys_are_produced_again(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("utils.response_cache.time.monotonic", lambda: clock[0])
+    cache = ResponseCache(max_keys=2, ttl=10, variants=1)
+    calls = []
+    produce = lambda key: (lambda: calls.append(key) or key.upper())
+    for key in ("a", "b", "a"):
+        cache.get(key, produce(key))
+    assert calls == ["a", "b"]
+    # "b" is the least recently used key when "c" arrives
+    cache.get("c", produce("c"))
+    cache.get("a", produce("a"))
+    assert calls == ["a", "b", "c"]
+    cache.get("b", produce("b"))
+    assert calls == ["a", "b", "c", "b"]
+    clock[0] += 11
+    cache.get("b", produce("b"))
+    assert calls == ["a", "b", "c", "b", "b"]
+
+def test_duplicate_replies_do_not_take_a_variant_slot():
+    cache = ResponseCache(max_keys=4, ttl=60, variants=3)
+    assert cache.put("😢 Sad", "same")
+    assert not cache.put("😢 Sad", "same")
+    assert cache.put("😢 Sad", "other")
+
+def test_concurrent_music_insights_still_cache_distinct_variants(monkeypatch):
+    import phase6_mood_music
+
+    llm = FakeLLM(reply=lambda prompt: f"insight {llm.calls}", latency=0.2)
+    scheduler = LLMScheduler(rpm=6000, tpm=10 ** 7, workers=4)
+    monkeypatch.setattr(phase6_mood_music, "get_llm", lambda temperature: llm)
+    monkeypatch.setattr(phase6_mood_music, "get_llm_scheduler", lambda: scheduler)
+    phase6_mood_music.get_insight_cache.clear()
+
+    threads = [threading.Thread(target=phase6_mood_music.music_insight, args=("😐 Neutral",)) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Concurrent misses for one prompt share a scheduler call; the merged reply fills one slot
+    # and the misses that got it ask once more (again merged into one call)
+    assert llm.calls == 2
+    replies = {phase6_mood_music.music_insight("😐 Neutral") for _ in range(50)}
+    assert llm.calls == 3
+    assert replies == {"insight 1", "insight 2", "insight 3"}
+    phase6_mood_music.music_insight("😢 Sad")
+    assert llm.calls == 4
+    phase6_mood_music.get_insight_cache.clear()
+
+def test_scheduler_retries_rate_limited_calls():
+    llm = FakeLLM(rate_limited=2)
+    scheduler = LLMScheduler(rpm=6000, tpm=10 ** 7, workers=1)
+    assert scheduler.invoke(llm, "hello") == "Take a slow breath with me."
+    assert llm.calls == 3
+    assert scheduler.stats()["retries"] == 2
+
+def test_scheduler_gives_up_after_max_retries():
+    scheduler = LLMScheduler(rpm=6000, tpm=10 ** 7, workers=1, max_retries=1)
+    with pytest.raises(Exception, match="rate limited"):
+        scheduler.invoke(FakeLLM(rate_limited=5), "hello")
@@ -0,0 +1,48 @@
+import sqlite3
+from utils.mood_store import MoodStore, claim_legacy_rows
+from utils.routine_store import RoutineStore
+
+def test_routines_are_per_user(tmp_path):
+    store = RoutineStore(str(tmp_path / "routines.db"))
+    store.save_day("u1", "2024-01-01", {"Walk": True, "Journal": False})
+    store.save_day("u2", "2024-01-01", {"Yoga": False})
+    store.set_completed("u2", "2024-01-01", "Walk", True)
+    assert store.load_day("u1", "2024-01-01") == {"Walk": True, "Journal": False}
+    assert store.load_day("u2", "2024-01-01") == {"Yoga": False}
+    assert store.completion("u1", "2024-01-01", "2024-01-01") == (1, 2)
+    assert store.completion("u2", "2024-01-01", "2024-01-01") == (0, 1)
+
+def test_save_replaces_the_whole_day(tmp_path):
+    store = RoutineStore(str(tmp_path / "routines.db"))
+    store.save_day("u1", "2024-01-01", {"Walk": True, "Journal": False})
+    store.save_day("u1", "2024-01-01", {"Journal": True, "Stretch": False})
+    assert list(store.load_day("u1", "2024-01-01").items()) == [("Journal", True), ("Stretch", False)]
+
+def test_date_keyed_table_is_migrated(tmp_path):
+    path = str(tmp_path / "routines.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE routines (date TEXT NOT NULL, position INTEGER NOT NULL, activity TEXT NOT NULL, "
+                 "completed INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (date, activity))")
+    conn.execute("INSERT INTO routines VALUES ('2024-01-01', 0, 'Walk', 1)")
+    conn.commit()
+    conn.close()
+    store = RoutineStore(path)
+    assert store.load_day("", "2024-01-01") == {"Walk": True}
+    store.save_day("u3", "2024-01-01", {"Walk": False})
+    assert store.load_day("", "2024-01-01") == {"Walk": True}
+    # The first user to show up takes over the single-user rows; later users don't see them
+    assert claim_legacy_rows("u1", path)
+    assert not claim_legacy_rows("u2", path)
+    assert store.load_day("u1", "2024-01-01") == {"Walk": True}
+    assert store.load_day("u2", "2024-01-01") == {}
+
+def test_legacy_csv_imported_after_the_owner_is_chosen_goes_to_them(tmp_path):
+    path = str(tmp_path / "mindmate.db")
+    csv_path = tmp_path / "routines.csv"
+    csv_path.write_text("date,activity,completed\n2025-07-11,Go for a walk,\n2025-07-12,Gym,1\n")
+    MoodStore(path).append("", "2025-07-11", "😊 Happy", "from the single-user log")
+    assert claim_legacy_rows("u1", path)
+    store = RoutineStore(path, legacy_csv=str(csv_path))
+    assert store.load_day("u1", "2025-07-12") == {"Gym": True}
+    assert store.load_day("", "2025-07-12") == {}
+    assert [e["note"] for e in MoodStore(path).range("u1")] == ["from the single-user log"]
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+from fakes import HashEmbedder
+from utils.semantic_cache import SemanticCache
+
+def test_near_duplicate_hits_only_within_scope():
+    cache = SemanticCache(embedder=HashEmbedder(), threshold=0.8, max_entries=10)
+    reply, vector = cache.lookup(("calming", None), "i feel anxious about work")
+    assert reply is None
+    cache.store(("calming", None), "i feel anxious about work", "Breathe with me.", 1.5, vector)
+    assert cache.lookup(("calming", None), "i feel so anxious about work")[0] == "Breathe with me."
+    assert cache.lookup(("cheerful", None), "i feel so anxious about work")[0] is None
+    assert cache.lookup(("calming", "u1"), "i feel so anxious about work")[0] is None
+    assert cache.stats()["seconds_saved"] == 1.5
+
+def test_least_recently_served_reply_is_evicted():
+    cache = SemanticCache(embedder=HashEmbedder(), threshold=0.99, max_entries=2)
+    for text in ("alpha", "beta"):
+        cache.store("tone", text, text.upper(), 1.0)
+    assert cache.lookup("tone", "alpha")[0] == "ALPHA"
+    cache.store("tone", "gamma", "GAMMA", 1.0)
+    assert cache.lookup("tone", "beta")[0] is None
+    assert cache.lookup("tone", "alpha")[0] == "ALPHA"
+    assert cache.stats()["evicted"] == 1
+
+def test_emptied_scopes_are_dropped():
+    cache = SemanticCache(embedder=HashEmbedder(), threshold=0.99, max_entries=2)
+    for n in range(50):
+        cache.store(("calming", f"u{n}"), f"message {n}", "Breathe with me.", 1.0)
+    assert cache.stats()["scopes"] == 2
+    assert cache.lookup(("calming", "u0"), "message 0")[0] is None
+    cache.store(("calming", "u0"), "message 0", "Welcome back.", 1.0)
+    assert cache.lookup(("calming", "u0"), "message 0")[0] == "Welcome back."
+
+def test_companion_does_not_import_the_cache_when_it_is_off():
+    code = "import sys, phase3_ai_companion; print('faiss' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), capture_output=True, text=True,
+                            env={"PATH": "", "MINDMATE_SEMANTIC_CACHE": "0"})
+    assert result.stdout.strip().splitlines()[-1] == "False"
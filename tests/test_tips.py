@@ -0,0 +1,45 @@
+import datetime
+from utils.mood_store import MoodStore
+from utils.routine_store import RoutineStore
+from utils.tips import TIPS_CATALOG, TipsCatalog, derive_mood, mood_recency, user_mood
+
+TODAY = datetime.date(2024, 3, 10)
+
+def moods_of(picks):
+    return [dict(TIPS_CATALOG)[tip] for _, tip in picks]
+
+def test_fresh_mood_picks_matching_tips():
+    catalog = TipsCatalog()
+    for mood in ("Happy", "Sad", "Anxious", "Angry", "Calm", "Motivated"):
+        assert all(mood in moods for moods in moods_of(catalog.select(mood, count=2, seed=1)))
+
+def test_selection_is_deterministic_per_seed_and_avoids_seen_tips():
+    catalog = TipsCatalog()
+    first = catalog.select("Sad", count=2, seed=7)
+    assert catalog.select("Sad", count=2, seed=7) == first
+    again = catalog.select("Sad", count=2, seen={i for i, _ in first}, seed=7)
+    assert not {i for i, _ in again} & {i for i, _ in first}
+
+def test_stale_mood_gives_way_to_general_tips():
+    catalog = TipsCatalog()
+    assert mood_recency(0) == 1.0 and mood_recency(3) == 0.5
+    stale = catalog.select("Angry", count=2, recency=mood_recency(14), seed=3)
+    assert all(moods == () for moods in moods_of(stale))
+
+def test_mood_comes_from_the_log_and_routine():
+    assert derive_mood(None, (0, 0), TODAY) == ("Calm", 0.0)
+    assert derive_mood(("2024-03-10", "😢 Sad"), (0, 0), TODAY) == ("Sad", 1.0)
+    assert derive_mood(("2024-03-07", "😐 Neutral"), (0, 0), TODAY) == ("Calm", 0.5)
+    assert derive_mood(("2024-03-10", "😊 Happy"), (4, 5), TODAY)[0] == "Motivated"
+    assert derive_mood(("2024-03-10", "😢 Sad"), (5, 5), TODAY)[0] == "Sad"
+
+def test_each_user_gets_tips_for_their_own_log(tmp_path):
+    path = str(tmp_path / "mindmate.db")
+    moods, routines = MoodStore(path), RoutineStore(path)
+    moods.append("u1", "2024-03-10", "😰 Anxious")
+    moods.append("u2", "2024-03-09", "😊 Happy")
+    routines.save_day("u2", "2024-03-09", {"Walk": True, "Journal": True})
+    routines.save_day("u1", "2024-03-10", {"Walk": False})
+    assert user_mood(moods, routines, "u1", TODAY) == ("Anxious", 1.0)
+    assert user_mood(moods, routines, "u2", TODAY) == ("Motivated", mood_recency(1))
+    assert user_mood(moods, routines, "u3", TODAY) == ("Calm", 0.0)
@@ -0,0 +1,43 @@
+import datetime
+import uuid
+import numpy as np
+import phase4_dashboard
+from utils import mood_analytics
+from utils.mood_store import get_mood_store
+
+def log_years(store, uid, days):
+    start = datetime.date(2020, 1, 1)
+    moods = ["😊 Happy", "😐 Neutral", "😢 Sad"]
+    for day in range(days):
+        store.append(uid, (start + datetime.timedelta(days=day)).isoformat(), moods[day % 3])
+    return (start + datetime.timedelta(days=days - 1)).isoformat()
+
+def test_lttb_keeps_endpoints_and_the_extremes():
+    x = np.arange(10_000)
+    y = np.sin(x / 300.0)
+    y[5_000] = 9.0
+    sampled_x, sampled_y = mood_analytics.downsample_lttb(x, y, 200)
+    assert len(sampled_x) == 200
+    assert sampled_x[0] == 0 and sampled_x[-1] == 9_999
+    assert 9.0 in sampled_y
+    assert np.all(np.diff(sampled_x) > 0)
+
+def test_all_time_figure_is_bounded_and_follows_the_log(monkeypatch):
+    store, uid = get_mood_store(), uuid.uuid4().hex
+    today = log_years(store, uid, 5 * 365)
+    builds = []
+    original = phase4_dashboard.build_history_figure
+    monkeypatch.setattr(phase4_dashboard, "build_history_figure",
+                        lambda daily, rolling: builds.append(len(daily)) or original(daily, rolling))
+
+    fig = phase4_dashboard.trend_figure(store, uid, store.version(uid), "All time", today, [], [], [])
+    assert all(len(trace.x) <= phase4_dashboard.MAX_CHART_POINTS for trace in fig.data)
+    # Both traces at full length would be ~140 KB of JSON; downsampled they stay near 40 KB
+    assert len(fig.to_json()) < 60_000
+    phase4_dashboard.trend_figure(store, uid, store.version(uid), "All time", today, [], [], [])
+    assert builds == [5 * 365]
+
+    store.append(uid, "2025-01-01", "😠 Angry")
+    fig = phase4_dashboard.trend_figure(store, uid, store.version(uid), "All time", "2025-01-01", [], [], [])
+    assert builds == [5 * 365, 5 * 365 + 1]
+    assert fig.data[0].x[-1] == np.datetime64("2025-01-01")
@@ -0,0 +1,86 @@
+import threading
+from utils.user_state import MemoryBackend, UserState, WriteBehind
+
+# Runs `during_write` right after a flush has written, before it drops the flushed changes
+class HookedBackend(MemoryBackend):
+    during_write = None
+
+    def compare_and_set(self, uid, expected_version, data):
+        written = super().compare_and_set(uid, expected_version, data)
+        if written and self.during_write:
+            hook, self.during_write = self.during_write, None
+            hook()
+        return written
+
+def test_in_place_edit_during_a_flush_is_not_lost():
+    backend = HookedBackend()
+    writer = WriteBehind(backend, interval=60)
+    state = UserState("u1", writer)
+    state.refresh()
+    activities = ["Walk"]
+    state["activities"] = activities
+
+    def add_activity():
+        activities.append("Stretch")
+        state["activities"] = activities
+    backend.during_write = add_activity
+    writer.flush()
+    assert backend.load("u1")[1] == {"activities": ["Walk"]}
+    assert writer.pending("u1") == {"activities": ["Walk", "Stretch"]}
+
+    # Another session reading now sees the pending edit on top of the stored document
+    other = UserState("u1", writer)
+    other.refresh()
+    assert other["activities"] == ["Walk", "Stretch"]
+    writer.flush()
+    assert backend.load("u1")[1] == {"activities": ["Walk", "Stretch"]}
+    assert writer.stats()["pending_users"] == 0
+
+def test_staged_value_is_a_snapshot():
+    writer = WriteBehind(MemoryBackend(), interval=60)
+    state = UserState("u1", writer)
+    routine = {"Walk": False}
+    state["routine"] = routine
+    routine["Walk"] = True  # edited in place but never assigned back
+    writer.flush()
+    assert writer.backend.load("u1")[1] == {"routine": {"Walk": False}}
+
+class FailingBackend(MemoryBackend):
+    failures = 1
+
+    def load(self, uid):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database is locked")
+        return super().load(uid)
+
+def test_background_flushing_survives_a_failed_flush():
+    backend = FailingBackend()
+    writer = WriteBehind(backend, interval=0.01)
+    written = threading.Event()
+    original = backend.compare_and_set
+
+    def compare_and_set(uid, expected_version, data):
+        ok = original(uid, expected_version, data)
+        written.set()
+        return ok
+    backend.compare_and_set = compare_and_set
+    writer.stage("u1", "mood", "Calm")
+    assert written.wait(5)
+    assert backend.load("u1")[1] == {"mood": "Calm"}
+    assert writer.stats()["errors"] == 1
+
+def uid_page():
+    import streamlit as st
+    from utils.user_state import current_uid
+    st.write(current_uid())
+
+def test_uid_is_kept_out_of_the_url():
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_function(uid_page)
+    at.query_params["uid"] = "someone-elses-id"
+    at.run()
+    uid = at.markdown[0].value
+    assert uid != "someone-elses-id" and len(uid) == 32
+    assert "uid" not in at.query_params
+    assert at.run().markdown[0].value == uid
@@ -0,0 +1,194 @@
+# utils/chat_memory.py
+import functools
+import sqlite3
+import threading
+import tiktoken
+import streamlit as st
+from utils.mood_store import DB_PATH, ensure_column, hand_over_legacy_rows
+
+# Prompt history stays under HISTORY_TOKEN_BUDGET: the last KEEP_TURNS exchanges verbatim,
+# everything older folded into a running summary of at most SUMMARY_TOKEN_BUDGET tokens
+KEEP_TURNS = 6
+HISTORY_TOKEN_BUDGET = 1500
+SUMMARY_TOKEN_BUDGET = 300
+
+# cl100k is not Llama's tokenizer, but it is close enough for budgeting
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    return tiktoken.get_encoding("cl100k_base")
+
+def count_tokens(text):
+    return len(_encoding().encode(text))
+
+# Keep the last `max_tokens` tokens of text (the most recent part matters most)
+def truncate_tokens(text, max_tokens):
+    tokens = _encoding().encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return _encoding().decode(tokens[-max_tokens:])
+
+def format_turns(turns):
+    return "\n".join(f"User: {turn['user']}\nMindMate: {turn['assistant']}" for turn in turns)
+
+# Per-user, per-day chat transcript and summary, kept in the same SQLite file as the mood log
+class ChatHistoryStore:
+    def __init__(self, path=DB_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS chat_turns (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                uid TEXT NOT NULL DEFAULT '',
+                date TEXT NOT NULL,
+                user TEXT NOT NULL,
+                assistant TEXT NOT NULL,
+                summarized INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+        # Chats saved before turns had an owner end up under uid ''
+        ensure_column(self._conn, "chat_turns", "uid", "TEXT NOT NULL DEFAULT ''")
+        self._migrate_summaries()
+        self._conn.executescript("""
+            DROP INDEX IF EXISTS idx_chat_turns_date;
+            CREATE INDEX IF NOT EXISTS idx_chat_turns_uid_date ON chat_turns(uid, date, id);
+            CREATE TABLE IF NOT EXISTS chat_summaries (
+                uid TEXT NOT NULL,
+                date TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                PRIMARY KEY (uid, date)
+            );
+        """)
+        hand_over_legacy_rows(self._conn, "chat_turns")
+        hand_over_legacy_rows(self._conn, "chat_summaries")
+        self._conn.commit()
+
+    # chat_summaries used to be keyed by date alone; SQLite can't change a primary key in place
+    def _migrate_summaries(self):
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(chat_summaries)")}
+        if not columns or "uid" in columns:
+            return
+        self._conn.executescript("""
+            BEGIN;
+            ALTER TABLE chat_summaries RENAME TO chat_summaries_by_date;
+            CREATE TABLE chat_summaries (
+                uid TEXT NOT NULL,
+                date TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                PRIMARY KEY (uid, date)
+            );
+            INSERT INTO chat_summaries (uid, date, summary) SELECT '', date, summary FROM chat_summaries_by_date;
+            DROP TABLE chat_summaries_by_date;
+            COMMIT;
+        """)
+
+    def turns(self, uid, date, unsummarized_only=False):
+        sql = "SELECT id, user, assistant FROM chat_turns WHERE uid = ? AND date = ?"
+        if unsummarized_only:
+            sql += " AND summarized = 0"
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY id", (uid, date)).fetchall()
+        return [dict(row) for row in rows]
+
+    # One page of turns before `cursor` (the id of the oldest turn already shown), oldest first.
+    # Returns (turns, next_cursor); next_cursor is None on the earliest page.
+    def page(self, uid, date, cursor=None, limit=15):
+        sql, params = "SELECT id, user, assistant FROM chat_turns WHERE uid = ? AND date = ?", [uid, date]
+        if cursor:
+            sql += " AND id < ?"
+            params.append(cursor)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY id DESC LIMIT ?", params + [limit + 1]).fetchall()
+        turns = [dict(row) for row in reversed(rows[:limit])]
+        return turns, turns[0]["id"] if len(rows) > limit else None
+
+    # Turns before `cursor`, or the whole day's without one
+    def count(self, uid, date, cursor=None):
+        sql, params = "SELECT COUNT(*) FROM chat_turns WHERE uid = ? AND date = ?", [uid, date]
+        if cursor:
+            sql += " AND id < ?"
+            params.append(cursor)
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    # Id of the day's newest turn, 0 before the first; changes whenever any replica adds a turn
+    def latest_id(self, uid, date):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM chat_turns WHERE uid = ? AND date = ?", (uid, date)
+            ).fetchone()[0]
+
+    def append_turn(self, uid, date, user, assistant):
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO chat_turns (uid, date, user, assistant) VALUES (?, ?, ?, ?)",
+                (uid, date, user, assistant)
+            )
+        return {"id": cursor.lastrowid, "user": user, "assistant": assistant}
+
+    def summary(self, uid, date):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM chat_summaries WHERE uid = ? AND date = ?", (uid, date)
+            ).fetchone()
+        return row[0] if row else ""
+
+    # Summary update and the turns it absorbed are committed together
+    def save_summary(self, uid, date, summary, turn_ids):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO chat_summaries (uid, date, summary) VALUES (?, ?, ?) "
+                "ON CONFLICT(uid, date) DO UPDATE SET summary = excluded.summary",
+                (uid, date, summary)
+            )
+            self._conn.executemany("UPDATE chat_turns SET summarized = 1 WHERE id = ?", [(i,) for i in turn_ids])
+
+@st.cache_resource
+def get_chat_history_store():
+    return ChatHistoryStore()
+
+# Token-budgeted conversation memory for one user's day of chat.
+# `summarize(previous_summary, transcript)` returns the new running summary.
+class ChatMemory:
+    def __init__(self, store, uid, date, summarize, keep_turns=KEEP_TURNS,
+                 token_budget=HISTORY_TOKEN_BUDGET, summary_budget=SUMMARY_TOKEN_BUDGET):
+        self.store = store
+        self.uid = uid
+        self.date = date
+        self.summarize = summarize
+        self.keep_turns = keep_turns
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.summary = store.summary(uid, date)
+        self.turns = store.turns(uid, date, unsummarized_only=True)
+
+    def add_turn(self, user, assistant):
+        turn = self.store.append_turn(self.uid, self.date, user, assistant)
+        self.turns.append(turn)
+        self._compact()
+        return turn
+
+    # Fold the oldest turns into the summary until both limits hold again
+    def _compact(self):
+        overflow = max(len(self.turns) - self.keep_turns, 0)
+        while overflow < len(self.turns) - 1 and self._tokens_without(overflow) > self.token_budget:
+            overflow += 1
+        if not overflow:
+            return
+        folded, self.turns = self.turns[:overflow], self.turns[overflow:]
+        summary = self.summarize(self.summary, format_turns(folded))
+        self.summary = truncate_tokens(summary.strip(), self.summary_budget)
+        self.store.save_summary(self.uid, self.date, self.summary, [turn["id"] for turn in folded])
+
+    def _tokens_without(self, count):
+        return count_tokens(self.summary) + count_tokens(format_turns(self.turns[count:]))
+
+    # History block for the prompt; never longer than token_budget
+    def history(self):
+        parts = []
+        if self.summary:
+            parts.append(f"Summary of earlier conversation: {self.summary}")
+        if self.turns:
+            parts.append(format_turns(self.turns))
+        return truncate_tokens("\n\n".join(parts), self.token_budget)
@@ -0,0 +1,223 @@
+# utils/jobs.py
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import streamlit as st
+
+# Threads for I/O-bound work (LLM calls, imports), processes for CPU-bound work (PDF rendering)
+JOB_THREADS = int(os.getenv("MINDMATE_JOB_THREADS", "16"))
+JOB_PROCESSES = int(os.getenv("MINDMATE_JOB_PROCESSES", "2"))
+# Finished jobs kept for status lookups and as a result cache for keyed submissions. Report PDFs
+# make results large, so the oldest are also dropped once the cached bytes pass the budget.
+MAX_FINISHED_JOBS = 256
+MAX_FINISHED_BYTES = int(os.getenv("MINDMATE_JOB_CACHE_MB", "64")) * 1024 * 1024
+POLL_SECONDS = 1.0
+
+class JobCancelled(Exception):
+    pass
+
+# Runs in the worker (thread or process); wall-clock times so process jobs can be timed too
+def _timed_call(fn, args, kwargs):
+    started = time.time()
+    result = fn(*args, **kwargs)
+    return started, time.time(), result
+
+class Job:
+    def __init__(self, job_id, key, label, pool):
+        self.id = job_id
+        self.key = key
+        self.label = label
+        self.pool = pool
+        self.future = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.progress = 0.0
+        self.message = ""
+        self.cancel_requested = False
+        self.size = 0
+
+    # Thread jobs submitted with pass_job=True call this as they go; it is also the cancellation point
+    def report(self, fraction, message=""):
+        self.progress = fraction
+        self.message = message
+        if self.cancel_requested:
+            raise JobCancelled()
+
+    # Read from the future, not from _finished, so a poll that lands before the done-callback
+    # has run still sees a failure
+    @property
+    def error(self):
+        if not self.future.done() or self.future.cancelled():
+            return None
+        return self.future.exception()
+
+    @property
+    def state(self):
+        if self.future.cancelled() or (self.cancel_requested and self.future.done()):
+            return "cancelled"
+        if not self.future.done():
+            return "running" if self.started or self.future.running() else "queued"
+        return "failed" if self.error is not None else "done"
+
+    def result(self):
+        return self.future.result()[2]
+
+    def status(self):
+        now = time.time()
+        started = self.started or (now if self.future.running() else None)
+        return {
+            "id": self.id,
+            "label": self.label,
+            "state": self.state,
+            "progress": self.progress,
+            "message": self.message,
+            "queue_wait": round((started or now) - self.submitted, 3),
+            "run_time": round((self.finished or now) - started, 3) if started else 0.0,
+        }
+
+# Process-wide job executor shared by every session. A job outlives the rerun that started it,
+# so a slow PDF or LLM call never holds a session's script thread; pages poll job status instead.
+# Jobs submitted with a key are shared: the same key returns the running job or its cached result.
+class JobExecutor:
+    def __init__(self, threads=JOB_THREADS, processes=JOB_PROCESSES):
+        self._lock = threading.Lock()
+        self._threads = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="mindmate-job")
+        self._process_workers = processes
+        self._processes = None
+        self._jobs = OrderedDict()
+        self._by_key = {}
+        self.counters = {"submitted": 0, "cache_hits": 0, "done": 0, "failed": 0, "cancelled": 0}
+        self.totals = {"timed": 0, "queue_wait": 0.0, "run_time": 0.0, "max_queue_wait": 0.0, "max_run_time": 0.0}
+
+    def _process_pool(self):
+        # Spawned, not forked: the parent runs many threads (Streamlit, scheduler, pools)
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(
+                max_workers=self._process_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._processes
+
+    def submit(self, fn, *args, key=None, label="", pool="thread", pass_job=False, **kwargs):
+        with self._lock:
+            if key is not None and key in self._by_key:
+                self.counters["cache_hits"] += 1
+                return self._by_key[key]
+            job = Job(uuid.uuid4().hex[:12], key, label, pool)
+            if pass_job:
+                kwargs["job"] = job
+            if pool == "process":
+                job.future = self._process_pool().submit(_timed_call, fn, args, kwargs)
+            else:
+                job.future = self._threads.submit(_timed_call, fn, args, kwargs)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._by_key[key] = job.id
+            self.counters["submitted"] += 1
+            self._evict()
+        job.future.add_done_callback(lambda future: self._finished(job))
+        return job.id
+
+    def _finished(self, job):
+        with self._lock:
+            if job.future.cancelled():
+                job.finished = time.time()
+            else:
+                if job.future.exception() is None:
+                    job.started, job.finished, result = job.future.result()
+                    job.size = len(result) if isinstance(result, (bytes, bytearray, str)) else 0
+                else:
+                    job.finished = time.time()
+            state = job.state
+            self.counters[state if state in self.counters else "failed"] += 1
+            if job.started:
+                queue_wait, run_time = job.started - job.submitted, job.finished - job.started
+                self.totals["timed"] += 1
+                self.totals["queue_wait"] += queue_wait
+                self.totals["run_time"] += run_time
+                self.totals["max_queue_wait"] = max(self.totals["max_queue_wait"], queue_wait)
+                self.totals["max_run_time"] = max(self.totals["max_run_time"], run_time)
+            # Only successes are cached: a cancelled or failed key runs again on its next submit.
+            # Callers that show a failure keep the job id rather than resubmitting on every rerun.
+            if state != "done" and job.key is not None and self._by_key.get(job.key) == job.id:
+                del self._by_key[job.key]
+            self._evict()
+
+    # Oldest finished jobs first, until both budgets hold; the newest finished job is always kept
+    # so a session can fetch a result even if it alone is over the byte budget
+    def _evict(self):
+        finished = [job for job in self._jobs.values() if job.future.done()]
+        count, size = len(finished), sum(job.size for job in finished)
+        for job in finished[:-1]:
+            if count <= MAX_FINISHED_JOBS and size <= MAX_FINISHED_BYTES:
+                break
+            del self._jobs[job.id]
+            count, size = count - 1, size - job.size
+            if job.key is not None and self._by_key.get(job.key) == job.id:
+                del self._by_key[job.key]
+
+    def job(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id):
+        job = self.job(job_id)
+        return job.status() if job else None
+
+    def result(self, job_id):
+        return self.job(job_id).result()
+
+    # Queued jobs are dropped; running thread jobs stop at their next report(); anything else
+    # finishes in the background and its result is discarded
+    def cancel(self, job_id):
+        job = self.job(job_id)
+        if job is None or job.future.done():
+            return False
+        job.cancel_requested = True
+        job.future.cancel()
+        with self._lock:
+            if job.key is not None and self._by_key.get(job.key) == job_id:
+                del self._by_key[job.key]
+        return True
+
+    def stats(self):
+        with self._lock:
+            states = [job.state for job in self._jobs.values()]
+            timed = max(1, self.totals["timed"])
+            return dict(
+                self.counters,
+                queued=states.count("queued"),
+                running=states.count("running"),
+                mean_queue_wait=round(self.totals["queue_wait"] / timed, 3),
+                mean_run_time=round(self.totals["run_time"] / timed, 3),
+                max_queue_wait=round(self.totals["max_queue_wait"], 3),
+                max_run_time=round(self.totals["max_run_time"], 3),
+            )
+
+@st.cache_resource
+def get_job_executor():
+    return JobExecutor()
+
+# Polls a job without blocking the page: only this fragment reruns every POLL_SECONDS, and the
+# whole app reruns once when the job is over so the caller can show the result.
+# cancel_key names a session flag that the Cancel button clears so the caller stops resubmitting.
+@st.fragment(run_every=POLL_SECONDS)
+def wait_for_job(job_id, cancel_key=None):
+    executor = get_job_executor()
+    job = executor.job(job_id)
+    if job is None or job.state in ("done", "failed", "cancelled"):
+        st.rerun(scope="app")
+    status = job.status()
+    if status["state"] == "queued":
+        text = f"{job.label} · waiting {status['queue_wait']:.0f}s for a free worker"
+    else:
+        text = f"{job.label} · {status['message'] or 'working'} · {status['run_time']:.0f}s"
+    st.progress(min(max(status["progress"], 0.0), 1.0), text=text)
+    if cancel_key is not None and st.button("✖️ Cancel", key=f"cancel_{job_id}"):
+        executor.cancel(job_id)
+        st.session_state[cancel_key] = None
+        st.rerun(scope="app")
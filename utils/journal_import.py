@@ -0,0 +1,189 @@
+# utils/journal_import.py
+import csv
+import datetime
+import hashlib
+import io
+import json
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import streamlit as st
+from utils.mood_store import DB_PATH
+
+DEFAULT_MOOD = "😐 Neutral"
+TEXT_FIELDS = ("text", "entry", "journal", "note", "content")
+# Markdown entries start at a heading containing an ISO date, e.g. "## 2024-03-01 — 😢 Sad"
+HEADING = re.compile(r"^#{1,6}\s+(?P<date>\d{4}-\d{2}-\d{2})\s*(?:[-—–:|]\s*(?P<mood>.+?))?\s*$")
+
+# Entries are filed by day, so every one needs an ISO date; a timestamp keeps only its date
+def _date(value, where):
+    value = value.strip() if isinstance(value, str) else ""
+    if not value:
+        raise ValueError(f"{where} has no date")
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except ValueError:
+        pass
+    try:
+        return datetime.datetime.fromisoformat(value).date().isoformat()
+    except ValueError:
+        raise ValueError(f"{where}: {value!r} is not a YYYY-MM-DD date") from None
+
+def _entry(date, mood, text, where):
+    return {"date": _date(date, where), "mood": (mood or "").strip() or DEFAULT_MOOD, "text": (text or "").strip()}
+
+def _text_of(record):
+    return next((record[field] for field in TEXT_FIELDS if record.get(field)), "")
+
+# A JSONL line must be an object with a date whose mood and text, when present, are strings
+def _json_entry(line, number):
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError(f"line {number} is not a JSON object")
+    record = {str(key).lower(): value for key, value in record.items()}
+    mood, text = record.get("mood"), _text_of(record)
+    if not isinstance(mood, (str, type(None))) or not isinstance(text, str):
+        raise ValueError(f"line {number}: mood and text must be strings")
+    return _entry(record.get("date"), mood, text, f"line {number}")
+
+# Yields {date, mood, text} dicts from a CSV, JSONL or Markdown export without loading it all into dicts first
+def parse_entries(filename, data):
+    text = data.decode("utf-8-sig") if isinstance(data, bytes) else data
+    name = filename.lower()
+    if name.endswith(".csv"):
+        reader = csv.DictReader(io.StringIO(text))
+        for row in reader:
+            row = {(key or "").strip().lower(): value for key, value in row.items()}
+            yield _entry(row.get("date"), row.get("mood"), _text_of(row), f"line {reader.line_num}")
+    elif name.endswith((".jsonl", ".ndjson")):
+        for number, line in enumerate(io.StringIO(text), 1):
+            if line.strip():
+                yield _json_entry(line, number)
+    elif name.endswith((".md", ".markdown")):
+        current, lines = None, []
+        for line in io.StringIO(text):
+            match = HEADING.match(line.strip())
+            if match:
+                if current:
+                    yield _entry(current["date"], current["mood"], "".join(lines), f"heading {current['date']}")
+                current, lines = match.groupdict(), []
+            elif current:
+                lines.append(line)
+        if current:
+            yield _entry(current["date"], current["mood"], "".join(lines), f"heading {current['date']}")
+    else:
+        raise ValueError(f"Unsupported journal file: {filename} (use .csv, .jsonl or .md)")
+
+# Import jobs and their per-entry results; a job id is the hash of the user and the uploaded
+# file, so uploading the same file again resumes where the last run stopped
+class ImportStore:
+    def __init__(self, path=DB_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS import_jobs (
+                id TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                total INTEGER NOT NULL,
+                created TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE TABLE IF NOT EXISTS import_results (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                date TEXT NOT NULL,
+                mood TEXT NOT NULL,
+                text TEXT NOT NULL,
+                reflection TEXT NOT NULL,
+                coping TEXT NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            );
+        """)
+        self._conn.commit()
+
+    def start_job(self, job_id, filename, total):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO import_jobs (id, filename, total) VALUES (?, ?, ?)",
+                (job_id, filename, total)
+            )
+
+    def done_seqs(self, job_id):
+        with self._lock:
+            rows = self._conn.execute("SELECT seq FROM import_results WHERE job_id = ?", (job_id,)).fetchall()
+        return {row[0] for row in rows}
+
+    # Checkpoint: one committed row per finished entry
+    def save_result(self, job_id, seq, entry, reflection, coping):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO import_results (job_id, seq, date, mood, text, reflection, coping) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, seq, entry["date"], entry["mood"], entry["text"], reflection, coping)
+            )
+
+    def results(self, job_id, limit=None):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, date, mood, text, reflection, coping FROM import_results WHERE job_id = ? "
+                "ORDER BY seq LIMIT ?", (job_id, limit or -1)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+@st.cache_resource
+def get_import_store():
+    return ImportStore()
+
+# Per user and file: re-uploading resumes the same job, another user's upload of it is a new one
+def job_id_for(uid, data):
+    return hashlib.sha256(uid.encode() + b"\0" + data).hexdigest()[:16]
+
+# Runs process(entry) -> (reflection, coping) over every entry not yet checkpointed, with at most
+# `concurrency` calls in flight. on_progress(done, total, entries_per_sec) runs in the caller's thread.
+def run_import(store, job_id, filename, entries, process, concurrency=4, on_progress=None, on_batch=None):
+    entries = [entry for entry in entries if entry["text"]]
+    store.start_job(job_id, filename, len(entries))
+    finished = store.done_seqs(job_id)
+    pending = ((seq, entry) for seq, entry in enumerate(entries) if seq not in finished)
+    done, total = len(finished), len(entries)
+    started, processed, batch = time.monotonic(), 0, []
+
+    def report():
+        if on_progress:
+            elapsed = time.monotonic() - started
+            on_progress(done, total, processed / elapsed if elapsed > 0 else 0.0)
+
+    report()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            in_flight = {}
+            while True:
+                # Keep the pool full without queueing the whole file
+                while len(in_flight) < concurrency:
+                    item = next(pending, None)
+                    if item is None:
+                        break
+                    in_flight[pool.submit(process, item[1])] = item
+                if not in_flight:
+                    break
+                completed, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    seq, entry = in_flight.pop(future)
+                    reflection, coping = future.result()
+                    store.save_result(job_id, seq, entry, reflection, coping)
+                    batch.append(entry)
+                    done += 1
+                    processed += 1
+                if on_batch and len(batch) >= 32:
+                    on_batch(batch)
+                    batch = []
+                report()
+    finally:
+        # Entries checkpointed before a cancel or failure won't be processed again on resume,
+        # so they are handed to on_batch now
+        if on_batch and batch:
+            on_batch(batch)
+    return done, total
@@ -0,0 +1,159 @@
+# utils/journal_index.py
+import os
+import sqlite3
+import threading
+import faiss
+import numpy as np
+import streamlit as st
+from utils.mood_store import DB_PATH, ensure_column, hand_over_legacy_rows
+
+EMBEDDING_MODEL = os.getenv("MINDMATE_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+JOURNAL_INDEX_PATH = os.getenv("MINDMATE_JOURNAL_INDEX", "journal.faiss")
+EMBED_BATCH_SIZE = 64
+# The index file is rewritten after this many new vectors; anything newer is re-embedded on startup
+SAVE_EVERY = 256
+
+# Loaded once per process; sentence-transformers pulls in torch, so import it only here
+@st.cache_resource
+def get_embedder():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDING_MODEL, device="cpu")
+
+def embed(texts, embedder=None):
+    embedder = embedder or get_embedder()
+    vectors = embedder.encode(texts, batch_size=EMBED_BATCH_SIZE, normalize_embeddings=True)
+    return np.asarray(vectors, dtype="float32")
+
+# Journal entries in SQLite, their embeddings in an on-disk FAISS index keyed by entry id.
+# Vectors are normalized, so inner product is cosine similarity. All users share the index;
+# a search only considers the ids of the searching user's own entries. Every replica keeps its
+# own in-memory index and embeds whatever entries it is missing, including other replicas' writes.
+class JournalIndex:
+    def __init__(self, path=DB_PATH, index_path=JOURNAL_INDEX_PATH, embedder=None):
+        self._lock = threading.Lock()
+        self.index_path = index_path
+        self.embedder = embedder or get_embedder()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS journal_entries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                uid TEXT NOT NULL DEFAULT '',
+                date TEXT NOT NULL,
+                mood TEXT NOT NULL,
+                text TEXT NOT NULL
+            )
+        """)
+        # Entries written before they had an owner end up under uid ''
+        ensure_column(self._conn, "journal_entries", "uid", "TEXT NOT NULL DEFAULT ''")
+        hand_over_legacy_rows(self._conn, "journal_entries")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_journal_entries_uid ON journal_entries(uid, id)")
+        self._conn.commit()
+
+        if index_path and os.path.exists(index_path):
+            self.index = faiss.read_index(index_path)
+        else:
+            dim = self.embedder.get_sentence_embedding_dimension()
+            self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+        self._unsaved = 0
+        self._data_version = None
+        with self._lock:
+            self._sync()
+            self._save()
+
+    # Embeds entries that are in the table but not in the index: written after the index file was
+    # saved, or by another replica (whose saves of the shared file can also replace ours).
+    # PRAGMA data_version only moves when another connection commits, so with no writes
+    # elsewhere the check costs one pragma. Caller holds the lock.
+    def _sync(self):
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return
+        stored = np.fromiter((row[0] for row in self._conn.execute("SELECT id FROM journal_entries")), dtype="int64")
+        missing = np.setdiff1d(stored, faiss.vector_to_array(self.index.id_map)).tolist()
+        for start in range(0, len(missing), EMBED_BATCH_SIZE * 16):
+            batch = missing[start:start + EMBED_BATCH_SIZE * 16]
+            rows = self._conn.execute(
+                f"SELECT id, text FROM journal_entries WHERE id IN ({','.join('?' * len(batch))})", batch
+            ).fetchall()
+            self._add_vectors([row["id"] for row in rows], embed([row["text"] for row in rows], self.embedder))
+        # Only once everything is embedded, so a failed embed is retried on the next check
+        self._data_version = data_version
+
+    def _add_vectors(self, ids, vectors):
+        self.index.add_with_ids(vectors, np.asarray(ids, dtype="int64"))
+        self._unsaved += len(ids)
+
+    # entries: iterable of dicts with date, mood and text, all written by uid; embedded in one batch
+    def add_entries(self, uid, entries):
+        entries = [entry for entry in entries if entry["text"].strip()]
+        if not entries:
+            return []
+        vectors = embed([entry["text"] for entry in entries], self.embedder)
+        with self._lock:
+            self._sync()
+            with self._conn:
+                ids = [
+                    self._conn.execute(
+                        "INSERT INTO journal_entries (uid, date, mood, text) VALUES (?, ?, ?, ?)",
+                        (uid, entry["date"], entry["mood"], entry["text"])
+                    ).lastrowid
+                    for entry in entries
+                ]
+            self._add_vectors(ids, vectors)
+            if self._unsaved >= SAVE_EVERY:
+                self._save()
+        return ids
+
+    def add_entry(self, uid, date, mood, text):
+        ids = self.add_entries(uid, [{"date": date, "mood": mood, "text": text}])
+        return ids[0] if ids else None
+
+    # Top-k most similar past entries of uid, best first, above min_score
+    def search(self, uid, text, k=3, min_score=0.35):
+        if not text.strip():
+            return []
+        query = embed([text], self.embedder)
+        with self._lock:
+            self._sync()
+            own_ids = np.fromiter(
+                (row[0] for row in self._conn.execute("SELECT id FROM journal_entries WHERE uid = ?", (uid,))),
+                dtype="int64"
+            )
+            if not len(own_ids) or not self.index.ntotal:
+                return []
+            # The selector is applied inside the scan, so other users' entries can't crowd out the top k
+            params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(own_ids))
+            scores, ids = self.index.search(query, k, params=params)
+            hits = [(int(i), float(s)) for i, s in zip(ids[0], scores[0]) if i != -1 and s >= min_score]
+            if not hits:
+                return []
+            rows = self._conn.execute(
+                f"SELECT id, date, mood, text FROM journal_entries WHERE uid = ? AND id IN ({','.join('?' * len(hits))})",
+                [uid] + [i for i, _ in hits]
+            ).fetchall()
+        by_id = {row["id"]: dict(row) for row in rows}
+        return [dict(by_id[i], score=score) for i, score in hits if i in by_id]
+
+    def _save(self):
+        if self.index_path and self._unsaved:
+            faiss.write_index(self.index, self.index_path)
+            self._unsaved = 0
+
+    def flush(self):
+        with self._lock:
+            self._save()
+
+    def __len__(self):
+        return self.index.ntotal
+
+@st.cache_resource
+def get_journal_index():
+    return JournalIndex()
+
+# Compact prompt block for the retrieved entries
+def format_past_entries(entries, max_chars=300):
+    if not entries:
+        return "(none)"
+    return "\n".join(f"- {entry['date']} ({entry['mood']}): {entry['text'][:max_chars]}" for entry in entries)
@@ -0,0 +1,15 @@
+# utils/lazy_loader.py
+import importlib
+import sys
+import time
+
+# Seconds spent importing each lazily loaded module (cumulative, like `python -X importtime`)
+import_times = {}
+
+# Import a phase module on first use and return one of its functions
+def load(module_name, attr):
+    if module_name not in sys.modules:
+        start = time.perf_counter()
+        importlib.import_module(module_name)
+        import_times[module_name] = time.perf_counter() - start
+    return getattr(sys.modules[module_name], attr)
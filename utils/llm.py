@@ -1,12 +1,172 @@
 # utils/llm.py
 import os
+import threading
+import time
+import groq
+import httpx
+import streamlit as st
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
+from utils.profiling import llm_callbacks
 
 load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-llm = ChatGroq(
-    model_name="llama3-8b-8192",
-    api_key=GROQ_API_KEY
-)
+DEFAULT_MODEL = "llama3-8b-8192"
+DEFAULT_TEMPERATURE = 0.7
+
+# Upper bound on simultaneous Groq requests per process; extra calls wait for a free connection
+MAX_CONNECTIONS = int(os.getenv("MINDMATE_LLM_MAX_CONNECTIONS", "8"))
+
+# Serve from a local CPU model when Groq is slow or unreachable (MINDMATE_LOCAL_FALLBACK=1)
+LOCAL_FALLBACK = os.getenv("MINDMATE_LOCAL_FALLBACK") == "1"
+# Groq latency (seconds, EWMA of full replies / first streamed token) above which the local model takes over
+FALLBACK_LATENCY = float(os.getenv("MINDMATE_FALLBACK_LATENCY", "8"))
+# How long to stay on the local model before trying Groq again
+FALLBACK_COOLDOWN = 60.0
+
+# Network-level failures; rate limits (429) are left to the scheduler's retry logic
+def is_unavailable(error):
+    return isinstance(error, (groq.APIConnectionError, groq.InternalServerError, httpx.TransportError))
+
+# Same invoke/stream interface as ChatGroq, switching to the local model while Groq is unhealthy
+class FallbackLLM:
+    def __init__(self, primary, local_factory, latency_threshold=FALLBACK_LATENCY, cooldown=FALLBACK_COOLDOWN):
+        self.primary = primary
+        self.local_factory = local_factory
+        self.model_name = primary.model_name
+        self.temperature = primary.temperature
+        self.latency_threshold = latency_threshold
+        self.cooldown = cooldown
+        self.latency = None
+        self.down_until = 0.0
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+
+    def using_local(self):
+        return time.monotonic() < self.down_until
+
+    def _trip(self):
+        with self._lock:
+            self.down_until = time.monotonic() + self.cooldown
+            self.latency = None
+            self.fallbacks += 1
+
+    def _observe(self, seconds):
+        with self._lock:
+            self.latency = seconds if self.latency is None else 0.7 * self.latency + 0.3 * seconds
+            slow = self.latency > self.latency_threshold
+        if slow:
+            self._trip()
+
+    def invoke(self, prompt):
+        if self.using_local():
+            return self.local_factory().invoke(prompt)
+        start = time.monotonic()
+        try:
+            response = self.primary.invoke(prompt)
+        except Exception as e:
+            if not is_unavailable(e):
+                raise
+            self._trip()
+            return self.local_factory().invoke(prompt)
+        self._observe(time.monotonic() - start)
+        return response
+
+    def stream(self, prompt):
+        if self.using_local():
+            yield from self.local_factory().stream(prompt)
+            return
+        start = time.monotonic()
+        started = False
+        try:
+            for chunk in self.primary.stream(prompt):
+                if not started:
+                    started = True
+                    self._observe(time.monotonic() - start)
+                yield chunk
+        except Exception as e:
+            # Once tokens have been shown, switching models mid-reply would garble it
+            if started or not is_unavailable(e):
+                raise
+            self._trip()
+            yield from self.local_factory().stream(prompt)
+
+# One ChatGroq per (model, temperature), all sharing the same HTTP connection pool
+class LLMPool:
+    def __init__(self, max_connections=MAX_CONNECTIONS):
+        self._lock = threading.Lock()
+        self._clients = {}
+        self.requests = 0
+        self.new_connections = 0
+
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        # No pool timeout: once every connection is busy, callers queue instead of failing
+        timeout = httpx.Timeout(60.0, connect=10.0, pool=None)
+        self.http_client = httpx.Client(
+            limits=limits, timeout=timeout,
+            event_hooks={"request": [self._on_request]}
+        )
+        self.http_async_client = httpx.AsyncClient(
+            limits=limits, timeout=timeout,
+            event_hooks={"request": [self._on_async_request]}
+        )
+
+    # httpcore reports a TCP connect only when no pooled connection could be reused
+    def _trace(self, event_name, info):
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.new_connections += 1
+
+    def _on_request(self, request):
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    async def _on_async_request(self, request):
+        self._on_request(request)
+
+    def get(self, model_name=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE):
+        key = (model_name, temperature)
+        with self._lock:
+            if key not in self._clients:
+                client = ChatGroq(
+                    model_name=model_name,
+                    temperature=temperature,
+                    api_key=GROQ_API_KEY,
+                    http_client=self.http_client,
+                    http_async_client=self.http_async_client,
+                    callbacks=llm_callbacks() or None
+                )
+                if LOCAL_FALLBACK:
+                    from utils.local_llm import get_local_llm
+                    client = FallbackLLM(client, get_local_llm)
+                self._clients[key] = client
+            return self._clients[key]
+
+    def stats(self):
+        with self._lock:
+            reused = max(self.requests - self.new_connections, 0)
+            return {
+                "clients": len(self._clients),
+                "on_local_fallback": sum(
+                    isinstance(client, FallbackLLM) and client.using_local() for client in self._clients.values()
+                ),
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "connection_reuse_rate": reused / self.requests if self.requests else 0.0
+            }
+
+# Built on first use and kept across Streamlit reruns and sessions
+@st.cache_resource
+def get_llm_pool():
+    if LOCAL_FALLBACK:
+        from utils.local_llm import warm_local_llm
+        warm_local_llm()
+    return LLMPool()
+
+def get_llm(model_name=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE):
+    return get_llm_pool().get(model_name, temperature)
+
+def llm_pool_stats():
+    return get_llm_pool().stats()
@@ -0,0 +1,184 @@
+# utils/llm_scheduler.py
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+import streamlit as st
+
+# Groq account limits for the shared model; tune per deployment
+REQUESTS_PER_MINUTE = int(os.getenv("GROQ_RPM", "30"))
+TOKENS_PER_MINUTE = int(os.getenv("GROQ_TPM", "30000"))
+SCHEDULER_WORKERS = int(os.getenv("MINDMATE_LLM_WORKERS", "8"))
+MAX_RETRIES = 4
+# Rough completion size used when budgeting tokens before a call
+EXPECTED_COMPLETION_TOKENS = 256
+
+# Lower runs first: someone waiting in the chat beats a music insight
+PRIORITY_CHAT = 0
+PRIORITY_JOURNAL = 1
+PRIORITY_SUMMARY = 2
+PRIORITY_MUSIC = 3
+PRIORITY_BATCH = 4
+
+def estimate_tokens(prompt):
+    return len(prompt) // 4 + EXPECTED_COMPLETION_TOKENS
+
+def _content(message):
+    return message.content if hasattr(message, 'content') else str(message)
+
+# Refills continuously at `per_minute / 60` units per second, up to one minute's worth
+class TokenBucket:
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+def is_rate_limited(error):
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429
+
+def _retry_after(error):
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+# Exponential backoff with full jitter, never shorter than the server's Retry-After
+def backoff_delay(attempt, retry_after=None, base=0.5, cap=20.0):
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    return max(delay, retry_after or 0.0)
+
+class _Job:
+    def __init__(self, key, fn, tokens, future):
+        self.key = key
+        self.fn = fn
+        self.tokens = tokens
+        self.future = future
+
+# Process-wide gatekeeper for Groq calls: one priority queue, request- and token-per-minute
+# buckets, identical in-flight prompts merged into one call, 429s retried with jittered backoff
+class LLMScheduler:
+    def __init__(self, rpm=REQUESTS_PER_MINUTE, tpm=TOKENS_PER_MINUTE, workers=SCHEDULER_WORKERS,
+                 max_retries=MAX_RETRIES):
+        self.request_bucket = TokenBucket(rpm)
+        self.token_bucket = TokenBucket(tpm)
+        self.max_retries = max_retries
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._inflight = {}
+        self.counters = {"submitted": 0, "coalesced": 0, "completed": 0, "failed": 0, "retries": 0}
+        for _ in range(workers):
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    # Queue fn() and return a Future; a call with the same key already in flight is shared
+    def submit(self, fn, key=None, tokens=0, priority=PRIORITY_MUSIC):
+        with self._cond:
+            if key is not None and key in self._inflight:
+                self.counters["coalesced"] += 1
+                return self._inflight[key]
+            future = Future()
+            if key is not None:
+                self._inflight[key] = future
+            self.counters["submitted"] += 1
+            heapq.heappush(self._queue, (priority, next(self._seq), _Job(key, fn, tokens, future)))
+            self._cond.notify()
+        return future
+
+    def _next_job(self):
+        with self._cond:
+            while True:
+                while not self._queue:
+                    self._cond.wait()
+                # Only the head is eligible, so a waiting chat request is never overtaken
+                job = self._queue[0][2]
+                wait = max(self.request_bucket.wait_time(1), self.token_bucket.wait_time(job.tokens))
+                if wait <= 0:
+                    heapq.heappop(self._queue)
+                    self.request_bucket.take(1)
+                    self.token_bucket.take(job.tokens)
+                    return job
+                self._cond.wait(timeout=wait)
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            try:
+                job.future.set_result(self._run_with_retries(job.fn))
+                self._count("completed")
+            except Exception as e:
+                job.future.set_exception(e)
+                self._count("failed")
+            finally:
+                with self._cond:
+                    if job.key is not None and self._inflight.get(job.key) is job.future:
+                        del self._inflight[job.key]
+
+    def _run_with_retries(self, fn):
+        for attempt in range(self.max_retries + 1):
+            try:
+                return fn()
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == self.max_retries:
+                    raise
+                self._count("retries")
+                time.sleep(backoff_delay(attempt, _retry_after(e)))
+
+    def _count(self, name):
+        with self._cond:
+            self.counters[name] += 1
+
+    # Queue one prompt; the Future resolves to the reply text
+    def submit_prompt(self, llm, prompt, priority=PRIORITY_MUSIC):
+        key = (getattr(llm, "model_name", None), getattr(llm, "temperature", None), prompt)
+        return self.submit(lambda: _content(llm.invoke(prompt)), key, estimate_tokens(prompt), priority)
+
+    # Blocking call returning the reply text
+    def invoke(self, llm, prompt, priority=PRIORITY_MUSIC):
+        return self.submit_prompt(llm, prompt, priority).result()
+
+    # Waits for a rate-limit slot in priority order, then streams text chunks in the caller's thread.
+    # A 429 before the first chunk is retried; once tokens have been shown it is raised.
+    def stream(self, llm, prompt, priority=PRIORITY_CHAT):
+        for attempt in range(self.max_retries + 1):
+            self.submit(lambda: None, tokens=estimate_tokens(prompt), priority=priority).result()
+            started = False
+            try:
+                for chunk in llm.stream(prompt):
+                    started = True
+                    yield _content(chunk)
+                return
+            except Exception as e:
+                if started or not is_rate_limited(e) or attempt == self.max_retries:
+                    raise
+                self._count("retries")
+                time.sleep(backoff_delay(attempt, _retry_after(e)))
+
+    def stats(self):
+        with self._cond:
+            return dict(self.counters, queued=len(self._queue), in_flight=len(self._inflight),
+                        request_budget=round(self.request_bucket.level, 1),
+                        token_budget=round(self.token_bucket.level))
+
+@st.cache_resource
+def get_llm_scheduler():
+    return LLMScheduler()
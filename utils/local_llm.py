@@ -0,0 +1,130 @@
+# utils/local_llm.py
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import streamlit as st
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+LOCAL_MODEL = os.getenv("MINDMATE_LOCAL_MODEL", "Qwen/Qwen2.5-0.5B-Instruct")
+LOCAL_MAX_NEW_TOKENS = int(os.getenv("MINDMATE_LOCAL_MAX_NEW_TOKENS", "200"))
+# Requests arriving within BATCH_WINDOW seconds of each other share one generate() call
+MAX_BATCH = 8
+BATCH_WINDOW = 0.05
+
+# Uses the copy in the Hugging Face cache when there is one, so an app that was set up with
+# the model pre-downloaded starts without the network; otherwise downloads it
+def from_pretrained(loader, model_name, **kwargs):
+    try:
+        return loader.from_pretrained(model_name, local_files_only=True, **kwargs)
+    except OSError:
+        return loader.from_pretrained(model_name, **kwargs)
+
+# Small causal LM on CPU, shared by every session. One worker thread drains the request
+# queue and runs dynamically sized batches, so concurrent sessions don't each pay a full pass.
+class LocalLLM:
+    def __init__(self, model_name=LOCAL_MODEL, max_batch=MAX_BATCH, batch_window=BATCH_WINDOW,
+                 max_new_tokens=LOCAL_MAX_NEW_TOKENS):
+        # torch/transformers are only imported when the fallback is actually used
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer
+
+        self.torch = torch
+        self.model_name = model_name
+        self.temperature = 0.7
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.max_new_tokens = max_new_tokens
+        self.tokenizer = from_pretrained(AutoTokenizer, model_name, padding_side="left")
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.model = from_pretrained(AutoModelForCausalLM, model_name, torch_dtype=torch.float32)
+        self.model.eval()
+
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "batches": 0, "generated_tokens": 0, "generate_seconds": 0.0}
+        self._requests = queue.Queue()
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def _format(self, prompt):
+        if getattr(self.tokenizer, "chat_template", None):
+            return self.tokenizer.apply_chat_template(
+                [{"role": "user", "content": prompt}], tokenize=False, add_generation_prompt=True
+            )
+        return prompt
+
+    def _worker(self):
+        while True:
+            batch = [self._requests.get()]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                texts = self._generate([prompt for prompt, _ in batch])
+                for (_, future), text in zip(batch, texts):
+                    future.set_result(text)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+
+    def _generate(self, prompts):
+        start = time.perf_counter()
+        inputs = self.tokenizer(
+            [self._format(prompt) for prompt in prompts],
+            return_tensors="pt", padding=True, truncation=True, max_length=2048
+        )
+        with self.torch.inference_mode():
+            output = self.model.generate(
+                **inputs,
+                max_new_tokens=self.max_new_tokens,
+                do_sample=True,
+                temperature=self.temperature,
+                top_p=0.9,
+                pad_token_id=self.tokenizer.pad_token_id
+            )
+        new_tokens = output[:, inputs["input_ids"].shape[1]:]
+        with self._lock:
+            self.counters["requests"] += len(prompts)
+            self.counters["batches"] += 1
+            self.counters["generated_tokens"] += int((new_tokens != self.tokenizer.pad_token_id).sum())
+            self.counters["generate_seconds"] += time.perf_counter() - start
+        return self.tokenizer.batch_decode(new_tokens, skip_special_tokens=True)
+
+    def invoke(self, prompt):
+        future = Future()
+        self._requests.put((prompt, future))
+        return AIMessage(content=future.result().strip())
+
+    # Batched generation returns whole completions, so the "stream" is a single chunk
+    def stream(self, prompt):
+        yield AIMessageChunk(content=self.invoke(prompt).content)
+
+    def stats(self):
+        with self._lock:
+            seconds = self.counters["generate_seconds"]
+            return dict(
+                self.counters,
+                tokens_per_second=self.counters["generated_tokens"] / seconds if seconds else 0.0,
+                mean_batch_size=self.counters["requests"] / self.counters["batches"] if self.counters["batches"] else 0.0
+            )
+
+@st.cache_resource
+def get_local_llm():
+    return LocalLLM()
+
+# Loads the model in the background so the first fallback request doesn't wait for it (or
+# find the network already down). A failed warm-up is not cached; the first fallback retries.
+def warm_local_llm():
+    def load():
+        try:
+            get_local_llm()
+        except Exception:
+            pass
+    threading.Thread(target=load, name="mindmate-local-llm-warmup", daemon=True).start()
@@ -0,0 +1,96 @@
+# utils/media.py
+import json
+import mmap
+import os
+import shutil
+import subprocess
+import threading
+import streamlit as st
+
+MEDIA_MANIFEST = os.getenv("MINDMATE_MEDIA_MANIFEST", os.path.join("media", "manifest.json"))
+MEDIA_CACHE_DIR = os.path.join("media", "cache")
+LOW_BITRATE = "64k"
+
+def load_manifest(path=MEDIA_MANIFEST):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+class MediaHandle:
+    def __init__(self, title, url=None, data=None, mime=None):
+        self.title = title
+        self.url = url
+        self.data = data
+        self.mime = mime
+
+    @property
+    def size(self):
+        return len(self.data) if self.data is not None else 0
+
+# Mood -> track lookup backed by the manifest. Local files are read once through mmap and
+# kept in memory; Streamlit then serves them from its media endpoint (with HTTP range support)
+# under a content-hash URL, so repeat plays hit the browser cache instead of resending bytes.
+class MediaLibrary:
+    def __init__(self, manifest_path=MEDIA_MANIFEST, cache_dir=MEDIA_CACHE_DIR):
+        self.manifest = load_manifest(manifest_path)
+        self.base_dir = os.path.dirname(os.path.dirname(os.path.abspath(manifest_path)))
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._handles = {}
+        self.file_reads = 0
+        self.bytes_read = 0
+
+    @property
+    def moods(self):
+        return list(self.manifest)
+
+    def _read(self, path):
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            data = bytes(mapped)
+        self.file_reads += 1
+        self.bytes_read += len(data)
+        return data
+
+    # Low-bitrate copy made once with ffmpeg; without ffmpeg the original file is used
+    def _low_bitrate_path(self, path):
+        ffmpeg = shutil.which("ffmpeg")
+        if not ffmpeg:
+            return path
+        stem = os.path.splitext(os.path.basename(path))[0]
+        target = os.path.join(self.cache_dir, f"{stem}-{LOW_BITRATE}.mp3")
+        if not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(path):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            result = subprocess.run(
+                [ffmpeg, "-y", "-loglevel", "error", "-i", path, "-ac", "1", "-b:a", LOW_BITRATE, target],
+                capture_output=True
+            )
+            if result.returncode != 0:
+                return path
+        return target
+
+    def handle(self, mood, low_bitrate=False):
+        key = (mood, low_bitrate)
+        with self._lock:
+            if key not in self._handles:
+                track = self.manifest[mood]
+                title = track.get("title", mood)
+                if "url" in track:
+                    self._handles[key] = MediaHandle(title, url=track["url"])
+                else:
+                    path = os.path.join(self.base_dir, track["file"])
+                    if low_bitrate:
+                        path = self._low_bitrate_path(path)
+                    self._handles[key] = MediaHandle(title, data=self._read(path), mime=track.get("mime", "audio/mpeg"))
+            return self._handles[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "handles": len(self._handles),
+                "file_reads": self.file_reads,
+                "bytes_read": self.bytes_read,
+                "cached_bytes": sum(handle.size for handle in self._handles.values())
+            }
+
+@st.cache_resource
+def get_media_library():
+    return MediaLibrary()
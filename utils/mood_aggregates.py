@@ -0,0 +1,59 @@
+# utils/mood_aggregates.py
+import bisect
+import datetime
+
+mood_numeric = {
+    "😊 Happy": 5,
+    "😐 Neutral": 3,
+    "😰 Anxious": 2,
+    "😢 Sad": 1,
+    "😠 Angry": 0
+}
+
+def mood_score(mood):
+    return mood_numeric.get(mood, 3)
+
+# Running totals over the mood log, updated one entry at a time so reads never rescan history
+class MoodAggregates:
+    def __init__(self):
+        self.total = 0
+        self.counts = {}
+        self.latest_by_day = {}
+        self.days = []          # sorted ISO dates that have at least one entry
+        self.day_scores = {}    # date -> [score sum, entry count]
+
+    @classmethod
+    def from_entries(cls, entries):
+        aggregates = cls()
+        for entry in entries:
+            aggregates.add(entry["date"], entry["mood"])
+        return aggregates
+
+    # Entries must be added in log order so the last one per day wins
+    def add(self, date, mood):
+        self.total += 1
+        self.counts[mood] = self.counts.get(mood, 0) + 1
+        if date not in self.latest_by_day:
+            # New days are almost always today, so this is an append
+            bisect.insort(self.days, date)
+            self.day_scores[date] = [0, 0]
+        self.latest_by_day[date] = mood
+        scores = self.day_scores[date]
+        scores[0] += mood_score(mood)
+        scores[1] += 1
+
+    # Latest mood for each of the `limit` most recent logged days, newest first
+    def latest_per_day(self, limit=None):
+        days = self.days[-limit:] if limit else self.days
+        return [(day, self.latest_by_day[day]) for day in reversed(days)]
+
+    # Mean mood score of all entries in the `window` calendar days ending on `today`
+    def rolling_average(self, window, today=None):
+        today = today or datetime.date.today()
+        total = count = 0
+        for offset in range(window):
+            scores = self.day_scores.get((today - datetime.timedelta(days=offset)).isoformat())
+            if scores:
+                total += scores[0]
+                count += scores[1]
+        return total / count if count else None
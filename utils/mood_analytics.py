@@ -0,0 +1,100 @@
+# utils/mood_analytics.py
+import numpy as np
+import pandas as pd
+from utils.mood_aggregates import mood_numeric
+
+MOODS = list(mood_numeric)
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+# Indexed by categorical code; code -1 (a mood outside mood_numeric) lands on the trailing neutral 3
+SCORE_TABLE = np.array([mood_numeric[mood] for mood in MOODS] + [3], dtype="float64")
+
+# The mood log as columns, converted once: parsed dates, mood codes and numeric scores
+def to_frame(dates, moods):
+    frame = pd.DataFrame({
+        # ISO strings parse straight into datetime64 without per-row strptime
+        "date": np.array(dates, dtype="datetime64[D]").astype("datetime64[ns]"),
+        "mood": pd.Categorical(moods, categories=MOODS),
+    })
+    frame["score"] = SCORE_TABLE[frame["mood"].cat.codes.to_numpy()]
+    return frame
+
+def filter_since(frame, start):
+    return frame if start is None else frame[frame["date"] >= pd.Timestamp(start)]
+
+# Mean score per logged day
+def daily_scores(frame):
+    return frame.groupby("date")["score"].mean()
+
+# Rolling means over calendar days (gaps count as days, not as zeros)
+def rolling_averages(frame, windows=(7, 30)):
+    daily = daily_scores(frame)
+    if daily.empty:
+        return pd.DataFrame(columns=[f"{w}d" for w in windows])
+    calendar = daily.asfreq("D")
+    return pd.DataFrame({f"{w}d": calendar.rolling(w, min_periods=1).mean() for w in windows})
+
+# Entry counts by weekday (rows) and mood (columns)
+def weekday_heatmap(frame):
+    codes = frame["mood"].cat.codes.to_numpy()
+    known = codes >= 0
+    counts = np.zeros((len(WEEKDAYS), len(MOODS)), dtype="int64")
+    np.add.at(counts, (frame["date"].dt.dayofweek.to_numpy()[known], codes[known]), 1)
+    return pd.DataFrame(counts, index=WEEKDAYS, columns=MOODS)
+
+# Longest and current run of consecutive days with at least one entry
+def streaks(frame, today=None):
+    days = np.unique(frame["date"].to_numpy().astype("datetime64[D]"))
+    if not len(days):
+        return {"longest": 0, "current": 0}
+    breaks = np.flatnonzero(np.diff(days).astype(int) != 1)
+    starts = np.concatenate(([0], breaks + 1))
+    ends = np.concatenate((breaks, [len(days) - 1]))
+    lengths = ends - starts + 1
+    today = np.datetime64(today or pd.Timestamp.today().date(), "D")
+    current = int(lengths[-1]) if today - days[-1] <= np.timedelta64(1, "D") else 0
+    return {"longest": int(lengths.max()), "current": current}
+
+# Standard deviation of day-to-day changes in the daily mean score
+def volatility(frame):
+    changes = np.diff(daily_scores(frame).to_numpy())
+    return float(changes.std()) if len(changes) else 0.0
+
+# P(next mood | current mood) over consecutive entries, rows and columns in MOODS order
+def transition_matrix(frame):
+    codes = frame["mood"].cat.codes.to_numpy()
+    codes = codes[codes >= 0]
+    counts = np.zeros((len(MOODS), len(MOODS)))
+    if len(codes) > 1:
+        np.add.at(counts, (codes[:-1], codes[1:]), 1)
+    totals = counts.sum(axis=1, keepdims=True)
+    probabilities = np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+    return pd.DataFrame(probabilities, index=MOODS, columns=MOODS)
+
+# Largest-Triangle-Three-Buckets: keep `threshold` points that preserve the visual shape.
+# x must be sorted; datetimes are handled through their int64 values.
+def downsample_lttb(x, y, threshold):
+    x = np.asarray(x)
+    y = np.asarray(y, dtype="float64")
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+    xs = x.astype("int64").astype("float64") if np.issubdtype(x.dtype, np.datetime64) else x.astype("float64")
+
+    # First and last points are always kept; the rest are split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype="int64")
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = xs[end:next_end].mean() if next_end > end else xs[-1]
+        next_y = y[end:next_end].mean() if next_end > end else y[-1]
+        # Triangle area between the last kept point, each candidate and the next bucket's mean
+        areas = np.abs(
+            (xs[previous] - next_x) * (y[start:end] - y[previous])
+            - (xs[previous] - xs[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.nanargmax(areas)) if len(areas) and not np.all(np.isnan(areas)) else start
+        selected[i + 1] = previous
+    return x[selected], y[selected]
@@ -0,0 +1,229 @@
+# utils/mood_store.py
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+import streamlit as st
+from utils.mood_aggregates import MoodAggregates
+
+DB_PATH = os.getenv("MINDMATE_DB", "mindmate.db")
+# Users whose running aggregates are kept in memory; the least recently read are rebuilt on demand
+MAX_CACHED_USERS = int(os.getenv("MINDMATE_MOOD_CACHED_USERS", "1024"))
+
+# Adds a column that databases created by an older version of the app don't have yet
+def ensure_column(conn, table, column, definition):
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+# Older versions kept one mood log, journal, chat and routine for everyone; those rows have uid ''.
+# The first user to open the upgraded app is recorded as their owner and takes all of them over.
+LEGACY_TABLES = ("mood_log", "journal_entries", "chat_turns", "chat_summaries", "routines")
+
+def legacy_owner(conn, claimant=None):
+    conn.execute("CREATE TABLE IF NOT EXISTS legacy_owner (id INTEGER PRIMARY KEY CHECK (id = 1), uid TEXT NOT NULL)")
+    if claimant:
+        conn.execute("INSERT OR IGNORE INTO legacy_owner (id, uid) VALUES (1, ?)", (claimant,))
+    row = conn.execute("SELECT uid FROM legacy_owner").fetchone()
+    return row[0] if row else None
+
+# Moves table's ownerless rows to the legacy owner, once there is one. Stores call this after
+# their own migrations, so rows migrated after the owner was chosen still reach them.
+def hand_over_legacy_rows(conn, table, owner=None):
+    owner = owner or legacy_owner(conn)
+    if owner:
+        # A row the owner already has for the same key (e.g. a day's summary) is kept
+        conn.execute(f"UPDATE OR IGNORE {table} SET uid = ? WHERE uid = ''", (owner,))
+
+# Called once per session: makes uid the legacy owner if nobody is yet, and hands it the rows
+def claim_legacy_rows(uid, path=DB_PATH):
+    conn = sqlite3.connect(path, timeout=30)
+    try:
+        with conn:
+            owner = legacy_owner(conn, uid)
+            if owner != uid:
+                return False
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for table in LEGACY_TABLES:
+                columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")} if table in tables else ()
+                if "uid" in columns:
+                    hand_over_legacy_rows(conn, table, owner)
+        return True
+    finally:
+        conn.close()
+
+# SQLite-backed mood log: survives restarts and answers the dashboard/report queries from indexes.
+# Every entry belongs to one user (see current_uid in utils.user_state), and every read is per user.
+class MoodStore:
+    def __init__(self, path=DB_PATH, max_users=MAX_CACHED_USERS):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # WAL lets readers keep going while a mood is being written
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS mood_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                uid TEXT NOT NULL DEFAULT '',
+                date TEXT NOT NULL,
+                mood TEXT NOT NULL,
+                note TEXT NOT NULL DEFAULT ''
+            )
+        """)
+        # Logs written before entries had an owner end up under uid ''
+        ensure_column(self._conn, "mood_log", "uid", "TEXT NOT NULL DEFAULT ''")
+        hand_over_legacy_rows(self._conn, "mood_log")
+        self._conn.executescript("""
+            DROP INDEX IF EXISTS idx_mood_log_date;
+            DROP INDEX IF EXISTS idx_mood_log_mood;
+            CREATE INDEX IF NOT EXISTS idx_mood_log_uid_date ON mood_log(uid, date, id);
+        """)
+        self._conn.commit()
+        self.max_users = max_users
+        # uid -> [MoodAggregates, version]; built on a user's first read, then kept current by _catch_up()
+        self._users = OrderedDict()
+        # Newest entry folded into the aggregates, and the database's data_version when that was checked
+        self._last_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM mood_log").fetchone()[0]
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # Folds in entries appended since the last check, including those written by other app
+    # replicas or worker processes. PRAGMA data_version only moves when another connection
+    # commits, so when nothing changed elsewhere the check costs one pragma. Caller holds the lock.
+    def _catch_up(self, force=False):
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version and not force:
+            return
+        self._data_version = data_version
+        rows = self._conn.execute(
+            "SELECT id, uid, date, mood FROM mood_log WHERE id > ? ORDER BY id", (self._last_id,)
+        ).fetchall()
+        for row in rows:
+            user = self._users.get(row["uid"])
+            if user is not None:
+                user[0].add(row["date"], row["mood"])
+                user[1] = row["id"]
+        if rows:
+            self._last_id = rows[-1]["id"]
+
+    # Caller holds the lock
+    def _user(self, uid):
+        self._catch_up()
+        user = self._users.get(uid)
+        if user is None:
+            rows = self._conn.execute(
+                "SELECT id, date, mood FROM mood_log WHERE uid = ? AND id <= ? ORDER BY id", (uid, self._last_id)
+            ).fetchall()
+            user = self._users[uid] = [MoodAggregates.from_entries(rows), rows[-1]["id"] if rows else 0]
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(uid)
+        return user
+
+    def aggregates(self, uid):
+        with self._lock:
+            return self._user(uid)[0]
+
+    # Moves on every write of this user's log; lets callers cache anything derived from it
+    def version(self, uid):
+        with self._lock:
+            return self._user(uid)[1]
+
+    def append(self, uid, date, mood, note=""):
+        with self._lock:
+            self._user(uid)
+            with self._conn:
+                cursor = self._conn.execute(
+                    "INSERT INTO mood_log (uid, date, mood, note) VALUES (?, ?, ?, ?)",
+                    (uid, date, mood, note)
+                )
+            # Our own commit doesn't move data_version; this also picks up any other
+            # replica's entries that landed just before ours
+            self._catch_up(force=True)
+        return {"id": cursor.lastrowid, "date": date, "mood": mood, "note": note}
+
+    # Dates are ISO strings, so string comparison is date comparison
+    def _where(self, uid, start, end):
+        clauses, params = ["uid = ?"], [uid]
+        if start:
+            clauses.append("date >= ?")
+            params.append(start)
+        if end:
+            clauses.append("date <= ?")
+            params.append(end)
+        return " WHERE " + " AND ".join(clauses), params
+
+    # Entries between start and end (inclusive, ISO dates), oldest first unless newest_first
+    def range(self, uid, start=None, end=None, newest_first=False):
+        where, params = self._where(uid, start, end)
+        order = "DESC" if newest_first else "ASC"
+        rows = self._query(f"SELECT id, date, mood, note FROM mood_log{where} ORDER BY date {order}, id {order}", params)
+        return [dict(row) for row in rows]
+
+    # One newest-first page after `cursor` (the (date, id) of the last row already shown).
+    # Returns (entries, next_cursor); next_cursor is None on the last page.
+    def page(self, uid, cursor=None, limit=20, start=None, end=None):
+        where, params = self._where(uid, start, end)
+        if cursor:
+            where += " AND (date, id) < (?, ?)"
+            params = params + list(cursor)
+        rows = self._query(
+            f"SELECT id, date, mood, note FROM mood_log{where} ORDER BY date DESC, id DESC LIMIT ?",
+            params + [limit + 1]
+        )
+        entries = [dict(row) for row in rows[:limit]]
+        next_cursor = (entries[-1]["date"], entries[-1]["id"]) if len(rows) > limit else None
+        return entries, next_cursor
+
+    # Newest-first iteration in keyset-paginated batches, so large logs are never loaded at once
+    def iter_range(self, uid, start=None, end=None, batch_size=500):
+        cursor = None
+        while True:
+            entries, cursor = self.page(uid, cursor, batch_size, start, end)
+            yield from entries
+            if cursor is None:
+                return
+
+    # (dates, moods) as two parallel lists in log order, for columnar analytics
+    def columns(self, uid, start=None, end=None):
+        where, params = self._where(uid, start, end)
+        rows = self._query(f"SELECT date, mood FROM mood_log{where} ORDER BY date, id", params)
+        if not rows:
+            return [], []
+        dates, moods = zip(*rows)
+        return list(dates), list(moods)
+
+    def mood_counts(self, uid, start=None, end=None):
+        if not start and not end:
+            with self._lock:
+                return dict(self._user(uid)[0].counts)
+        where, params = self._where(uid, start, end)
+        rows = self._query(f"SELECT mood, COUNT(*) FROM mood_log{where} GROUP BY mood", params)
+        return {mood: count for mood, count in rows}
+
+    # Last logged mood for each of the most recent `limit` days, newest day first
+    def latest_per_day(self, uid, limit=None):
+        with self._lock:
+            return self._user(uid)[0].latest_per_day(limit)
+
+    # Rolling mean of mood_numeric scores over the last `window` days
+    def rolling_average(self, uid, window, today=None):
+        with self._lock:
+            return self._user(uid)[0].rolling_average(window, today)
+
+    def count(self, uid, start=None, end=None):
+        if not start and not end:
+            with self._lock:
+                return self._user(uid)[0].total
+        where, params = self._where(uid, start, end)
+        return self._query(f"SELECT COUNT(*) FROM mood_log{where}", params)[0][0]
+
+# One connection per process, shared by every session and rerun
+@st.cache_resource
+def get_mood_store():
+    return MoodStore()
@@ -0,0 +1,179 @@
+# utils/profiling.py
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Off unless MINDMATE_PROFILE=1; when off, decorators return the function untouched
+ENABLED = os.getenv("MINDMATE_PROFILE") == "1"
+# Latency samples kept per name for percentiles
+SAMPLE_SIZE = 1000
+
+class Metric:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def percentile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def snapshot(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_seconds": round(self.total_seconds, 6),
+            "p50_seconds": round(self.percentile(0.5), 6),
+            "p95_seconds": round(self.percentile(0.95), 6),
+            "p99_seconds": round(self.percentile(0.99), 6),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+# Process-wide, so numbers accumulate across reruns and sessions
+_lock = threading.Lock()
+_metrics = {}
+
+def record(name, seconds, error=False, prompt_tokens=0, completion_tokens=0):
+    with _lock:
+        metric = _metrics.setdefault(name, Metric())
+        metric.calls += 1
+        metric.errors += int(error)
+        metric.total_seconds += seconds
+        metric.samples.append(seconds)
+        metric.prompt_tokens += prompt_tokens
+        metric.completion_tokens += completion_tokens
+
+@contextlib.contextmanager
+def _timed(name):
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        # Streamlit's rerun/stop signals are BaseExceptions and are not counted as errors
+        error = True
+        raise
+    finally:
+        record(name, time.perf_counter() - start, error)
+
+# Context manager for a hot section: `with timed("dashboard.figure"): ...`
+def timed(name):
+    return _timed(name) if ENABLED else contextlib.nullcontext()
+
+# Decorator recording wall time and call count under `name` (defaults to module.function)
+def profiled(name=None):
+    def decorator(func):
+        if not ENABLED:
+            return func
+        label = name or f"{func.__module__}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _timed(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# LangChain callback that times every LLM call and counts its tokens
+def llm_callbacks():
+    if not ENABLED:
+        return []
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class LLMProfiler(BaseCallbackHandler):
+        def __init__(self):
+            self._starts = {}
+
+        def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+            self._starts[run_id] = time.perf_counter()
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            self._starts[run_id] = time.perf_counter()
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            start = self._starts.pop(run_id, None)
+            if start is None:
+                return
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            prompt_tokens = usage.get("prompt_tokens", 0)
+            completion_tokens = usage.get("completion_tokens", 0)
+            if not usage and response.generations and response.generations[0]:
+                # Streamed responses carry usage on the message instead
+                message = getattr(response.generations[0][0], "message", None)
+                metadata = getattr(message, "usage_metadata", None) or {}
+                prompt_tokens = metadata.get("input_tokens", 0)
+                completion_tokens = metadata.get("output_tokens", 0)
+            model = (response.llm_output or {}).get("model_name", "groq")
+            record(f"llm.{model}", time.perf_counter() - start,
+                   prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            start = self._starts.pop(run_id, None)
+            if start is not None:
+                record("llm.error", time.perf_counter() - start, error=True)
+
+    return [LLMProfiler()]
+
+def snapshot():
+    with _lock:
+        return {name: metric.snapshot() for name, metric in sorted(_metrics.items())}
+
+def reset():
+    with _lock:
+        _metrics.clear()
+
+def to_json():
+    return json.dumps(snapshot(), indent=2)
+
+def to_prometheus():
+    lines = [
+        "# HELP mindmate_calls_total Calls per instrumented function.",
+        "# TYPE mindmate_calls_total counter",
+    ]
+    stats = snapshot()
+    for name, metric in stats.items():
+        lines.append(f'mindmate_calls_total{{name="{name}"}} {metric["calls"]}')
+    lines += ["# HELP mindmate_errors_total Calls that raised.", "# TYPE mindmate_errors_total counter"]
+    for name, metric in stats.items():
+        lines.append(f'mindmate_errors_total{{name="{name}"}} {metric["errors"]}')
+    lines += ["# HELP mindmate_seconds Wall time per instrumented function.", "# TYPE mindmate_seconds summary"]
+    for name, metric in stats.items():
+        for quantile, key in (("0.5", "p50_seconds"), ("0.95", "p95_seconds"), ("0.99", "p99_seconds")):
+            lines.append(f'mindmate_seconds{{name="{name}",quantile="{quantile}"}} {metric[key]}')
+        lines.append(f'mindmate_seconds_sum{{name="{name}"}} {metric["total_seconds"]}')
+        lines.append(f'mindmate_seconds_count{{name="{name}"}} {metric["calls"]}')
+    lines += ["# HELP mindmate_llm_tokens_total LLM tokens by direction.", "# TYPE mindmate_llm_tokens_total counter"]
+    for name, metric in stats.items():
+        if metric["prompt_tokens"] or metric["completion_tokens"]:
+            lines.append(f'mindmate_llm_tokens_total{{name="{name}",kind="prompt"}} {metric["prompt_tokens"]}')
+            lines.append(f'mindmate_llm_tokens_total{{name="{name}",kind="completion"}} {metric["completion_tokens"]}')
+    return "\n".join(lines) + "\n"
+
+# Hidden developer panel; main.py only calls this when profiling is on
+def show_profiling_sidebar():
+    import streamlit as st
+
+    with st.sidebar.expander("⏱️ Profiling", expanded=False):
+        stats = snapshot()
+        if stats:
+            st.dataframe(
+                [{"name": name, **metric} for name, metric in stats.items()],
+                hide_index=True
+            )
+        else:
+            st.caption("No samples yet.")
+        col1, col2, col3 = st.columns(3)
+        col1.download_button("JSON", to_json(), file_name="mindmate_profile.json", mime="application/json")
+        col2.download_button("Prometheus", to_prometheus(), file_name="mindmate_profile.prom", mime="text/plain")
+        if col3.button("Reset"):
+            reset()
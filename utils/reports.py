@@ -0,0 +1,173 @@
+# utils/reports.py
+import datetime
+import streamlit as st
+from tempfile import SpooledTemporaryFile
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from reportlab.lib import colors
+from utils.mood_store import MoodStore, DB_PATH
+from utils.jobs import get_job_executor, wait_for_job
+from utils.profiling import profiled
+
+# Reports bigger than this spill from memory to a temp file while rendering
+PDF_SPOOL_BYTES = 1024 * 1024
+
+REPORT_TITLES = {
+    "daily": "🧠 MindMates Daily Mood Report",
+    "weekly": "🧠 MindMates Weekly Mood Report",
+    "full": "🧠 MindMates Mood Log Report",
+}
+
+# Word wrap in linear time: track the line length instead of rebuilding strings
+def split_text(text, max_chars):
+    lines, line, length = [], [], 0
+    for word in text.split():
+        extra = len(word) + (1 if line else 0)
+        if line and length + extra > max_chars:
+            lines.append(" ".join(line))
+            line, length = [word], len(word)
+        else:
+            line.append(word)
+            length += extra
+    if line:
+        lines.append(" ".join(line))
+    return lines
+
+# Date range (ISO strings, inclusive) covered by each report type
+def report_period(report_type, today=None, start=None, end=None):
+    today = today or datetime.date.today()
+    if report_type == "daily":
+        return today.isoformat(), today.isoformat()
+    if report_type == "weekly":
+        return (today - datetime.timedelta(days=6)).isoformat(), today.isoformat()
+    return start, end
+
+# Single layout engine for every report: header, mood summary, then entries newest first
+@profiled()
+def render_report(store, uid, title, start=None, end=None):
+    buffer = SpooledTemporaryFile(max_size=PDF_SPOOL_BYTES)
+    # Page compression keeps each finished page small while the rest are drawn
+    p = canvas.Canvas(buffer, pagesize=A4, pageCompression=1)
+    width, height = A4
+    y = height - 50
+
+    # Title
+    p.setFont("Helvetica-Bold", 18)
+    p.drawString(50, y, title)
+    y -= 20
+    p.setFont("Helvetica-Oblique", 10)
+    p.drawString(50, y, f"Generated on: {datetime.datetime.now().strftime('%B %d, %Y - %I:%M %p')}")
+    y -= 30
+
+    # Summary
+    if start or end:
+        p.drawString(50, y, f"Period: {start or 'beginning'} to {end or 'today'}")
+        y -= 20
+    mood_summary = store.mood_counts(uid, start, end)
+    total_logs = store.count(uid, start, end)
+
+    p.setFont("Helvetica-Bold", 12)
+    p.drawString(50, y, f"Total Entries: {total_logs}")
+    y -= 20
+
+    p.setFont("Helvetica", 11)
+    for mood, count in mood_summary.items():
+        p.drawString(70, y, f"{mood}: {count}")
+        y -= 15
+
+    for window in (7, 30):
+        average = store.rolling_average(uid, window)
+        if average is not None:
+            p.drawString(70, y, f"{window}-day average mood score: {average:.1f} / 5")
+            y -= 15
+
+    y -= 10
+    p.line(50, y, width - 50, y)
+    y -= 30
+
+    # Log Entries
+    p.setFont("Helvetica", 12)
+    entry_number = 1
+    for entry in store.iter_range(uid, start, end):
+        if y < 100:
+            p.showPage()
+            y = height - 50
+            p.setFont("Helvetica", 12)
+
+        p.setFillColor(colors.darkblue)
+        p.setFont("Helvetica-Bold", 12)
+        p.drawString(50, y, f"{entry_number}. {entry['date']} — {entry['mood']}")
+        y -= 20
+
+        if entry['note']:
+            p.setFont("Helvetica", 11)
+            p.setFillColor(colors.black)
+            wrapped_lines = split_text(entry['note'], 85)
+            for line in wrapped_lines:
+                p.drawString(70, y, "📝 " + line)
+                y -= 15
+            y -= 5
+
+        p.setFillColor(colors.grey)
+        p.line(50, y, width - 50, y)
+        y -= 25
+        entry_number += 1
+
+    p.save()
+    buffer.seek(0)
+    data = buffer.read()
+    buffer.close()
+    return data
+
+# Report jobs run in the job executor's process pool; each worker process keeps one store,
+# which catches up with entries logged by the app since the worker last used it
+_worker_stores = {}
+
+def render_report_in_worker(db_path, uid, title, start, end):
+    store = _worker_stores.get(db_path)
+    if store is None:
+        store = _worker_stores[db_path] = MoodStore(db_path)
+    return render_report(store, uid, title, start, end)
+
+# Job id for a report; identical (user, type, period, log version) requests share one rendering
+def submit_report(store, uid, report_type="full", start=None, end=None):
+    start, end = report_period(report_type, start=start, end=end)
+    title = REPORT_TITLES.get(report_type, REPORT_TITLES["full"])
+    version = store.version(uid)
+    return get_job_executor().submit(
+        render_report_in_worker, DB_PATH, uid, title, start, end,
+        key=("report", uid, report_type, start, end, version), label="Building your report", pool="process"
+    )
+
+def generate_report(store, uid, report_type="full", start=None, end=None):
+    return get_job_executor().job(submit_report(store, uid, report_type, start, end)).future.result()[2]
+
+# Served through st.download_button, so the PDF is fetched as a file instead of inlined as base64.
+# Until the report job finishes only a progress bar is shown, so the page stays usable meanwhile.
+# The job id is kept in the session so a failed build is shown once, not resubmitted every rerun.
+def report_download_button(store, uid, report_type="full", start=None, end=None,
+                           label="📥 Download Mood Report as PDF", key=None, cancel_key=None):
+    executor = get_job_executor()
+    session_key = f"report_job_{key or report_type}"
+    request = (uid, report_type, start, end, store.version(uid))
+    remembered = st.session_state.get(session_key)
+    job = executor.job(remembered[1]) if remembered and remembered[0] == request else None
+    if job is None or job.state == "cancelled":
+        job_id = submit_report(store, uid, report_type, start, end)
+        st.session_state[session_key] = (request, job_id)
+        job = executor.job(job_id)
+    state = job.state
+    if state in ("queued", "running"):
+        wait_for_job(job.id, cancel_key)
+        return
+    if state != "done":
+        st.error("Couldn't build the report. Please try again.")
+        st.button("🔁 Try again", key=f"retry_{session_key}", on_click=st.session_state.pop, args=(session_key, None))
+        return
+    st.download_button(
+        label=label,
+        data=job.result(),
+        file_name=f"MindMates_{report_type.capitalize()}_Mood_Report.pdf",
+        mime="application/pdf",
+        key=key
+    )
@@ -0,0 +1,77 @@
+# utils/response_cache.py
+import random
+import threading
+import time
+from collections import OrderedDict
+
+# TTL + LRU cache for LLM responses. Each key keeps up to `variants` answers:
+# misses fill the slots, then hits pick one at random so replies still vary.
+class ResponseCache:
+    def __init__(self, max_keys=64, ttl=6 * 3600, variants=3):
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self.variants = variants
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> [(expires_at, response), ...]
+
+    def _fresh(self, key, now):
+        entries = [item for item in self._entries.get(key, []) if item[0] > now]
+        if entries:
+            self._entries[key] = entries
+            self._entries.move_to_end(key)
+        else:
+            self._entries.pop(key, None)
+        return entries
+
+    # Return a cached variant, or call produce() and cache its result
+    def get(self, key, produce):
+        with self._lock:
+            entries = self._fresh(key, time.monotonic())
+            if len(entries) >= self.variants:
+                self.hits += 1
+                return random.choice(entries)[1]
+            self.misses += 1
+
+        response = produce()
+        if not self.put(key, response):
+            # Identical prompts in flight together share one LLM call (utils.llm_scheduler), so
+            # concurrent misses all get the same reply; ask once more so the slots still differ
+            self.put(key, produce())
+        return response
+
+    # False if the response was not stored: the key is full or already has that exact answer
+    def put(self, key, response):
+        with self._lock:
+            entries = self._fresh(key, time.monotonic())
+            added = len(entries) < self.variants and all(cached != response for _, cached in entries)
+            if added:
+                entries.append((time.monotonic() + self.ttl, response))
+                self._entries[key] = entries
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+            return added
+
+    # Fill one variant per key in the background so the first clicks are hits sooner
+    def warm(self, keys, produce_for_key):
+        def run():
+            for key in keys:
+                try:
+                    self.put(key, produce_for_key(key))
+                except Exception:
+                    pass
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "keys": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
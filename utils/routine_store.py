@@ -0,0 +1,113 @@
+# utils/routine_store.py
+import csv
+import os
+import sqlite3
+import threading
+import streamlit as st
+from utils.mood_store import DB_PATH, hand_over_legacy_rows
+
+ROUTINES_TABLE = """
+    CREATE TABLE IF NOT EXISTS routines (
+        uid TEXT NOT NULL DEFAULT '',
+        date TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        activity TEXT NOT NULL,
+        completed INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (uid, date, activity)
+    )
+"""
+
+# Daily routines keyed by user and date; each save replaces one day inside a single transaction
+class RoutineStore:
+    def __init__(self, path=DB_PATH, legacy_csv=None):
+        self._lock = threading.Lock()
+        # Autocommit mode so transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._migrate()
+        self._conn.execute(ROUTINES_TABLE)
+        if legacy_csv and os.path.exists(legacy_csv):
+            self._import_csv(legacy_csv)
+        hand_over_legacy_rows(self._conn, "routines")
+
+    # Routines used to be keyed by date alone; SQLite can't change a primary key in place,
+    # so the table is rebuilt and the old rows end up under uid '' (see hand_over_legacy_rows)
+    def _migrate(self):
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(routines)")}
+        if not columns or "uid" in columns:
+            return
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._conn.execute("ALTER TABLE routines RENAME TO routines_by_date")
+        self._conn.execute(ROUTINES_TABLE)
+        self._conn.execute(
+            "INSERT INTO routines (date, position, activity, completed) "
+            "SELECT date, position, activity, completed FROM routines_by_date"
+        )
+        self._conn.execute("DROP TABLE routines_by_date")
+        self._conn.execute("COMMIT")
+
+    # One-time import of the old single-user routines.csv (under uid '', which goes to the legacy
+    # owner); skipped once the table has rows
+    def _import_csv(self, csv_path):
+        if self._conn.execute("SELECT 1 FROM routines LIMIT 1").fetchone():
+            return
+        positions = {}
+        rows = []
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                date, activity = row.get("date"), row.get("activity")
+                if not date or not activity:
+                    continue
+                positions[date] = positions.get(date, -1) + 1
+                completed = str(row.get("completed") or "").strip().lower() in ("1", "true", "yes")
+                rows.append((date, positions[date], activity, int(completed)))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO routines (date, position, activity, completed) VALUES (?, ?, ?, ?)", rows
+            )
+            self._conn.execute("COMMIT")
+
+    # {activity: completed} for one of uid's days, in the order it was saved
+    def load_day(self, uid, date):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT activity, completed FROM routines WHERE uid = ? AND date = ? ORDER BY position", (uid, date)
+            ).fetchall()
+        return {activity: bool(completed) for activity, completed in rows}
+
+    # Atomic upsert of a whole day; concurrent sessions serialize on the write lock
+    def save_day(self, uid, date, routine):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM routines WHERE uid = ? AND date = ?", (uid, date))
+                self._conn.executemany(
+                    "INSERT INTO routines (uid, date, position, activity, completed) VALUES (?, ?, ?, ?, ?)",
+                    [(uid, date, position, activity, int(bool(completed)))
+                     for position, (activity, completed) in enumerate(routine.items())]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def set_completed(self, uid, date, activity, completed):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE routines SET completed = ? WHERE uid = ? AND date = ? AND activity = ?",
+                (int(bool(completed)), uid, date, activity)
+            )
+
+    # (completed, planned) activity counts of uid over an inclusive date range
+    def completion(self, uid, start, end):
+        with self._lock:
+            done, total = self._conn.execute(
+                "SELECT COALESCE(SUM(completed), 0), COUNT(*) FROM routines WHERE uid = ? AND date BETWEEN ? AND ?",
+                (uid, start, end)
+            ).fetchone()
+        return done, total
+
+@st.cache_resource
+def get_routine_store(legacy_csv="routines.csv"):
+    return RoutineStore(legacy_csv=legacy_csv)
@@ -0,0 +1,96 @@
+# utils/semantic_cache.py
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+import faiss
+import numpy as np
+import streamlit as st
+from utils.journal_index import get_embedder, embed
+
+# Enabled by MINDMATE_SEMANTIC_CACHE=1 (see phase3_ai_companion); the threshold is cosine
+# similarity between messages
+SIMILARITY_THRESHOLD = float(os.getenv("MINDMATE_SEMANTIC_THRESHOLD", "0.92"))
+MAX_CACHED_REPLIES = int(os.getenv("MINDMATE_SEMANTIC_MAX_ENTRIES", "2048"))
+
+# Companion replies keyed by the meaning of the user's message. Each scope gets its own FAISS
+# index; the companion scopes by tone and, for replies that depended on a user's conversation,
+# by user, so a calming reply is never served to someone who logged "Happy" and one user's
+# context never shows up in another user's reply.
+# Least recently served replies are evicted first.
+class SemanticCache:
+    def __init__(self, embedder=None, threshold=SIMILARITY_THRESHOLD, max_entries=MAX_CACHED_REPLIES):
+        self._lock = threading.Lock()
+        self.embedder = embedder or get_embedder()
+        self.dim = self.embedder.get_sentence_embedding_dimension()
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._indexes = {}
+        self._entries = OrderedDict()   # id -> (scope, reply, seconds the original call took)
+        self._ids = itertools.count(1)
+        self.counters = {"lookups": 0, "hits": 0, "stored": 0, "evicted": 0,
+                         "embed_seconds": 0.0, "seconds_saved": 0.0}
+
+    def _embed(self, text):
+        start = time.perf_counter()
+        vector = embed([text], self.embedder)
+        with self._lock:
+            self.counters["embed_seconds"] += time.perf_counter() - start
+        return vector
+
+    # (cached reply or None, message vector); pass the vector back to store() on a miss
+    def lookup(self, scope, message):
+        vector = self._embed(message)
+        with self._lock:
+            self.counters["lookups"] += 1
+            index = self._indexes.get(scope)
+            if index is None or not index.ntotal:
+                return None, vector
+            scores, ids = index.search(vector, 1)
+            if scores[0][0] < self.threshold:
+                return None, vector
+            entry_id = int(ids[0][0])
+            _, reply, seconds = self._entries[entry_id]
+            self._entries.move_to_end(entry_id)
+            self.counters["hits"] += 1
+            self.counters["seconds_saved"] += seconds
+            return reply, vector
+
+    def store(self, scope, message, reply, seconds, vector=None):
+        if vector is None:
+            vector = self._embed(message)
+        with self._lock:
+            index = self._indexes.get(scope)
+            if index is None:
+                index = self._indexes[scope] = faiss.IndexIDMap2(faiss.IndexFlatIP(self.dim))
+            entry_id = next(self._ids)
+            index.add_with_ids(vector, np.array([entry_id], dtype="int64"))
+            self._entries[entry_id] = (scope, reply, seconds)
+            self.counters["stored"] += 1
+            while len(self._entries) > self.max_entries:
+                old_id, (old_scope, _, _) = self._entries.popitem(last=False)
+                old_index = self._indexes[old_scope]
+                old_index.remove_ids(np.array([old_id], dtype="int64"))
+                # Per-user scopes come and go; an emptied index would otherwise stay for good
+                if not old_index.ntotal:
+                    del self._indexes[old_scope]
+                self.counters["evicted"] += 1
+
+    def stats(self):
+        with self._lock:
+            vectors = sum(index.ntotal for index in self._indexes.values())
+            return dict(
+                self.counters,
+                embed_seconds=round(self.counters["embed_seconds"], 3),
+                seconds_saved=round(self.counters["seconds_saved"], 3),
+                hit_rate=round(self.counters["hits"] / self.counters["lookups"], 3) if self.counters["lookups"] else 0.0,
+                entries=len(self._entries),
+                scopes=len(self._indexes),
+                # Flat index: one float32 vector plus one int64 id per entry
+                index_bytes=vectors * (self.dim * 4 + 8),
+            )
+
+@st.cache_resource
+def get_semantic_cache():
+    return SemanticCache()
@@ -0,0 +1,99 @@
+# utils/tips.py
+import datetime
+import random
+from types import MappingProxyType
+import streamlit as st
+
+TIP_MOODS = ("Happy", "Sad", "Anxious", "Calm", "Angry", "Motivated")
+# Mood tracker labels -> tip moods; a neutral day reads as calm
+LOGGED_MOODS = {
+    "😊 Happy": "Happy",
+    "😢 Sad": "Sad",
+    "😠 Angry": "Angry",
+    "😰 Anxious": "Anxious",
+    "😐 Neutral": "Calm",
+}
+DEFAULT_MOOD = "Calm"
+
+# (tip, moods it suits); tips with no moods are general and fill in when the logged mood is stale
+TIPS_CATALOG = (
+    ("Keep a gratitude journal to savor the good moments 🌼", ("Happy",)),
+    ("Spread positivity — compliment someone today 😊", ("Happy",)),
+    ("Go outdoors and soak in some sunshine ☀️", ("Happy", "Calm")),
+    ("Try journaling how you feel — let it all out 💙", ("Sad",)),
+    ("Watch your comfort movie or talk to someone you trust 🎬", ("Sad",)),
+    ("Take a short walk to boost your mood 🚶‍♀️", ("Sad", "Angry")),
+    ("Practice box breathing (4-4-4-4) for 2 minutes 🧘‍♂️", ("Anxious", "Angry")),
+    ("Limit social media for a few hours 📵", ("Anxious",)),
+    ("Try progressive muscle relaxation 💪", ("Anxious",)),
+    ("Use this calm to do something creative 🎨", ("Calm",)),
+    ("Practice mindfulness or silent sitting 🙏", ("Calm", "Anxious")),
+    ("Listen to ambient music and relax 🎵", ("Calm",)),
+    ("Try writing a ‘no-send’ letter to vent 🔥", ("Angry",)),
+    ("Engage in physical activity like jumping jacks 🏃", ("Angry", "Motivated")),
+    ("Splash cold water on your face or hands ❄️", ("Angry",)),
+    ("Channel your energy into a passion project 🚀", ("Motivated",)),
+    ("Start your day with a prioritized to-do list ✅", ("Motivated",)),
+    ("Set a mini-goal and crush it today 💯", ("Motivated",)),
+    ("Drink a glass of water and stretch for a minute 💧", ()),
+    ("Step away from screens for ten minutes 🌿", ()),
+    ("Get to bed a little earlier tonight 😴", ()),
+)
+
+# Scoring weights: a matching tip scores MOOD_MATCH scaled by how fresh the logged mood is,
+# general tips always score GENERAL_MATCH, and tips already shown lose SEEN_PENALTY
+MOOD_MATCH = 1.0
+GENERAL_MATCH = 0.4
+SEEN_PENALTY = 2.0
+RECENCY_HALF_LIFE_DAYS = 3.0
+# Completing most of the recent routine lifts a good or calm day to "Motivated"
+MOTIVATED_COMPLETION = 0.8
+COMPLETION_DAYS = 3
+
+# Immutable, indexed form of the catalog with the per-mood score table precomputed
+class TipsCatalog:
+    def __init__(self, catalog=TIPS_CATALOG):
+        self.tips = tuple(tip for tip, _ in catalog)
+        self.general = tuple(GENERAL_MATCH if not moods else 0.0 for _, moods in catalog)
+        self.match = MappingProxyType({
+            mood: tuple(MOOD_MATCH if mood in moods else 0.0 for _, moods in catalog) for mood in TIP_MOODS
+        })
+
+    # Top `count` tips for the mood; identical inputs and seed always give the same tips
+    def select(self, mood, count=2, seen=(), recency=1.0, seed=None):
+        match = self.match[mood]
+        jitter = random.Random(seed)
+        scored = [
+            (general + recency * mood_score - (SEEN_PENALTY if i in seen else 0.0), jitter.random(), i)
+            for i, (general, mood_score) in enumerate(zip(self.general, match))
+        ]
+        scored.sort(reverse=True)
+        return [(i, self.tips[i]) for _, _, i in scored[:count]]
+
+@st.cache_resource
+def get_tips_catalog():
+    return TipsCatalog()
+
+# Weight of a mood logged `age_days` ago: 1.0 today, halving every RECENCY_HALF_LIFE_DAYS
+def mood_recency(age_days):
+    return 0.5 ** (max(age_days, 0) / RECENCY_HALF_LIFE_DAYS)
+
+# (tip mood, recency weight) from the latest mood log entry and the recent routine completion rate
+def derive_mood(latest, completion, today=None):
+    if not latest:
+        return DEFAULT_MOOD, 0.0
+    day, logged = latest
+    today = today or datetime.date.today()
+    recency = mood_recency((today - datetime.date.fromisoformat(day)).days)
+    mood = LOGGED_MOODS.get(logged, DEFAULT_MOOD)
+    done, total = completion
+    if mood in ("Happy", "Calm") and total and done / total >= MOTIVATED_COMPLETION:
+        mood = "Motivated"
+    return mood, recency
+
+def user_mood(mood_store, routine_store, uid, today=None):
+    today = today or datetime.date.today()
+    latest = mood_store.latest_per_day(uid, 1)
+    start = (today - datetime.timedelta(days=COMPLETION_DAYS - 1)).isoformat()
+    completion = routine_store.completion(uid, start, today.isoformat())
+    return derive_mood(latest[0] if latest else None, completion, today)
@@ -0,0 +1,228 @@
+# utils/user_state.py
+import atexit
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+import streamlit as st
+from utils.mood_store import DB_PATH, claim_legacy_rows
+
+# "sqlite" shares state between app replicas through the database file; "memory" is per process
+STATE_BACKEND = os.getenv("MINDMATE_STATE_BACKEND", "sqlite")
+STATE_DB = os.getenv("MINDMATE_STATE_DB", DB_PATH)
+FLUSH_INTERVAL = float(os.getenv("MINDMATE_STATE_FLUSH_INTERVAL", "0.25"))
+MAX_CONFLICT_RETRIES = 10
+
+# Each user's state is one JSON document with a version that goes up on every write.
+# compare_and_set only succeeds against the version the writer read (optimistic locking).
+class MemoryBackend:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._docs = {}
+
+    def version(self, uid):
+        with self._lock:
+            return self._docs.get(uid, (0, None))[0]
+
+    def load(self, uid):
+        with self._lock:
+            version, data = self._docs.get(uid, (0, "{}"))
+        return version, json.loads(data)
+
+    def compare_and_set(self, uid, expected_version, data):
+        with self._lock:
+            if self._docs.get(uid, (0, None))[0] != expected_version:
+                return False
+            self._docs[uid] = (expected_version + 1, json.dumps(data))
+            return True
+
+# Same contract over a user_state table, so every worker pointed at the file sees one state per user
+class SQLiteBackend:
+    def __init__(self, path=STATE_DB):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS user_state (
+                uid TEXT PRIMARY KEY,
+                version INTEGER NOT NULL,
+                data TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def version(self, uid):
+        with self._lock:
+            row = self._conn.execute("SELECT version FROM user_state WHERE uid = ?", (uid,)).fetchone()
+        return row[0] if row else 0
+
+    def load(self, uid):
+        with self._lock:
+            row = self._conn.execute("SELECT version, data FROM user_state WHERE uid = ?", (uid,)).fetchone()
+        return (row[0], json.loads(row[1])) if row else (0, {})
+
+    def compare_and_set(self, uid, expected_version, data):
+        with self._lock, self._conn:
+            if expected_version == 0:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO user_state (uid, version, data) VALUES (?, 1, ?)", (uid, json.dumps(data))
+                )
+            else:
+                cursor = self._conn.execute(
+                    "UPDATE user_state SET version = version + 1, data = ? WHERE uid = ? AND version = ?",
+                    (json.dumps(data), uid, expected_version)
+                )
+        return cursor.rowcount == 1
+
+# Write-behind: set() only records the change; a background thread folds every change made
+# since the last flush into one write per user. Writes are per-key merges onto the latest
+# document, retried on version conflicts, so replicas editing different keys don't clobber each other.
+# Changes are staged as JSON snapshots, so a caller editing the same list or dict afterwards
+# can't change what is written or race the flush thread while it serializes.
+class WriteBehind:
+    def __init__(self, backend, interval=FLUSH_INTERVAL):
+        self.backend = backend
+        self.interval = interval
+        self._lock = threading.Lock()
+        # One flush at a time: two overlapping flushes could land an older value after a newer one
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._wake = threading.Event()
+        self.counters = {"changes": 0, "coalesced": 0, "flushes": 0, "writes": 0, "conflicts": 0, "errors": 0}
+        threading.Thread(target=self._run, daemon=True).start()
+        atexit.register(self.flush)
+
+    def stage(self, uid, key, value):
+        snapshot = json.dumps(value)
+        with self._lock:
+            changes = self._pending.setdefault(uid, {})
+            self.counters["changes"] += 1
+            if key in changes:
+                self.counters["coalesced"] += 1
+            changes[key] = snapshot
+        self._wake.set()
+
+    # Changes for uid that are not yet in the backend
+    def pending(self, uid):
+        with self._lock:
+            changes = dict(self._pending.get(uid, {}))
+        return {key: json.loads(snapshot) for key, snapshot in changes.items()}
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            self._wake.wait(self.interval)  # let a burst of set() calls land in one write
+            try:
+                self.flush()
+            except Exception:
+                # e.g. the database is locked for longer than its timeout; changes stay pending
+                self._count("errors")
+                self._wake.set()
+
+    def flush(self):
+        with self._flush_lock:
+            self._flush()
+
+    def _flush(self):
+        with self._lock:
+            batch = {uid: dict(changes) for uid, changes in self._pending.items() if changes}
+            if batch:
+                self.counters["flushes"] += 1
+        for uid, changes in batch.items():
+            for _ in range(MAX_CONFLICT_RETRIES):
+                version, data = self.backend.load(uid)
+                data.update((key, json.loads(snapshot)) for key, snapshot in changes.items())
+                if self.backend.compare_and_set(uid, version, data):
+                    break
+                self._count("conflicts")
+            else:
+                continue  # still pending; the next flush tries again
+            self._count("writes")
+            with self._lock:
+                # Drop only what was written; a newer set() of the same key stays pending
+                remaining = self._pending.get(uid, {})
+                for key, snapshot in changes.items():
+                    if remaining.get(key) == snapshot:
+                        del remaining[key]
+                if not remaining:
+                    self._pending.pop(uid, None)
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, pending_users=len(self._pending))
+
+@st.cache_resource
+def get_state_writer():
+    backend = MemoryBackend() if STATE_BACKEND == "memory" else SQLiteBackend()
+    return WriteBehind(backend)
+
+# One user's state as seen by this session: dict-style access over a local copy that is
+# re-read only when the stored version moves (another replica or tab wrote to it).
+# Values must be JSON-serializable; after mutating a list or dict in place, assign it back.
+class UserState:
+    def __init__(self, uid, writer):
+        self.uid = uid
+        self.writer = writer
+        self.version = -1
+        self.data = {}
+
+    def refresh(self):
+        if self.writer.backend.version(self.uid) != self.version:
+            self.version, self.data = self.writer.backend.load(self.uid)
+            self.data.update(self.writer.pending(self.uid))
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+        self.writer.stage(self.uid, key, value)
+
+# Users are identified by their login when the app has authentication set up (st.login), and
+# otherwise by a random id kept in a browser cookie, so a reconnect or another replica behind the
+# load balancer finds the same state. The id unlocks the user's whole mood log, journal and chat,
+# so it is never put in the URL, where a shared or bookmarked link would hand it to someone else.
+UID_COOKIE = "mindmate_uid"
+UID_COOKIE_MAX_AGE = 365 * 24 * 3600
+
+def current_uid():
+    if st.user.get("is_logged_in"):
+        subject = f"{st.user.get('iss')}|{st.user.get('sub')}"
+        return "user-" + hashlib.sha256(subject.encode()).hexdigest()[:32]
+    uid = st.session_state.get("_uid")
+    if not uid:
+        if "uid" in st.query_params:
+            del st.query_params["uid"]  # links from before ids left the URL
+        uid = str(st.context.cookies.get(UID_COOKIE) or "")
+        if not re.fullmatch(r"[0-9a-f]{32}", uid):
+            uid = uuid.uuid4().hex
+            st.html(
+                f"<script>document.cookie = '{UID_COOKIE}={uid}; max-age={UID_COOKIE_MAX_AGE}; path=/; "
+                f"SameSite=Strict' + (location.protocol === 'https:' ? '; Secure' : '');</script>",
+                unsafe_allow_javascript=True
+            )
+        st.session_state["_uid"] = uid
+    return uid
+
+def get_user_state():
+    uid = current_uid()
+    state = st.session_state.get("_user_state")
+    if state is None or state.uid != uid:
+        claim_legacy_rows(uid)
+        state = st.session_state["_user_state"] = UserState(uid, get_state_writer())
+    state.refresh()
+    return state